@@ -0,0 +1,30 @@
+"""add user_tokens lookup indexes
+
+Revision ID: 5b2f0c1d9a7e
+Revises: 39ec74105bee
+Create Date: 2026-10-17 10:12:31.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b2f0c1d9a7e'
+down_revision: Union[str, None] = '39ec74105bee'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # built concurrently on postgres so token writes are not blocked
+    with op.get_context().autocommit_block():
+        op.create_index('ix_user_tokens_user_id_expires_at', 'user_tokens', ['user_id', 'expires_at'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_user_tokens_expires_at', 'user_tokens', ['expires_at'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_user_tokens_expires_at', table_name='user_tokens', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_user_tokens_user_id_expires_at', table_name='user_tokens', postgresql_concurrently=True, if_exists=True)
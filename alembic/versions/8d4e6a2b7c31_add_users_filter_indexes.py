@@ -0,0 +1,33 @@
+"""add users filter indexes
+
+Revision ID: 8d4e6a2b7c31
+Revises: 5b2f0c1d9a7e
+Create Date: 2026-10-17 14:41:08.215903
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d4e6a2b7c31'
+down_revision: Union[str, None] = '5b2f0c1d9a7e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # built concurrently on postgres so user writes are not blocked
+    with op.get_context().autocommit_block():
+        op.create_index('ix_users_live_id', 'users', ['id'], unique=False, postgresql_where=sa.text('is_deleted = false'), sqlite_where=sa.text('is_deleted = 0'), postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_users_live_active_id', 'users', ['is_active', 'id'], unique=False, postgresql_where=sa.text('is_deleted = false'), sqlite_where=sa.text('is_deleted = 0'), postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_users_superadmin_id', 'users', ['id'], unique=False, postgresql_where=sa.text('is_superadmin = true'), sqlite_where=sa.text('is_superadmin = 1'), postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_users_superadmin_id', table_name='users', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_users_live_active_id', table_name='users', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_users_live_id', table_name='users', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,176 @@
+"""native uuid primary keys
+
+Revision ID: a3c9e7f1b2d4
+Revises: 8d4e6a2b7c31
+Create Date: 2026-10-17 16:05:44.730512
+
+On postgres the varchar ids are converted online: uuid shadow columns are
+kept in sync by a trigger while they are backfilled in batches, their
+indexes are built concurrently, and a short locked swap renames them into
+place. Foreign keys are re-added NOT VALID and validated afterwards.
+On sqlite the ids are rewritten as 16 byte blobs in place.
+
+"""
+import uuid
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c9e7f1b2d4'
+down_revision: Union[str, None] = '8d4e6a2b7c31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+
+# id columns converted per table
+ID_COLUMNS = {
+    'users': ['id'],
+    'oauth': ['id', 'user_id'],
+    'user_tokens': ['id', 'user_id'],
+}
+
+# second indexes on the primary keys, the primary key index already covers them
+REDUNDANT_INDEXES = [('ix_users_id', 'users'), ('ix_oauth_id', 'oauth'), ('ix_user_tokens_id', 'user_tokens')]
+
+FOREIGN_KEYS = [('oauth_user_id_fkey', 'oauth'), ('user_tokens_user_id_fkey', 'user_tokens')]
+
+# indexes over the id columns rebuilt on the uuid columns: name, table, columns, where
+INDEXES = [
+    ('ix_users_live_id', 'users', ['id'], 'is_deleted = false'),
+    ('ix_users_live_active_id', 'users', ['is_active', 'id'], 'is_deleted = false'),
+    ('ix_users_superadmin_id', 'users', ['id'], 'is_superadmin = true'),
+    ('ix_user_tokens_user_id_expires_at', 'user_tokens', ['user_id', 'expires_at'], None),
+]
+
+# unique constraints over the id columns: name, table, column
+UNIQUE_CONSTRAINTS = [(f'{table}_pkey', table, 'id') for table in ID_COLUMNS] + [('oauth_user_id_key', 'oauth', 'user_id')]
+
+
+def _shadow(column: str) -> str:
+    return f'{column}_uuid'
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table in REDUNDANT_INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+    if op.get_bind().dialect.name == 'postgresql':
+        _upgrade_postgresql()
+    else:
+        _upgrade_sqlite()
+
+
+def _upgrade_postgresql() -> None:
+    bind = op.get_bind()
+
+    # shadow columns, kept in sync with new writes while the old rows are backfilled
+    for table, columns in ID_COLUMNS.items():
+        for column in columns:
+            op.add_column(table, sa.Column(_shadow(column), sa.Uuid(), nullable=True))
+        assignments = ' '.join(f'NEW.{_shadow(column)} := NEW.{column}::uuid;' for column in columns)
+        op.execute(
+            f'CREATE FUNCTION {table}_uuid_sync() RETURNS trigger AS $$ '
+            f'BEGIN {assignments} RETURN NEW; END $$ LANGUAGE plpgsql'
+        )
+        op.execute(
+            f'CREATE TRIGGER {table}_uuid_sync BEFORE INSERT OR UPDATE ON {table} '
+            f'FOR EACH ROW EXECUTE FUNCTION {table}_uuid_sync()'
+        )
+
+    with op.get_context().autocommit_block():
+        for table, columns in ID_COLUMNS.items():
+            assignments = ', '.join(f'{_shadow(column)} = {column}::uuid' for column in columns)
+            batch = sa.text(
+                f'UPDATE {table} SET {assignments} WHERE ctid IN '
+                f'(SELECT ctid FROM {table} WHERE {_shadow("id")} IS NULL LIMIT {BATCH_SIZE})'
+            )
+            while bind.execute(batch).rowcount:
+                pass
+
+            # a validated check lets SET NOT NULL skip its table scan during the swap
+            for column in columns:
+                check = f'{table}_{_shadow(column)}_not_null'
+                op.execute(f'ALTER TABLE {table} ADD CONSTRAINT {check} CHECK ({_shadow(column)} IS NOT NULL) NOT VALID')
+                op.execute(f'ALTER TABLE {table} VALIDATE CONSTRAINT {check}')
+
+        for name, table, column in UNIQUE_CONSTRAINTS:
+            op.create_index(f'{name}_uuid', table, [_shadow(column)], unique=True, postgresql_concurrently=True)
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                f'{name}_uuid', table, [_shadow(column) if column in ID_COLUMNS[table] else column for column in columns],
+                postgresql_where=sa.text(where) if where else None, postgresql_concurrently=True
+            )
+
+    # the swap only touches the catalog, so the tables are locked briefly
+    op.execute('LOCK TABLE users, oauth, user_tokens IN ACCESS EXCLUSIVE MODE')
+    for name, table in FOREIGN_KEYS:
+        op.drop_constraint(name, table, type_='foreignkey')
+    for table, columns in ID_COLUMNS.items():
+        op.execute(f'DROP TRIGGER {table}_uuid_sync ON {table}')
+        op.execute(f'DROP FUNCTION {table}_uuid_sync()')
+    for name, table, _ in UNIQUE_CONSTRAINTS:
+        op.drop_constraint(name, table, type_='primary' if name.endswith('_pkey') else 'unique')
+
+    for table, columns in ID_COLUMNS.items():
+        for column in columns:
+            op.drop_column(table, column)
+            op.alter_column(table, _shadow(column), new_column_name=column, nullable=False)
+            op.drop_constraint(f'{table}_{_shadow(column)}_not_null', table, type_='check')
+
+    for name, table, column in UNIQUE_CONSTRAINTS:
+        kind = 'PRIMARY KEY' if name.endswith('_pkey') else 'UNIQUE'
+        op.execute(f'ALTER TABLE {table} ADD CONSTRAINT {name} {kind} USING INDEX {name}_uuid')
+    for name, table, _, _ in INDEXES:
+        op.execute(f'ALTER INDEX {name}_uuid RENAME TO {name}')
+    for name, table in FOREIGN_KEYS:
+        op.execute(
+            f'ALTER TABLE {table} ADD CONSTRAINT {name} FOREIGN KEY (user_id) '
+            f'REFERENCES users (id) ON DELETE CASCADE NOT VALID'
+        )
+
+    with op.get_context().autocommit_block():
+        for name, table in FOREIGN_KEYS:
+            op.execute(f'ALTER TABLE {table} VALIDATE CONSTRAINT {name}')
+
+
+def _upgrade_sqlite() -> None:
+    # the declared column types stay, sqlite stores blobs as they are
+    bind = op.get_bind()
+    for table, columns in ID_COLUMNS.items():
+        for column in columns:
+            rows = bind.execute(sa.text(f'SELECT rowid, {column} FROM {table} WHERE typeof({column}) = \'text\'')).all()
+            if rows:
+                bind.execute(
+                    sa.text(f'UPDATE {table} SET {column} = :value WHERE rowid = :rowid'),
+                    [{'rowid': rowid, 'value': uuid.UUID(value).bytes} for rowid, value in rows]
+                )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        # rewrites the tables under lock, downgrades are not expected to be online
+        for name, table in FOREIGN_KEYS:
+            op.drop_constraint(name, table, type_='foreignkey')
+        for table, columns in ID_COLUMNS.items():
+            for column in columns:
+                op.alter_column(table, column, type_=sa.String(), postgresql_using=f'{column}::text')
+        for name, table in FOREIGN_KEYS:
+            op.create_foreign_key(name, table, 'users', ['user_id'], ['id'], ondelete='CASCADE')
+    else:
+        for table, columns in ID_COLUMNS.items():
+            for column in columns:
+                rows = bind.execute(sa.text(f'SELECT rowid, {column} FROM {table} WHERE typeof({column}) = \'blob\'')).all()
+                if rows:
+                    bind.execute(
+                        sa.text(f'UPDATE {table} SET {column} = :value WHERE rowid = :rowid'),
+                        [{'rowid': rowid, 'value': str(uuid.UUID(bytes=value))} for rowid, value in rows]
+                    )
+
+    for name, table in REDUNDANT_INDEXES:
+        op.create_index(name, table, ['id'], unique=False)
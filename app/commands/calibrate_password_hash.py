@@ -0,0 +1,83 @@
+"""Measures password hashing on this machine and suggests a hashing policy
+
+Usage:
+    python -m app.commands.calibrate_password_hash [--target-ms 250] [--scheme bcrypt]
+
+The suggested settings are the highest cost whose median hash time stays
+within the latency budget. Existing hashes are upgraded on login once the
+settings are applied.
+"""
+import sys
+import time
+import argparse
+import statistics
+
+from app.core.config.security import build_crypt_context
+from app.utils.settings import settings
+
+SAMPLE_PASSWORD = "Calibrate#Passw0rd"
+
+def measure(context, samples: int) -> float:
+    """Returns the median time in ms to hash a password with a context"""
+
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        context.hash(SAMPLE_PASSWORD)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+def calibrate_bcrypt(target_ms: int, samples: int) -> dict:
+    """Finds the highest bcrypt rounds within the budget"""
+
+    best = {"BCRYPT_ROUNDS": 4}
+    for rounds in range(4, 20):
+        elapsed = measure(build_crypt_context("bcrypt", bcrypt_rounds=rounds), samples)
+        print(f"bcrypt rounds={rounds:<2} {elapsed:8.1f} ms")
+        if elapsed > target_ms:
+            break
+        best = {"BCRYPT_ROUNDS": rounds}
+    return best
+
+def calibrate_argon2(target_ms: int, samples: int) -> dict:
+    """Finds the highest argon2 time cost within the budget for the configured memory"""
+
+    best = {"ARGON2_TIME_COST": 1}
+    for time_cost in range(1, 20):
+        context = build_crypt_context(
+            "argon2",
+            argon2_time_cost=time_cost,
+            argon2_memory_cost=settings.ARGON2_MEMORY_COST,
+            argon2_parallelism=settings.ARGON2_PARALLELISM
+        )
+        elapsed = measure(context, samples)
+        print(f"argon2 time_cost={time_cost:<2} memory_cost={settings.ARGON2_MEMORY_COST} {elapsed:8.1f} ms")
+        if elapsed > target_ms:
+            break
+        best = {"ARGON2_TIME_COST": time_cost}
+    return best
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Calibrate the password hashing cost")
+    parser.add_argument("--target-ms", type=int, default=settings.PASSWORD_HASH_TARGET_MS, help="latency budget per hash")
+    parser.add_argument("--scheme", choices=["bcrypt", "argon2"], default=settings.PASSWORD_HASH_SCHEME)
+    parser.add_argument("--samples", type=int, default=3, help="hashes measured per cost")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.scheme == "argon2":
+            suggested = calibrate_argon2(args.target_ms, args.samples)
+        else:
+            suggested = calibrate_bcrypt(args.target_ms, args.samples)
+    except Exception as exc:
+        print(f"Calibration failed; {exc}", file=sys.stderr)
+        return 1
+
+    print(f"\nSuggested settings for a {args.target_ms} ms budget:")
+    print(f"PASSWORD_HASH_SCHEME={args.scheme}")
+    for key, value in suggested.items():
+        print(f"{key}={value}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+"""Generates an access token signing key in JWT_KEYS_DIR
+
+Usage:
+    python -m app.commands.generate_signing_key --kid 2026-10 [--alg ES256|EdDSA] [--retire 2026-04]
+
+Rotation: generate the new key and set JWT_ACTIVE_KID to it. Keep the old key
+published until its tokens have expired, then retire it. Retiring swaps its
+private key file for the public key, so it still verifies but never signs.
+"""
+import sys
+import argparse
+from pathlib import Path
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+
+from app.core.config.signing_keys import load_pem_key
+from app.utils.settings import settings
+
+def generate(keys_dir: Path, kid: str, algorithm: str) -> Path:
+    """Writes a new private key to <keys_dir>/<kid>.pem"""
+
+    path = keys_dir / f"{kid}.pem"
+    if path.exists():
+        raise SystemExit(f"{path} already exists")
+
+    key = ec.generate_private_key(ec.SECP256R1()) if algorithm == "ES256" else ed25519.Ed25519PrivateKey.generate()
+    keys_dir.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ))
+    path.chmod(0o600)
+    return path
+
+def retire(keys_dir: Path, kid: str) -> Path:
+    """Replaces the private key of a kid with its public key"""
+
+    path = keys_dir / f"{kid}.pem"
+    key = load_pem_key(path.read_bytes())
+    if hasattr(key, "public_key"):
+        path.write_bytes(key.public_key().public_bytes(
+            serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+        ))
+    return path
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate an access token signing key")
+    parser.add_argument("--kid", required=True, help="the key id, also the file name")
+    parser.add_argument("--alg", choices=["ES256", "EdDSA"], default="ES256", help="the signing algorithm")
+    parser.add_argument("--dir", default=settings.JWT_KEYS_DIR, help="the keys directory. Defaults to JWT_KEYS_DIR.")
+    parser.add_argument("--retire", metavar="KID", help="a key to keep for verification only")
+    args = parser.parse_args(argv)
+
+    if not args.dir:
+        parser.error("set JWT_KEYS_DIR or pass --dir")
+    keys_dir = Path(args.dir)
+
+    print(f"Generated {generate(keys_dir, args.kid, args.alg)}")
+    if args.retire:
+        print(f"Retired {retire(keys_dir, args.retire)}")
+    print(f"Set JWT_ACTIVE_KID={args.kid} and restart to sign with the new key")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
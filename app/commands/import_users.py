@@ -0,0 +1,52 @@
+"""Imports users in bulk from a CSV or NDJSON file
+
+Usage:
+    python -m app.commands.import_users users.csv [--format csv|ndjson] [--batch-size 1000] [--send-verification]
+
+CSV files have a header row, NDJSON files one JSON object per line. Rows carry
+email, first_name, last_name and optionally password, an existing bcrypt or
+argon2 hash, and is_verified.
+"""
+import sys
+import asyncio
+import argparse
+
+from fastapi import BackgroundTasks, HTTPException
+
+from app.db.database import open_session
+from app.utils.settings import settings
+from app.v1.services.user_import import user_importer, import_format
+
+async def import_file(path: str, format: str, batch_size: int, send_verification: bool) -> dict:
+    background_tasks = BackgroundTasks()
+    with open(path, encoding="utf-8-sig", newline="") as lines:
+        async with open_session() as db:
+            report = await user_importer.run(db, lines, format, batch_size, send_verification, background_tasks)
+
+    # the verification emails, sent once every batch is written
+    await background_tasks()
+    return report
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import users from a CSV or NDJSON file")
+    parser.add_argument("path", help="the file to import")
+    parser.add_argument("--format", choices=["csv", "ndjson"], default=None, help="defaults to the file extension")
+    parser.add_argument("--batch-size", type=int, default=settings.USER_IMPORT_BATCH_SIZE, help="rows written per transaction")
+    parser.add_argument("--send-verification", action="store_true", help="email imported unverified users a verification link")
+    args = parser.parse_args(argv)
+
+    try:
+        format = import_format(args.path, args.format)
+    except HTTPException as exc:
+        parser.error(exc.detail)
+    report = asyncio.run(import_file(args.path, format, args.batch_size, args.send_verification))
+    print(
+        f"Imported {report['imported']} of {report['rows']} rows, rejected {report['rejected']} "
+        f"({report['seconds']}s, {report['rows_per_second']} rows/s)"
+    )
+    for error in report["errors"]:
+        print(f"  line {error['line']}: {error['reason']}")
+    return 0 if not report["rejected"] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
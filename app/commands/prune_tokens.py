@@ -0,0 +1,31 @@
+"""Deletes expired user tokens in batches
+
+Usage:
+    python -m app.commands.prune_tokens [--retention-hours 24] [--batch-size 1000] [--pause 0.1]
+"""
+import sys
+import asyncio
+import argparse
+from datetime import timedelta
+
+from app.db.database import open_session
+from app.utils.settings import settings
+from app.v1.services.token_sweeper import token_sweeper
+
+async def prune(retention: timedelta, batch_size: int, pause: float) -> dict:
+    async with open_session() as db:
+        return await token_sweeper.prune(db, retention, batch_size, pause)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Delete expired user tokens")
+    parser.add_argument("--retention-hours", type=float, default=settings.TOKEN_RETENTION_HOURS, help="hours expired tokens are kept")
+    parser.add_argument("--batch-size", type=int, default=settings.TOKEN_SWEEP_BATCH_SIZE, help="rows deleted per transaction")
+    parser.add_argument("--pause", type=float, default=0, help="seconds to wait between batches")
+    args = parser.parse_args(argv)
+
+    stats = asyncio.run(prune(timedelta(hours=args.retention_hours), args.batch_size, args.pause))
+    print(f"Removed {stats['removed']} tokens in {stats['batches']} batches ({stats['seconds']}s)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,70 @@
 import jwt
+import hmac
+import uuid
+import time
 import base64
+import hashlib
+import asyncio
+import math
+import weakref
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
-from datetime import datetime, timedelta
-from sqlalchemy.orm import Session, joinedload
-
-from app.v1.models.user import UserToken
+from datetime import datetime, timedelta, timezone
+from typing import Union
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, joinedload, make_transient_to_detached
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.v1.models.user import User, UserToken
+from app.db.database import run_db
+from app.utils.cache import TTLCache, RevocationList
+from app.core.config.signing_keys import signing_keys
 from app.utils.settings import settings
 from app.utils.logger import logger
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+def build_crypt_context(
+    scheme: str = "bcrypt",
+    bcrypt_rounds: int = 12,
+    argon2_time_cost: int = 3,
+    argon2_memory_cost: int = 65536,
+    argon2_parallelism: int = 4
+) -> CryptContext:
+    """Builds a password hashing policy
+
+    The given scheme hashes new passwords. bcrypt hashes stay verifiable and are
+    marked deprecated when argon2 is used, so needs_update flags them for rehashing.
+
+    Args:
+        - scheme (str): bcrypt or argon2
+        - bcrypt_rounds (int): the bcrypt cost factor
+        - argon2_time_cost (int): the argon2 number of iterations
+        - argon2_memory_cost (int): the argon2 memory in KiB
+        - argon2_parallelism (int): the argon2 number of lanes
+
+    Returns:
+        CryptContext: the hashing policy
+    """
+
+    schemes = ["bcrypt"]
+    options = {"bcrypt__rounds": bcrypt_rounds}
+    if scheme == "argon2":
+        schemes = ["argon2", "bcrypt"]
+        options.update(
+            argon2__time_cost=argon2_time_cost,
+            argon2__memory_cost=argon2_memory_cost,
+            argon2__parallelism=argon2_parallelism
+        )
+    return CryptContext(schemes=schemes, deprecated="auto", **options)
+
+pwd_context = build_crypt_context(
+    scheme=settings.PASSWORD_HASH_SCHEME,
+    bcrypt_rounds=settings.BCRYPT_ROUNDS,
+    argon2_time_cost=settings.ARGON2_TIME_COST,
+    argon2_memory_cost=settings.ARGON2_MEMORY_COST,
+    argon2_parallelism=settings.ARGON2_PARALLELISM
+)
 
 def hash_password(password):
     """Function to hash password"""
@@ -28,6 +84,181 @@ def verify_password(plain_password: str, hashed_password: str):
 
     return pwd_context.verify(plain_password, hashed_password)
 
+def password_needs_update(hashed_password: str) -> bool:
+    """Checks if a password hash doesn't match the current hashing policy
+
+    Args:
+        hashed_password (str): the hashed password
+
+    Returns:
+        bool: true if the password should be rehashed
+    """
+
+    return pwd_context.needs_update(hashed_password)
+
+_hash_executor = None
+_hash_slots = weakref.WeakKeyDictionary()
+
+def get_hash_executor():
+    """Returns the process pool used for password hashing
+
+    The pool is created lazily with PASSWORD_HASH_WORKERS processes. A value
+    of 0 disables the pool and hashing runs on the default thread executor.
+
+    Returns:
+        ProcessPoolExecutor | None: the password hashing pool
+    """
+
+    global _hash_executor
+    if _hash_executor is None and settings.PASSWORD_HASH_WORKERS > 0:
+        _hash_executor = ProcessPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _hash_executor
+
+def shutdown_hash_executor():
+    """Shuts down the password hashing pool if it was started"""
+
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=True, cancel_futures=True)
+        _hash_executor = None
+
+async def _run_in_hash_pool(func, *args):
+    """Runs a hashing function in the worker pool
+
+    At most PASSWORD_HASH_QUEUE_SIZE jobs are queued on the pool at once.
+    Callers over that limit wait up to PASSWORD_HASH_QUEUE_TIMEOUT seconds for
+    a free slot without blocking the loop, then are turned away.
+
+    Args:
+        - func: the hashing function to run
+        - args: the function arguments
+
+    Raises:
+        HTTPException: 503 with Retry-After when the queue stays full
+
+    Returns:
+        the result of the hashing function
+    """
+
+    loop = asyncio.get_running_loop()
+    slots = _hash_slots.get(loop)
+    if slots is None:
+        slots = _hash_slots[loop] = asyncio.Semaphore(settings.PASSWORD_HASH_QUEUE_SIZE)
+
+    timeout = settings.PASSWORD_HASH_QUEUE_TIMEOUT
+    try:
+        if timeout > 0:
+            await asyncio.wait_for(slots.acquire(), timeout)
+        elif slots.locked():
+            raise asyncio.TimeoutError
+        else:
+            await slots.acquire()
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many requests in progress, try again shortly",
+            headers={"Retry-After": str(max(1, math.ceil(timeout)))}
+        )
+
+    try:
+        return await loop.run_in_executor(get_hash_executor(), func, *args)
+    finally:
+        slots.release()
+
+async def hash_password_async(password: str) -> str:
+    """Hashes a password without blocking the event loop
+
+    Args:
+        password (str): the plain password
+
+    Returns:
+        str: the hashed password
+    """
+
+    return await _run_in_hash_pool(hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verifies a hashed password without blocking the event loop
+
+    Args:
+        plain_password (str): the plain input password
+        hashed_password (str): the hashed password
+
+    Returns:
+        bool: true if they are a match, false otherwise
+    """
+
+    return await _run_in_hash_pool(verify_password, plain_password, hashed_password)
+
+EMAIL_TOKEN_VERSION = "v1"
+
+def _email_token_signature(user: User, purpose: str, expires: int) -> str:
+    """Signs a user's email token fields with the secret key"""
+
+    updated_at = user.updated_at.isoformat() if user.updated_at else ""
+    message = "|".join((
+        EMAIL_TOKEN_VERSION, str(user.id), purpose, user.password or "", updated_at, str(expires)
+    ))
+    digest = hmac.new(settings.SECRET_KEY.encode(), message.encode(), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode("ascii")
+
+def generate_email_token(user: User, purpose: str) -> str:
+    """Generates a signed single purpose token for an email link
+
+    The token is bound to the user's password hash and last update, so it stops
+    working once the password changes or the user is updated (e.g. verified).
+
+    Args:
+        - user: the user the link is for
+        - purpose (str): the email context, e.g. verify-account
+
+    Returns:
+        str: the signed token
+    """
+
+    expires = int(time.time()) + settings.EMAIL_TOKEN_EXPIRE_MINUTES * 60
+    signature = _email_token_signature(user, purpose, expires)
+    return f"{EMAIL_TOKEN_VERSION}.{expires}.{signature}"
+
+def _is_legacy_email_token(token: str) -> bool:
+    """Checks a legacy token is a bcrypt hash of the cost the links were issued with
+
+    bcrypt runs at the cost written in the hash, so any other cost is refused
+    before hashing, or a forged high cost token would hold a pool worker for days.
+    """
+
+    costs = {12, settings.BCRYPT_ROUNDS}
+    return len(token) == 60 and any(token.startswith(f"$2b${cost:02d}$") for cost in costs)
+
+async def verify_email_token(user: User, purpose: str, token: str) -> bool:
+    """Verifies an email link token
+
+    Legacy bcrypt hashed context strings are verified in the hashing pool while
+    EMAIL_TOKEN_ACCEPT_LEGACY is set.
+
+    Args:
+        - user: the user the link is for
+        - purpose (str): the email context, e.g. verify-account
+        - token (str): the token from the link
+
+    Returns:
+        bool: true if the token is valid, false otherwise
+    """
+
+    version, _, rest = token.partition(".")
+    if version != EMAIL_TOKEN_VERSION:
+        if settings.EMAIL_TOKEN_ACCEPT_LEGACY and _is_legacy_email_token(token):
+            return await verify_password_async(user.get_context_string(context=purpose), token)
+        return False
+
+    expires, _, signature = rest.partition(".")
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    return hmac.compare_digest(signature, _email_token_signature(user, purpose, int(expires)))
+
 def str_encode(string: str) -> str:
     """Encodes a string
 
@@ -52,6 +283,57 @@ def str_decode(string: str) -> str:
 
     return base64.b85decode(string.encode('ascii')).decode('ascii')
 
+def uuid_claim(value: str) -> str:
+    """Encodes a UUID string as its 16 bytes in unpadded base64url (22 characters)"""
+
+    return base64.urlsafe_b64encode(uuid.UUID(value).bytes).rstrip(b"=").decode("ascii")
+
+def uuid_from_claim(claim: str) -> str:
+    """Decodes a uuid_claim back to the UUID string"""
+
+    return str(uuid.UUID(bytes=base64.urlsafe_b64decode(claim + "==")))
+
+def access_token_claims(payload: dict):
+    """Reads the user ID, user token ID and access key of an access token payload
+
+    Compact tokens carry base64url UUIDs in sub and sid. Legacy tokens carry
+    base85 strings in sub and r, and are read while TOKEN_ACCEPT_LEGACY_CLAIMS is set.
+
+    Args:
+        payload: the verified token payload
+
+    Returns:
+        tuple | none: the user ID, user token ID and access key, or none for malformed claims
+    """
+
+    try:
+        if "sid" in payload:
+            return uuid_from_claim(payload["sub"]), uuid_from_claim(payload["sid"]), payload["a"]
+        if settings.TOKEN_ACCEPT_LEGACY_CLAIMS and "r" in payload:
+            return str_decode(payload["sub"]), str_decode(payload["r"]), payload["a"]
+    except (KeyError, TypeError, ValueError) as claims_exec:
+        logger.debug(f"Invalid token claims: {str(claims_exec)}")
+    return None
+
+def refresh_token_claims(payload: dict):
+    """Reads the user ID, refresh key and access key of a refresh token payload
+
+    Args:
+        payload: the verified token payload
+
+    Returns:
+        tuple | none: the user ID, refresh key and access key, or none for malformed claims
+    """
+
+    try:
+        if "sid" in payload:
+            return uuid_from_claim(payload["sub"]), payload["t"], payload["a"]
+        if settings.TOKEN_ACCEPT_LEGACY_CLAIMS:
+            return str_decode(payload["sub"]), payload["t"], payload["a"]
+    except (KeyError, TypeError, ValueError) as claims_exec:
+        logger.debug(f"Invalid token claims: {str(claims_exec)}")
+    return None
+
 def generate_token(payload: dict, secret: str, algo: str, expiry: timedelta):
     """Generated a jwt token
 
@@ -88,48 +370,187 @@ def get_token_payload(token: str, secret: str, algo: str):
         payload = None
     return payload
 
-async def get_token_user(token: str, db: Session):
+def generate_access_token(payload: dict, expiry: timedelta):
+    """Generates an access token
+
+    Signed with the active asymmetric key when JWT_KEYS_DIR is set, so other
+    services can verify it with the published JWKS. Otherwise signed with the
+    shared SECRET_KEY.
+
+    Args:
+        - payload (dict): the payload data to encode in the token
+        - expiry (timedelta): the expiry time of the token
+
+    Returns:
+        str: an encoded token
+    """
+
+    if not signing_keys.enabled:
+        return generate_token(payload, settings.SECRET_KEY, settings.ALGORITHM, expiry)
+
+    kid, algorithm, key = signing_keys.signing_key()
+    payload.update({"exp": datetime.utcnow() + expiry})
+    return jwt.encode(payload, key, algorithm=algorithm, headers={"kid": kid})
+
+def get_access_token_payload(token: str):
+    """Retrieves an access token payload
+
+    Tokens with a kid are verified with that published key and its algorithm
+    only. Tokens without one are verified with SECRET_KEY, which keeps tokens
+    issued before a switch to asymmetric keys valid until they expire.
+
+    Args:
+        token: the jwt access token
+
+    Returns:
+       dict | none: the token payload or none
+    """
+
+    try:
+        kid = jwt.get_unverified_header(token).get("kid")
+    except Exception as jwt_exec:
+        logger.debug(f"JWT Error: {str(jwt_exec)}")
+        return None
+
+    if kid is None:
+        return get_token_payload(token, settings.SECRET_KEY, settings.ALGORITHM)
+
+    verification_key = signing_keys.verification_key(kid) if signing_keys.enabled else None
+    if verification_key is None:
+        logger.debug(f"JWT Error: unknown kid {kid}")
+        return None
+    algorithm, key = verification_key
+    return get_token_payload(token, key, algorithm)
+
+# authenticated users keyed by (token ID, access key) and tagged by user ID
+principal_cache = TTLCache(maxsize=settings.AUTH_CACHE_SIZE, ttl=settings.AUTH_CACHE_TTL)
+
+# IDs of expired user tokens whose access tokens may still be unexpired
+revoked_tokens = RevocationList()
+
+# access token user attributes trusted in stateless mode, packed as bits of the "f" claim
+PRINCIPAL_FLAGS = {"is_superadmin": 1, "is_active": 2, "is_verified": 4}
+
+def principal_claims(user: User) -> dict:
+    """Returns the user attributes embedded in an access token"""
+
+    return {"f": sum(bit for attr, bit in PRINCIPAL_FLAGS.items() if getattr(user, attr))}
+
+def invalidate_token_user(user_token_id: str, access_key: str):
+    """Evicts the cached user of an expired token and revokes its access tokens
+
+    The revocation lasts as long as the access tokens issued for the token,
+    both are ACCESS_TOKEN_EXPIRE_MINUTES.
+    """
+
+    principal_cache.delete((user_token_id, access_key))
+    revoked_tokens.add(user_token_id, ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
+def invalidate_user(*user_ids: str):
+    """Evicts every cached token of the users"""
+
+    for user_id in user_ids:
+        principal_cache.delete_tag(user_id)
+
+def _cache_token_user(user_token: UserToken):
+    """Caches a detached snapshot of a token's user until the token expires"""
+
+    expires_at = user_token.expires_at
+    if expires_at.tzinfo is not None:
+        expires_at = expires_at.astimezone(timezone.utc).replace(tzinfo=None)
+    ttl = (expires_at - datetime.utcnow()).total_seconds()
+
+    user = user_token.user
+    snapshot = {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs}
+    principal_cache.set((user_token.id, user_token.access_key), snapshot, ttl=ttl, tag=user.id)
+
+def _attach_user(db: Union[Session, AsyncSession], values: dict):
+    """Attaches known user attributes to the session without querying it
+
+    Attributes missing from values are loaded from the database on first access.
+    """
+
+    user = User(**values)
+    make_transient_to_detached(user)
+    session = db.sync_session if isinstance(db, AsyncSession) else db
+    return session.merge(user, load=False)
+
+def _query_token_user(db: Session, user_token_id: str, user_id: str, access_key: str):
+    """Queries the user of a live token"""
+
+    user_token = db.query(UserToken).options(joinedload(UserToken.user)).filter(
+        UserToken.access_key == access_key,
+        UserToken.id == user_token_id,
+        UserToken.user_id == user_id,
+        UserToken.expires_at > datetime.utcnow()
+    ).first()
+
+    if user_token:
+        _cache_token_user(user_token)
+        return user_token.user
+    return None
+
+async def get_token_user(token: str, db: Union[Session, AsyncSession]):
     """Retrieves the user associated with a token
 
     Args:
         - token: the jwt token to retrieve the user from
-        - db: the database session
+        - db: the database session, sync or async
+
+    Returns:
+        dict | none: the user object if the user exists or none if not
+    """
+    payload = get_access_token_payload(token)
+    return await get_payload_user(payload, db) if payload else None
+
+async def get_payload_user(payload: dict, db: Union[Session, AsyncSession]):
+    """Retrieves the user associated with a verified access token payload
+
+    Args:
+        - payload: the verified access token payload
+        - db: the database session, sync or async
 
     Returns:
         dict | none: the user object if the user exists or none if not
     """
-    payload = get_token_payload(token, settings.SECRET_KEY, settings.ALGORITHM)
-    if payload:
-        user_token_id = str_decode(payload.get('r'))
-        user_id = str_decode(payload.get('sub'))
-        access_key = payload.get('a')
-
-        user_token = db.query(UserToken).options(joinedload(UserToken.user)).filter(
-            UserToken.access_key == access_key,
-            UserToken.id == user_token_id,
-            UserToken.user_id == user_id,
-            UserToken.expires_at > datetime.utcnow()
-        ).first()
-
-        if user_token:
-            return user_token.user
+
+    claims = access_token_claims(payload)
+    if claims:
+        user_id, user_token_id, access_key = claims
+
+        if settings.AUTH_STATELESS and isinstance(payload.get("f"), int):
+            if user_token_id in revoked_tokens:
+                return None
+            principal = {attr: bool(payload["f"] & bit) for attr, bit in PRINCIPAL_FLAGS.items()}
+            return _attach_user(db, {"id": user_id, **principal})
+
+        snapshot = principal_cache.get((user_token_id, access_key))
+        if snapshot is not None and snapshot["id"] == user_id:
+            return _attach_user(db, snapshot)
+
+        return await run_db(db, _query_token_user, user_token_id, user_id, access_key)
     return None
 
-async def load_user(email: str, db: Session):
+def _query_user_by_email(db: Session, email: str):
+    """Queries a user by email"""
+
+    from app.v1.models.user import User
+    return db.query(User).filter_by(email = email).first()
+
+async def load_user(email: str, db: Union[Session, AsyncSession]):
     """Gets a user by email
 
     Args:
         - email: the email of the user
-        - db: the database session
+        - db: the database session, sync or async
 
     Returns:
         dict | none: the user obj if the user exists or none
     """
 
-    from app.v1.models.user import User
     try:
-        user = db.query(User).filter_by(email = email).first()
+        user = await run_db(db, _query_user_by_email, email)
     except Exception as user_exec:
         logger.info(f"User Not Found, Email: {email}")
         user = None
-    return user    
\ No newline at end of file
+    return user
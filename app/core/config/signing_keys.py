@@ -0,0 +1,105 @@
+"""Asymmetric access token signing keys
+
+Keys are PEM files in JWT_KEYS_DIR named <kid>.pem. Private keys can sign and
+verify, public keys only verify, so a retired key can stay published until the
+tokens it signed have expired. The algorithm follows the key type: P-256 keys
+sign with ES256 and Ed25519 keys with EdDSA.
+"""
+import json
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from jwt.algorithms import ECAlgorithm, OKPAlgorithm
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+
+from app.utils.settings import settings
+
+def key_algorithm(key) -> str:
+    """Returns the jwt algorithm of a parsed private or public key"""
+
+    if isinstance(key, (ec.EllipticCurvePrivateKey, ec.EllipticCurvePublicKey)):
+        if not isinstance(key.curve, ec.SECP256R1):
+            raise ValueError(f"Unsupported curve {key.curve.name}, use P-256")
+        return "ES256"
+    if isinstance(key, (ed25519.Ed25519PrivateKey, ed25519.Ed25519PublicKey)):
+        return "EdDSA"
+    raise ValueError(f"Unsupported signing key type {type(key).__name__}")
+
+def load_pem_key(data: bytes):
+    """Parses a PEM private key, or a public key when it holds none"""
+
+    if b"PRIVATE KEY" in data:
+        return serialization.load_pem_private_key(data, password=None)
+    return serialization.load_pem_public_key(data)
+
+class SigningKeyRing:
+    """Parsed signing keys, loaded once and reused for every token
+
+    Args:
+        - keys_dir (str): the directory of <kid>.pem files
+        - active_kid (str): the kid new tokens are signed with. Defaults to the last kid by name.
+    """
+
+    def __init__(self, keys_dir: str = "", active_kid: str = ""):
+        self.keys_dir = keys_dir
+        self.active_kid = active_kid
+        self._keys = None
+        self._jwks = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.keys_dir)
+
+    def _load(self) -> Dict[str, tuple]:
+        if self._keys is None:
+            keys = {}
+            for path in sorted(Path(self.keys_dir).glob("*.pem")):
+                key = load_pem_key(path.read_bytes())
+                keys[path.stem] = (key_algorithm(key), key)
+            self._keys = keys
+        return self._keys
+
+    def signing_key(self) -> Tuple[str, str, object]:
+        """Returns the kid, algorithm and private key tokens are signed with
+
+        Raises:
+            RuntimeError: when the active key is missing or has no private part
+        """
+
+        keys = self._load()
+        signers = [kid for kid, (_, key) in keys.items() if hasattr(key, "sign")]
+        kid = self.active_kid or (signers[-1] if signers else None)
+        if kid not in signers:
+            raise RuntimeError(f"No private signing key {kid!r} in {self.keys_dir}")
+        algorithm, key = keys[kid]
+        return kid, algorithm, key
+
+    def verification_key(self, kid: str) -> Optional[Tuple[str, object]]:
+        """Returns the algorithm and public key of a kid, or none for unknown kids"""
+
+        entry = self._load().get(kid)
+        if entry is None:
+            return None
+        algorithm, key = entry
+        return algorithm, key.public_key() if hasattr(key, "public_key") else key
+
+    def jwks(self) -> bytes:
+        """Returns the serialized JSON Web Key Set of every public key"""
+
+        if self._jwks is None:
+            jwk_keys = []
+            for kid in self._load():
+                algorithm, key = self.verification_key(kid)
+                encoder = ECAlgorithm if algorithm == "ES256" else OKPAlgorithm
+                jwk_keys.append({**encoder.to_jwk(key, as_dict=True), "kid": kid, "alg": algorithm, "use": "sig"})
+            self._jwks = json.dumps({"keys": jwk_keys}).encode()
+        return self._jwks
+
+    def reload(self):
+        """Drops the parsed keys, so rotated key files are read on next use"""
+
+        self._keys = None
+        self._jwks = None
+
+signing_keys = SigningKeyRing(settings.JWT_KEYS_DIR, settings.JWT_ACTIVE_KID)
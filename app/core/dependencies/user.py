@@ -1,18 +1,100 @@
-from typing import Annotated
-from fastapi import Depends, HTTPException
+import time
+from typing import Annotated, Optional
+from fastapi import Depends, HTTPException, Request
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 
-from app.db.database import get_db
-from app.core.config.security import get_token_user
+from app.db.database import get_session, open_replica_session, primary_pins, pin_primary
+from app.v1.models.user import User
+from app.core.config.security import get_payload_user, get_access_token_payload, access_token_claims
+from app.utils.metrics import Counter
+from app.utils.settings import settings
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
-async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], db: Annotated[Session, Depends(get_db)]):
-    """Gets the current authenticated user
+# number of times a request principal was resolved from its token
+principal_resolutions = Counter()
+
+_UNSET = object()
+
+async def get_access_payload(request: Request, token: Annotated[str, Depends(oauth2_scheme)]):
+    """Verifies the access token once per request
 
     Args:
+        - request: the current request
         - token: the users access token
+
+    Returns:
+        dict | none: the token payload or none for an invalid token
+    """
+
+    payload = getattr(request.state, "access_payload", _UNSET)
+    if payload is _UNSET:
+        payload = request.state.access_payload = get_access_token_payload(token)
+    return payload
+
+def _recently_issued(payload: dict) -> bool:
+    """Checks if an access token was issued within DB_REPLICA_PIN_SECONDS, from its expiry"""
+
+    issued_at = payload["exp"] - settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    return issued_at > time.time() - settings.DB_REPLICA_PIN_SECONDS
+
+async def get_read_session(
+    payload: Annotated[Optional[dict], Depends(get_access_payload)],
+    db: Annotated[Session, Depends(get_session)]
+):
+    """Gets a session for read-only routes
+
+    Reads go to the replica, unless the user wrote recently and is pinned to
+    the primary or the replica is unset or unreachable. Tokens issued within
+    DB_REPLICA_PIN_SECONDS also read the primary, on every worker, since
+    their session may not have replicated yet. The primary session only
+    connects when it is used.
+
+    Args:
+        - payload: the verified access token payload
+        - db: the primary database session
+
+    Yields:
+        Session: the replica or primary session
+    """
+
+    claims = access_token_claims(payload) if payload else None
+    if claims and (_recently_issued(payload) or await primary_pins.is_pinned(claims[0])):
+        yield db
+        return
+
+    async with open_replica_session() as replica:
+        yield replica if replica is not None else db
+
+async def _resolve_user(request: Request, payload: Optional[dict], db):
+    """Resolves the user of the access token once per request"""
+
+    user = getattr(request.state, "principal", None)
+    if user is None and payload:
+        principal_resolutions.increment()
+        user = await get_payload_user(payload, db)
+        request.state.principal = user
+
+    if user:
+        return user
+
+    raise HTTPException(status_code=401, detail="Not authorized")
+
+async def get_current_user(
+    request: Request,
+    payload: Annotated[Optional[dict], Depends(get_access_payload)],
+    db: Annotated[Session, Depends(get_session)]
+):
+    """Gets the current authenticated user
+
+    The user is resolved once per request and kept on request.state.principal,
+    so every dependency and service of the request shares it. Requests that
+    may write pin their user to the primary, so their next reads see the write.
+
+    Args:
+        - request: the current request
+        - payload: the verified access token payload
         - db: the database session
 
     raises:
@@ -22,19 +104,62 @@ async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], db: An
         dict: the current user obj if successful
     """
 
-    user = await get_token_user(token, db)
+    user = await _resolve_user(request, payload, db)
+    if request.method not in ("GET", "HEAD", "OPTIONS"):
+        pin_primary(user.id)
+    return user
 
-    if user:
-        return user
+async def get_current_reader(
+    request: Request,
+    payload: Annotated[Optional[dict], Depends(get_access_payload)],
+    db: Annotated[Session, Depends(get_read_session)]
+):
+    """Gets the current authenticated user for read-only routes, from the read session
+
+    Args:
+        - request: the current request
+        - payload: the verified access token payload
+        - db: the read session
+
+    raises:
+        - HTTPException: 401 for unvalidated credentials
+
+    Returns:
+        dict: the current user obj if successful
+    """
+
+    return await _resolve_user(request, payload, db)
+
+async def get_current_token_id(payload: Annotated[Optional[dict], Depends(get_access_payload)]):
+    """Gets the ID of the token (session) the current request is authenticated with
+
+    Args:
+        payload: the verified access token payload
+
+    Raises:
+        HTTPException: 401 for an invalid token
+
+    Returns:
+        str: the user token ID
+    """
+
+    claims = access_token_claims(payload) if payload else None
+    if claims:
+        return claims[1]
 
     raise HTTPException(status_code=401, detail="Not authorized")
 
-async def get_current_superadmin(token: Annotated[str, Depends(oauth2_scheme)], db: Annotated[Session, Depends(get_db)]):
+def _require_superadmin(user: User):
+    if user.is_superadmin:
+        return user
+
+    raise HTTPException(status_code=403, detail="You do not have permission!")
+
+async def get_current_superadmin(user: Annotated[User, Depends(get_current_user)]):
     """Checks if the current authenticated user is a superadmin
 
     Args:
-        - token: the users access token
-        - db: the database session
+        user: the current authenticated user
 
     Raises:
         - HTTPException: 401 is the user is not authenticated
@@ -43,10 +168,21 @@ async def get_current_superadmin(token: Annotated[str, Depends(oauth2_scheme)],
     Returns:
         dict: the current user obj if successful
     """
-    
-    user = await get_current_user(token, db)
 
-    if user.is_superadmin:
-        return user
+    return _require_superadmin(user)
+
+async def get_current_superadmin_reader(user: Annotated[User, Depends(get_current_reader)]):
+    """Checks if the current authenticated user of a read-only route is a superadmin
+
+    Args:
+        user: the current authenticated user, from the read session
+
+    Raises:
+        - HTTPException: 401 is the user is not authenticated
+        - HTTPException: 403 if the authenticated user is not a superadmin
+
+    Returns:
+        dict: the current user obj if successful
+    """
 
-    raise HTTPException(status_code=403, detail="You do not have permission!")
\ No newline at end of file
+    return _require_superadmin(user)
\ No newline at end of file
@@ -1,8 +1,16 @@
 """Database module
 """
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Optional
 from sqlalchemy.orm import sessionmaker, scoped_session, declarative_base
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text, make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from starlette.concurrency import run_in_threadpool
 from app.utils.settings import settings, BASE_DIR
+from app.db.pool import InstrumentedQueuePool, InstrumentedAsyncQueuePool
+from app.utils.cache import RevocationList, RedisByteCache
+from app.utils.logger import logger
 
 DB_HOST = settings.DB_HOST
 DB_PORT = settings.DB_PORT
@@ -11,6 +19,18 @@ DB_PASSWORD = settings.DB_PASSWORD
 DB_NAME = settings.DB_NAME
 DB_TYPE = settings.DB_TYPE
 
+def pool_options(poolclass=InstrumentedQueuePool) -> dict:
+    """Returns the create_engine pool arguments from the DB_POOL settings"""
+
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING
+    }
+
 def get_db_engine(test_mode: bool = False):
     """Database engine connection
 
@@ -34,7 +54,45 @@ def get_db_engine(test_mode: bool = False):
             )
     elif DB_TYPE == "postgresql":
         DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-    return create_engine(DATABASE_URL)
+    return create_engine(DATABASE_URL, **pool_options())
+
+def get_async_db_engine(test_mode: bool = False):
+    """Async database engine connection, asyncpg for postgres and aiosqlite for sqlite
+
+    Args:
+        test_mode (bool, optional): Check for test environment. Defaults to False.
+
+    Returns:
+        AsyncEngine: Established async database connection
+    """
+    DATABASE_URL = f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+
+    if DB_TYPE == "sqlite" or test_mode:
+        BASE_PATH = f"sqlite+aiosqlite:///{BASE_DIR}"
+        DATABASE_URL = BASE_PATH + ("test.db" if test_mode else "/")
+    if test_mode:
+        return create_async_engine(DATABASE_URL)
+    return create_async_engine(DATABASE_URL, **pool_options(InstrumentedAsyncQueuePool))
+
+def get_replica_engine(async_mode: bool = False):
+    """Read replica engine connection, none when DB_REPLICA_URL is unset
+
+    Args:
+        async_mode (bool, optional): build an AsyncEngine. Defaults to False.
+
+    Returns:
+        Engine | AsyncEngine | none: the replica engine
+    """
+    if not settings.DB_REPLICA_URL:
+        return None
+
+    url = make_url(settings.DB_REPLICA_URL)
+    if not async_mode:
+        return create_engine(url, **pool_options())
+
+    async_drivers = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+    url = url.set(drivername=async_drivers[url.get_backend_name()])
+    return create_async_engine(url, **pool_options(InstrumentedAsyncQueuePool))
 
 engine = get_db_engine()
 
@@ -42,6 +100,124 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 db_session = scoped_session(SessionLocal)
 
+# the async stack is only built when selected, so its drivers stay optional
+async_engine = get_async_db_engine() if settings.DB_ASYNC else None
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
+# the replica of the selected stack, read-only routes use it unless their user is pinned
+replica_engine = get_replica_engine(async_mode=settings.DB_ASYNC)
+
+if replica_engine is None:
+    ReplicaSessionLocal = None
+elif settings.DB_ASYNC:
+    ReplicaSessionLocal = async_sessionmaker(bind=replica_engine, autoflush=False, expire_on_commit=False)
+else:
+    ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+
+# the pins set while handling the current request, written to the shared backend before it responds
+_request_pins: ContextVar[Optional[set]] = ContextVar("request_pins", default=None)
+
+class PrimaryPins:
+    """Users who wrote recently, their reads stay on the primary until the replicas catch up
+
+    Pins are kept in the worker that set them at once. With a shared backend,
+    the pins a request sets are also written there before its response
+    starts, so the user's next request reads the primary on every worker.
+    Pins set outside a request stay in the worker. Backend errors are logged,
+    a user whose pin cannot be read is treated as pinned.
+
+    Args:
+        backend: a shared byte cache backend, or none to keep pins per worker
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend
+        self.local = RevocationList()
+
+    @staticmethod
+    def _key(user_id: str) -> str:
+        return f"primary-pin:{user_id}"
+
+    def pin(self, *user_ids: str):
+        """Pins users for DB_REPLICA_PIN_SECONDS"""
+
+        for user_id in user_ids:
+            self.local.add(user_id, settings.DB_REPLICA_PIN_SECONDS)
+        pending = _request_pins.get()
+        if self.backend is not None and pending is not None:
+            pending.update(user_ids)
+
+    async def is_pinned(self, user_id: str) -> bool:
+        """Checks if a user is pinned by this or, with a shared backend, any worker"""
+
+        if user_id in self.local:
+            return True
+        if self.backend is None:
+            return False
+        try:
+            return await self.backend.get(self._key(user_id)) is not None
+        except Exception as exc:
+            logger.warning(f"Primary pin read failed, reading from the primary; {exc}")
+            return True
+
+    async def share(self, user_ids: set):
+        """Writes the pins of a request to the shared backend"""
+
+        if self.backend is None or not user_ids:
+            return
+        try:
+            await self.backend.set_many({self._key(user_id): b"1" for user_id in user_ids})
+        except Exception as exc:
+            logger.warning(f"Primary pin write failed; {exc}")
+
+    def clear(self):
+        """Removes every pin of this worker"""
+
+        self.local.clear()
+        if self.backend is not None:
+            self.backend.clear()
+
+def get_primary_pins_backend():
+    """Returns the configured shared pin backend, none keeps pins per worker"""
+
+    if settings.DB_REPLICA_PIN_BACKEND == "redis":
+        return RedisByteCache(settings.REDIS_URL, ttl=settings.DB_REPLICA_PIN_SECONDS)
+    return None
+
+primary_pins = PrimaryPins(get_primary_pins_backend())
+
+class PrimaryPinsMiddleware:
+    """Shares the pins a request sets with the other workers before it responds
+
+    Args:
+        app: the ASGI app
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or primary_pins.backend is None:
+            await self.app(scope, receive, send)
+            return
+
+        pending = set()
+        token = _request_pins.set(pending)
+
+        async def send_after_sharing(message):
+            if message["type"] == "http.response.start":
+                await primary_pins.share(pending)
+                pending.clear()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_after_sharing)
+        finally:
+            _request_pins.reset(token)
+
 Base = declarative_base()
 
 def create_database():
@@ -52,4 +228,136 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+@asynccontextmanager
+async def open_session():
+    """Opens a session outside of a request, e.g. for background tasks"""
+
+    if settings.DB_ASYNC:
+        async with AsyncSessionLocal() as db:
+            yield db
+    else:
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            await run_in_threadpool(db.close)
+
+def pin_primary(*user_ids: str):
+    """Keeps the reads of users on the primary for DB_REPLICA_PIN_SECONDS after a write
+
+    The pin window should cover the replica lag.
+    """
+
+    if ReplicaSessionLocal is None:
+        return
+    primary_pins.pin(*user_ids)
+
+def _connect(db):
+    db.connection()
+
+@asynccontextmanager
+async def open_replica_session():
+    """Opens a session on the read replica, or yields none if it is unset or unreachable
+
+    The connection is checked out up front, so a replica outage falls back
+    to the primary instead of failing the request.
+    """
+
+    if ReplicaSessionLocal is None:
+        yield None
+        return
+
+    db = ReplicaSessionLocal()
+    try:
+        try:
+            await run_db(db, _connect)
+        except Exception as exc:
+            logger.warning(f"Read replica unavailable, reading from the primary; {exc}")
+            yield None
+        else:
+            yield db
+    finally:
+        if isinstance(db, AsyncSession):
+            await db.close()
+        else:
+            await run_in_threadpool(db.close)
+
+def insert_or_ignore(db, entity, conflict_columns: list):
+    """Builds an INSERT ... ON CONFLICT DO NOTHING for the dialect of a session
+
+    Args:
+        - db: the sync database session
+        - entity: the model or table to insert into
+        - conflict_columns: the columns of the unique index that may conflict
+
+    Raises:
+        NotImplementedError: for dialects other than postgresql and sqlite
+
+    Returns:
+        Insert: the insert statement
+    """
+
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"insert_or_ignore does not support {dialect}")
+    return insert(entity).on_conflict_do_nothing(index_elements=conflict_columns)
+
+def pool_stats() -> dict:
+    """Returns the stats of every instrumented engine pool of this worker"""
+
+    pools = {"primary": engine.pool}
+    if async_engine is not None:
+        pools["primary_async"] = async_engine.pool
+    if replica_engine is not None:
+        pools["replica"] = replica_engine.pool
+    return {name: pool.stats() for name, pool in pools.items() if hasattr(pool, "stats")}
+
+def connection_limits(db) -> dict:
+    """Reads the server connection limit and usage, to size pools against it
+
+    Args:
+        db: a sync database session
+
+    Returns:
+        dict | none: max_connections and the open connections on postgres, else none
+    """
+
+    if db.get_bind().dialect.name != "postgresql":
+        return None
+    return {
+        "max_connections": int(db.execute(text("SHOW max_connections")).scalar()),
+        "connections": db.execute(text("SELECT count(*) FROM pg_stat_activity")).scalar()
+    }
+
+# session dependency used by the routes, selected by the DB_ASYNC setting
+get_session = get_async_db if settings.DB_ASYNC else get_db
+
+async def run_db(db, func, *args, **kwargs):
+    """Runs a sync database function against a session from either stack
+
+    With an AsyncSession the function runs through run_sync, so its queries go
+    through the async driver. With a sync Session it runs on the threadpool.
+    Either way the event loop is not blocked on database IO.
+
+    Args:
+        - db: the database session (Session or AsyncSession)
+        - func: a function taking a sync Session as its first argument
+        - args: the remaining function arguments
+
+    Returns:
+        the result of the function
+    """
+
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(func, *args, **kwargs)
+    return await run_in_threadpool(func, db, *args, **kwargs)
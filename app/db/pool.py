@@ -0,0 +1,104 @@
+"""Connection pools that count checkouts, waits, timeouts and overflow connections
+"""
+import time
+import threading
+
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+class PoolMetrics:
+    """Thread safe checkout counters of a connection pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def record(self, seconds: float, waited: bool = False, overflow: bool = False, timed_out: bool = False):
+        """Counts a checkout attempt
+
+        Args:
+            - seconds: the time spent getting a connection
+            - waited: whether every connection was in use, so the checkout blocked
+            - overflow: whether the checkout opened an overflow connection
+            - timed_out: whether the checkout gave up after the pool timeout
+        """
+
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.overflow_opened += overflow
+            if waited:
+                self.waits += 1
+                self.wait_seconds += seconds
+                self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+
+    def reset(self):
+        """Sets every counter back to zero"""
+
+        with self._lock:
+            self.checkouts = 0
+            self.waits = 0
+            self.timeouts = 0
+            self.overflow_opened = 0
+            self.wait_seconds = 0.0
+            self.max_wait_seconds = 0.0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "waits": self.waits,
+                "timeouts": self.timeouts,
+                "overflow_opened": self.overflow_opened,
+                "wait_ms": round(self.wait_seconds * 1000, 3),
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 3)
+            }
+
+class PoolInstrumentation:
+    """Mixin timing every checkout of a QueuePool, the counters survive pool recreation"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        # same checks as QueuePool._do_get, read before it changes them
+        in_use = self.checkedin() == 0 and self._max_overflow > -1
+        waited = in_use and self._overflow >= self._max_overflow
+        overflow = in_use and 0 <= self._overflow < self._max_overflow
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record(time.perf_counter() - start, waited=True, timed_out=True)
+            raise
+        self.metrics.record(time.perf_counter() - start, waited=waited, overflow=overflow)
+        return connection
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def stats(self) -> dict:
+        """Returns the pool limits, its live connections and the checkout counters"""
+
+        return {
+            "size": self.size(),
+            "max_overflow": self._max_overflow,
+            "timeout": self._timeout,
+            # the most connections this pool opens, per worker process
+            "max_connections": self.size() + max(self._max_overflow, 0),
+            "checked_in": self.checkedin(),
+            "checked_out": self.checkedout(),
+            "overflow": max(self.overflow(), 0),
+            **self.metrics.stats()
+        }
+
+class InstrumentedQueuePool(PoolInstrumentation, QueuePool):
+    """QueuePool for sync engines with checkout metrics"""
+
+class InstrumentedAsyncQueuePool(PoolInstrumentation, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool for async engines with checkout metrics"""
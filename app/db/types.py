@@ -0,0 +1,72 @@
+"""Column types shared by the models
+"""
+import uuid
+from typing import Optional
+
+from sqlalchemy import LargeBinary
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.types import TypeDecorator
+
+def uuid_bytes(value) -> Optional[bytes]:
+    """Returns the 16 bytes of a UUID string, or none if it is malformed
+
+    Only 32 hex digits, optionally hyphenated, are accepted; not the urn or
+    braced forms uuid.UUID also parses.
+    """
+
+    digits = str(value).replace("-", "")
+    if len(digits) != 32:
+        return None
+    # bytes.fromhex is several times faster than parsing a uuid.UUID, it skips
+    # whitespace, so a short result means the digits were not all hex
+    try:
+        raw = bytes.fromhex(digits)
+    except ValueError:
+        return None
+    return raw if len(raw) == 16 else None
+
+def canonical_uuid(value) -> Optional[str]:
+    """Returns a UUID string in its canonical lowercase hyphenated form, or none if it is malformed"""
+
+    raw = uuid_bytes(value)
+    return str(uuid.UUID(bytes=raw)) if raw is not None else None
+
+def is_uuid(value) -> bool:
+    """Checks that a value is a UUID string, as UUIDString accepts it"""
+
+    return uuid_bytes(value) is not None
+
+class UUIDString(TypeDecorator):
+    """A UUID stored as native uuid on postgres and as 16 bytes elsewhere
+
+    Values are str in python, so IDs in responses, tokens and caches keep
+    their canonical form. Binding a malformed ID raises ValueError, callers
+    taking IDs from a request check them with is_uuid first.
+    """
+
+    impl = LargeBinary(16)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(postgresql.UUID(as_uuid=False))
+        return dialect.type_descriptor(LargeBinary(16))
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, uuid.UUID):
+            return str(value) if dialect.name == "postgresql" else value.bytes
+
+        raw = uuid_bytes(value)
+        if raw is None:
+            raise ValueError(f"Malformed UUID: {value!r}")
+        return str(uuid.UUID(bytes=raw)) if dialect.name == "postgresql" else raw
+
+    def process_result_value(self, value, dialect):
+        if value is None or isinstance(value, str):
+            return value
+        if isinstance(value, uuid.UUID):
+            return str(value)
+        digits = bytes(value).hex()
+        return f"{digits[:8]}-{digits[8:12]}-{digits[12:16]}-{digits[16:20]}-{digits[20:]}"
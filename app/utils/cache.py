@@ -0,0 +1,210 @@
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+class TTLCache:
+    """Thread safe in-process LRU cache with per entry expiry
+
+    Entries can be tagged, so every entry of a tag (e.g. a user ID) can be
+    evicted at once.
+
+    Args:
+        - maxsize (int): the maximum number of entries kept
+        - ttl (float): the default time to live of an entry in seconds
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._tags = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Gets a live entry, counting the hit or miss"""
+
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expires_at, _ = entry
+                if expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self._pop(key)
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None, tag: Optional[Hashable] = None):
+        """Adds an entry, evicting the least recently used entry when full
+
+        Args:
+            - key: the entry key
+            - value: the entry value
+            - ttl: seconds the entry lives. Defaults to the cache ttl.
+            - tag: optional tag the entry can be evicted by
+        """
+
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+
+        with self._lock:
+            self._pop(key)
+            self._data[key] = (value, time.monotonic() + ttl, tag)
+            if tag is not None:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._data) > self.maxsize:
+                self._pop(next(iter(self._data)))
+
+    def delete(self, key: Hashable):
+        """Evicts a single entry"""
+
+        with self._lock:
+            self._pop(key)
+
+    def delete_tag(self, tag: Hashable):
+        """Evicts every entry of a tag"""
+
+        with self._lock:
+            for key in list(self._tags.get(tag, ())):
+                self._pop(key)
+
+    def clear(self):
+        """Evicts every entry and resets the counters"""
+
+        with self._lock:
+            self._data.clear()
+            self._tags.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """Returns the cache counters"""
+
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+    def _pop(self, key: Hashable):
+        entry = self._data.pop(key, None)
+        if entry is not None and entry[2] is not None:
+            keys = self._tags.get(entry[2])
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[entry[2]]
+
+class RevocationList:
+    """Thread safe in-process denylist of revoked keys
+
+    Unlike TTLCache nothing is ever evicted before it expires, since evicting
+    a key would silently un-revoke it. Expired keys are pruned as keys are added.
+    """
+
+    def __init__(self):
+        self._data = {}
+        self._next_prune = 0
+        self._lock = threading.Lock()
+
+    def add(self, key: Hashable, ttl: float):
+        """Revokes a key for ttl seconds"""
+
+        now = time.monotonic()
+        with self._lock:
+            self._data[key] = max(self._data.get(key, 0), now + ttl)
+            if now >= self._next_prune:
+                self._data = {k: exp for k, exp in self._data.items() if exp > now}
+                self._next_prune = now + 60
+
+    def __contains__(self, key: Hashable) -> bool:
+        expires_at = self._data.get(key)
+        return expires_at is not None and expires_at > time.monotonic()
+
+    def clear(self):
+        """Removes every revoked key"""
+
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        """Returns the number of tracked keys"""
+
+        return {"size": len(self._data)}
+
+class MemoryByteCache:
+    """In-process async byte cache, entries are per worker
+
+    Args:
+        - maxsize (int): the maximum number of entries kept
+        - ttl (float): the time to live of an entry in seconds
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: bytes):
+        self._cache.set(key, value)
+
+    async def set_many(self, items: dict):
+        for key, value in items.items():
+            self._cache.set(key, value)
+
+    async def delete(self, *keys: str):
+        for key in keys:
+            self._cache.delete(key)
+
+    def clear(self):
+        """Evicts every entry"""
+
+        self._cache.clear()
+
+class RedisByteCache:
+    """Async byte cache kept in redis, entries are shared by all workers
+
+    Args:
+        - url (str): the redis url
+        - ttl (float): the time to live of an entry in seconds
+        - client: an existing redis.asyncio compatible client. Defaults to None.
+    """
+
+    def __init__(self, url: str, ttl: float = 60, client=None):
+        if client is None:
+            try:
+                import redis.asyncio as redis
+            except ImportError as exc:
+                raise RuntimeError("The redis cache backend requires the redis package") from exc
+            client = redis.from_url(url)
+        self.client = client
+        self.ttl = ttl
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(key)
+
+    async def set(self, key: str, value: bytes):
+        await self.client.set(key, value, ex=max(1, int(self.ttl)))
+
+    async def set_many(self, items: dict):
+        """Sets many entries in one round trip"""
+
+        pipeline = self.client.pipeline(transaction=False)
+        for key, value in items.items():
+            pipeline.set(key, value, ex=max(1, int(self.ttl)))
+        await pipeline.execute()
+
+    async def delete(self, *keys: str):
+        if keys:
+            await self.client.delete(*keys)
+
+    def clear(self):
+        """Entries expire on their own in redis"""
@@ -1,6 +1,8 @@
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 
+from app.db.types import is_uuid
+
 def check_model_existence(db: Session, model, id):
     """Checks if a model instance exists by its ID
 
@@ -16,7 +18,8 @@ def check_model_existence(db: Session, model, id):
         obj: the model instance
     """
 
-    obj = db.get(model, ident=id)
+    # a malformed ID names nothing, and would not bind as a UUID
+    obj = db.get(model, ident=id) if is_uuid(id) else None
 
     if not obj:
         raise HTTPException(status_code=404, detail=f"{model.__name__} does not exist")
@@ -0,0 +1,20 @@
+import threading
+
+class Counter:
+    """Thread safe in-process counter"""
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def increment(self, amount: int = 1):
+        """Adds to the counter"""
+
+        with self._lock:
+            self.value += amount
+
+    def reset(self):
+        """Sets the counter back to zero"""
+
+        with self._lock:
+            self.value = 0
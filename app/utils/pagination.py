@@ -0,0 +1,39 @@
+import uuid
+import base64
+import binascii
+from fastapi import HTTPException, status
+
+def encode_cursor(value: str) -> str:
+    """Encodes the sort key of the last row of a page as an opaque cursor
+
+    Args:
+        value (str): the sort key, e.g. a uuid7 ID
+
+    Returns:
+        str: the url safe cursor
+    """
+
+    return base64.urlsafe_b64encode(value.encode()).rstrip(b"=").decode("ascii")
+
+def decode_cursor(cursor: str) -> str:
+    """Decodes a cursor made by encode_cursor
+
+    Args:
+        cursor (str): the cursor
+
+    Raises:
+        HTTPException: 400 for a malformed cursor or one that is not a UUID
+
+    Returns:
+        str: the sort key, a UUID
+    """
+
+    try:
+        value = base64.b64decode(cursor + "=" * (-len(cursor) % 4), altchars=b"-_", validate=True).decode()
+        uuid.UUID(value)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        value = None
+
+    if not value:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return value
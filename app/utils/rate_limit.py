@@ -0,0 +1,118 @@
+import math
+import time
+import threading
+from typing import Tuple
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+def parse_rate(rate: str) -> Tuple[int, int]:
+    """Parses a rate such as "10/minute"
+
+    Args:
+        rate (str): the number of requests per period
+
+    Returns:
+        tuple: the request limit and the window in seconds
+    """
+
+    limit, _, period = rate.partition("/")
+    return int(limit), PERIODS[period.strip()]
+
+def _sliding_count(previous: int, current: int, window: int, now: float) -> float:
+    """Weights the previous window by how much of it still overlaps the sliding window"""
+
+    elapsed = now % window
+    return previous * (window - elapsed) / window + current
+
+def _retry_after(window: int, now: float) -> int:
+    return max(1, math.ceil(window - now % window))
+
+class MemoryRateLimitBackend:
+    """Sliding window counters kept in process, limits apply per worker"""
+
+    def __init__(self):
+        self._counters = {}
+        self._next_prune = 0
+        self._lock = threading.Lock()
+
+    async def hit(self, key: str, limit: int, window: int) -> int:
+        """Counts a request against a key
+
+        Args:
+            - key: the limited identity, e.g. login:ip:127.0.0.1
+            - limit: the number of requests allowed per window
+            - window: the window in seconds
+
+        Returns:
+            int: 0 if the request is allowed, else the seconds to retry after
+        """
+
+        now = time.time()
+        index = int(now // window)
+        with self._lock:
+            current = self._counters.get((key, window, index), 0)
+            previous = self._counters.get((key, window, index - 1), 0)
+            if _sliding_count(previous, current, window, now) >= limit:
+                return _retry_after(window, now)
+            self._counters[(key, window, index)] = current + 1
+
+            if now >= self._next_prune:
+                self._counters = {
+                    counter: count for counter, count in self._counters.items()
+                    if (counter[2] + 2) * counter[1] > now
+                }
+                self._next_prune = now + 60
+        return 0
+
+    def clear(self):
+        """Resets every counter"""
+
+        with self._lock:
+            self._counters.clear()
+
+class RedisRateLimitBackend:
+    """Sliding window counters kept in redis, limits are shared by all workers
+
+    Args:
+        - url (str): the redis url
+        - client: an existing redis.asyncio compatible client. Defaults to None.
+    """
+
+    def __init__(self, url: str, client=None):
+        if client is None:
+            try:
+                import redis.asyncio as redis
+            except ImportError as exc:
+                raise RuntimeError("The redis rate limit backend requires the redis package") from exc
+            client = redis.from_url(url)
+        self.client = client
+
+    async def hit(self, key: str, limit: int, window: int) -> int:
+        """Counts a request against a key in a single round trip
+
+        Args:
+            - key: the limited identity, e.g. login:ip:127.0.0.1
+            - limit: the number of requests allowed per window
+            - window: the window in seconds
+
+        Returns:
+            int: 0 if the request is allowed, else the seconds to retry after
+        """
+
+        now = time.time()
+        index = int(now // window)
+        current_key = f"ratelimit:{key}:{window}:{index}"
+
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.incr(current_key)
+            pipe.expire(current_key, window * 2)
+            pipe.get(f"ratelimit:{key}:{window}:{index - 1}")
+            current, _, previous = await pipe.execute()
+
+        # the counter includes this request
+        if _sliding_count(int(previous or 0), int(current) - 1, window, now) >= limit:
+            return _retry_after(window, now)
+        return 0
+
+    def clear(self):
+        """Counters expire on their own in redis"""
@@ -4,6 +4,17 @@ from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent
 
+PYTHON_ENV = config("PYTHON_ENV", default="dev")
+
+# Connection pool defaults per PYTHON_ENV, sized per worker process. In production
+# 4 gunicorn workers x (10 + 5) = 60 connections, inside the postgres default of 100.
+DB_POOL_DEFAULTS = {
+    "dev": {"size": 5, "max_overflow": 5, "timeout": 10, "recycle": 1800, "pre_ping": True},
+    "test": {"size": 2, "max_overflow": 2, "timeout": 5, "recycle": -1, "pre_ping": False},
+    "production": {"size": 10, "max_overflow": 5, "timeout": 30, "recycle": 1800, "pre_ping": True},
+}
+_pool_defaults = DB_POOL_DEFAULTS.get(PYTHON_ENV, DB_POOL_DEFAULTS["dev"])
+
 class Settings(BaseSettings):
     """class to hold config values
 
@@ -11,6 +22,7 @@ class Settings(BaseSettings):
         BaseSettings
     """
     APP_NAME: str = config("APP_NAME")
+    PYTHON_ENV: str = PYTHON_ENV
 
     # Database configurations
     DB_HOST:str = config("DB_HOST")
@@ -19,12 +31,84 @@ class Settings(BaseSettings):
     DB_PASSWORD: str = config("DB_PASSWORD")
     DB_NAME: str = config("DB_NAME")
     DB_TYPE: str = config("DB_TYPE")
+    # use the AsyncEngine/AsyncSession stack instead of the sync one
+    DB_ASYNC: bool = config("DB_ASYNC", default=False, cast=bool)
+    # Connection pool per worker process, unset values follow DB_POOL_DEFAULTS
+    DB_POOL_SIZE: int = config("DB_POOL_SIZE", default=_pool_defaults["size"], cast=int)
+    DB_MAX_OVERFLOW: int = config("DB_MAX_OVERFLOW", default=_pool_defaults["max_overflow"], cast=int)
+    DB_POOL_TIMEOUT: float = config("DB_POOL_TIMEOUT", default=_pool_defaults["timeout"], cast=float)
+    DB_POOL_RECYCLE: int = config("DB_POOL_RECYCLE", default=_pool_defaults["recycle"], cast=int)
+    DB_POOL_PRE_PING: bool = config("DB_POOL_PRE_PING", default=_pool_defaults["pre_ping"], cast=bool)
+    # Read replica as a sync SQLAlchemy url, unset reads from the primary. Users are kept
+    # on the primary for DB_REPLICA_PIN_SECONDS after they write or get new tokens, so they
+    # read their writes. Pins are kept in memory (per worker) or redis (shared by all workers).
+    DB_REPLICA_URL: str = config("DB_REPLICA_URL", default="")
+    DB_REPLICA_PIN_SECONDS: float = config("DB_REPLICA_PIN_SECONDS", default=5, cast=float)
+    DB_REPLICA_PIN_BACKEND: str = config("DB_REPLICA_PIN_BACKEND", default="memory")
 
     SECRET_KEY: str = config("SECRET_KEY")
     ALGORITHM: str = config("ALGORITHM")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = config("ACCESS_TOKEN_EXPIRE_MINUTES")
+
+    # Asymmetric access token signing, a directory of <kid>.pem keys. Unset signs with SECRET_KEY.
+    JWT_KEYS_DIR: str = config("JWT_KEYS_DIR", default="")
+    JWT_ACTIVE_KID: str = config("JWT_ACTIVE_KID", default="")
+    JWKS_MAX_AGE: int = config("JWKS_MAX_AGE", default=3600, cast=int)
+    # Accept access and refresh tokens with the old base85 claims until they have all expired
+    TOKEN_ACCEPT_LEGACY_CLAIMS: bool = config("TOKEN_ACCEPT_LEGACY_CLAIMS", default=True, cast=bool)
     JWT_REFRESH_EXPIRY: int = config("JWT_REFRESH_EXPIRY")
 
+    # Password hashing policy, see `python -m app.commands.calibrate_password_hash`
+    PASSWORD_HASH_SCHEME: str = config("PASSWORD_HASH_SCHEME", default="bcrypt")
+    BCRYPT_ROUNDS: int = config("BCRYPT_ROUNDS", default=12, cast=int)
+    ARGON2_TIME_COST: int = config("ARGON2_TIME_COST", default=3, cast=int)
+    ARGON2_MEMORY_COST: int = config("ARGON2_MEMORY_COST", default=65536, cast=int)
+    ARGON2_PARALLELISM: int = config("ARGON2_PARALLELISM", default=4, cast=int)
+    PASSWORD_HASH_TARGET_MS: int = config("PASSWORD_HASH_TARGET_MS", default=250, cast=int)
+
+    # Password hashing worker pool, 0 workers runs hashing on the thread executor
+    PASSWORD_HASH_WORKERS: int = config("PASSWORD_HASH_WORKERS", default=2, cast=int)
+    PASSWORD_HASH_QUEUE_SIZE: int = config("PASSWORD_HASH_QUEUE_SIZE", default=64, cast=int)
+    # seconds a request waits for a queue slot before a 503, 0 rejects at once
+    PASSWORD_HASH_QUEUE_TIMEOUT: float = config("PASSWORD_HASH_QUEUE_TIMEOUT", default=1.0, cast=float)
+
+    # Authenticated user cache, entries never outlive their token. A ttl of 0 disables it
+    AUTH_CACHE_SIZE: int = config("AUTH_CACHE_SIZE", default=10000, cast=int)
+    AUTH_CACHE_TTL: int = config("AUTH_CACHE_TTL", default=60, cast=int)
+    # trust access token claims without a database lookup, only checking revocations
+    AUTH_STATELESS: bool = config("AUTH_STATELESS", default=False, cast=bool)
+
+    # Expired user token sweeper, an interval of 0 disables the in-app sweep
+    TOKEN_SWEEP_INTERVAL_SECONDS: int = config("TOKEN_SWEEP_INTERVAL_SECONDS", default=3600, cast=int)
+    TOKEN_SWEEP_BATCH_SIZE: int = config("TOKEN_SWEEP_BATCH_SIZE", default=1000, cast=int)
+    TOKEN_RETENTION_HOURS: float = config("TOKEN_RETENTION_HOURS", default=24, cast=float)
+
+    # Cached profile responses: memory (per worker), redis (shared) or none
+    PROFILE_CACHE_BACKEND: str = config("PROFILE_CACHE_BACKEND", default="memory")
+    PROFILE_CACHE_SIZE: int = config("PROFILE_CACHE_SIZE", default=10000, cast=int)
+    PROFILE_CACHE_TTL: int = config("PROFILE_CACHE_TTL", default=300, cast=int)
+
+    # Cached user listing totals per filter combination, kept per worker, 0 disables
+    USER_COUNT_CACHE_TTL: int = config("USER_COUNT_CACHE_TTL", default=300, cast=int)
+
+    # Bulk user imports, rows validated and written per transaction
+    USER_IMPORT_BATCH_SIZE: int = config("USER_IMPORT_BATCH_SIZE", default=1000, cast=int)
+    # Bulk admin actions, users changed per UPDATE and transaction
+    USER_BULK_CHUNK_SIZE: int = config("USER_BULK_CHUNK_SIZE", default=1000, cast=int)
+
+    # Email link tokens, legacy bcrypt tokens are accepted during the migration window
+    EMAIL_TOKEN_EXPIRE_MINUTES: int = config("EMAIL_TOKEN_EXPIRE_MINUTES", default=1440, cast=int)
+    EMAIL_TOKEN_ACCEPT_LEGACY: bool = config("EMAIL_TOKEN_ACCEPT_LEGACY", default=True, cast=bool)
+
+    # Auth rate limits as "<requests>/<second|minute|hour|day>", redis shares them across workers
+    RATE_LIMIT_ENABLED: bool = config("RATE_LIMIT_ENABLED", default=True, cast=bool)
+    RATE_LIMIT_BACKEND: str = config("RATE_LIMIT_BACKEND", default="memory")
+    REDIS_URL: str = config("REDIS_URL", default="redis://localhost:6379/0")
+    RATE_LIMIT_LOGIN: str = config("RATE_LIMIT_LOGIN", default="10/minute")
+    RATE_LIMIT_REGISTER: str = config("RATE_LIMIT_REGISTER", default="5/minute")
+    RATE_LIMIT_FORGOT_PASSWORD: str = config("RATE_LIMIT_FORGOT_PASSWORD", default="3/minute")
+    RATE_LIMIT_REFRESH: str = config("RATE_LIMIT_REFRESH", default="30/minute")
+
     MAIL_USERNAME: str = config("MAIL_USERNAME")
     MAIL_PASSWORD: str = config("MAIL_PASSWORD")
     MAIL_PORT: int = config("MAIL_PORT", default=1025)
@@ -1,8 +1,9 @@
 from fastapi import Depends
-from sqlalchemy import Column, String, ForeignKey, DateTime, func
+from sqlalchemy import Column, DateTime, func
 from uuid_extensions import uuid7
 
 from app.db.database import Base
+from app.db.types import UUIDString
 
 class BaseTableModel(Base):
     """Base model all other model inherits from
@@ -12,7 +13,8 @@ class BaseTableModel(Base):
     """
     __abstract__ = True
 
-    id = Column(String, primary_key=True, index=True, default=lambda: str(uuid7()))
+    # the primary key is already indexed, uuid7 keeps inserts at the end of it
+    id = Column(UUIDString, primary_key=True, default=lambda: str(uuid7()))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
@@ -1,11 +1,12 @@
 from sqlalchemy import Column, String, ForeignKey
 from sqlalchemy.orm import relationship
+from app.db.types import UUIDString
 from .base_model import BaseTableModel
 
 class OAuth(BaseTableModel):
     __tablename__ = "oauth"
 
-    user_id = Column(String, ForeignKey('users.id', ondelete="CASCADE"), unique=True, nullable=False)
+    user_id = Column(UUIDString, ForeignKey('users.id', ondelete="CASCADE"), unique=True, nullable=False)
     provider = Column(String, nullable=False)
     sub = Column(String, nullable=False)
     access_token = Column(String, nullable=False)
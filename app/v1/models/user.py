@@ -1,9 +1,21 @@
-from sqlalchemy import Column, String, ForeignKey, Boolean, text, DateTime
+from sqlalchemy import Column, String, ForeignKey, Boolean, text, DateTime, Index
 from sqlalchemy.orm import relationship, mapped_column
 from .base_model import BaseTableModel
 
 class User(BaseTableModel):
     __tablename__ = "users"
+    __table_args__ = (
+        # admin listings of live users in id order: is_deleted = false ORDER BY id
+        Index("ix_users_live_id", "id", postgresql_where=text("is_deleted = false"), sqlite_where=text("is_deleted = 0")),
+        # live users by status: is_deleted = false AND is_active = ? ORDER BY id, is_verified is
+        # filtered from it since activation sets both flags
+        Index(
+            "ix_users_live_active_id", "is_active", "id",
+            postgresql_where=text("is_deleted = false"), sqlite_where=text("is_deleted = 0")
+        ),
+        # superadmins: is_superadmin = true
+        Index("ix_users_superadmin_id", "id", postgresql_where=text("is_superadmin = true"), sqlite_where=text("is_superadmin = 1")),
+    )
 
     email = Column(String, unique=True, nullable=False)
     password = Column(String, nullable=True)
@@ -17,7 +29,8 @@ class User(BaseTableModel):
     deleted_at = Column(DateTime(timezone=True), nullable=True, default=None)
 
     oauth = relationship("OAuth", uselist=False, back_populates="user", cascade="all, delete-orphan")
-    tokens = relationship("UserToken", back_populates="user")
+    # never loaded whole, query it with user.tokens.select()
+    tokens = relationship("UserToken", back_populates="user", lazy="write_only", passive_deletes=True)
 
     def to_dict(self):
         obj_dict = super().to_dict()
@@ -36,6 +49,12 @@ class User(BaseTableModel):
 
 class UserToken(BaseTableModel):
     __tablename__ = "user_tokens"
+    __table_args__ = (
+        # live sessions of a user: user_id = ? AND expires_at > ?
+        Index("ix_user_tokens_user_id_expires_at", "user_id", "expires_at"),
+        # expired token sweep: expires_at < ?
+        Index("ix_user_tokens_expires_at", "expires_at"),
+    )
 
     user_id = mapped_column(ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
     access_key = Column(String(250), nullable=True, index=True, default=None)
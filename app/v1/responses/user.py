@@ -1,14 +1,17 @@
-from typing import Union
-from typing_extensions import List
+from typing import Union, Optional
+from typing_extensions import List, Annotated
 from datetime import datetime
-from pydantic import EmailStr
+from pydantic import WithJsonSchema
 from app.core.base.responses import BaseResponse, BaseResponseData
 
+# emails are validated as EmailStr when written, so responses only document the format
+StoredEmail = Annotated[str, WithJsonSchema({"type": "string", "format": "email"})]
+
 class UserResponseData(BaseResponseData):
     """Schema for get user data response"""
 
     id: str
-    email: EmailStr
+    email: StoredEmail
     last_name: str
     first_name: str
     is_active: bool = False
@@ -38,7 +41,7 @@ class SuperAdminUserResponseData(BaseResponseData):
     """Schema for super admin fetch user data"""
 
     id: str
-    email: EmailStr
+    email: StoredEmail
     last_name: str
     first_name: str
     is_active: bool = True  
@@ -64,5 +67,27 @@ class FetchAllUsersResponse(BaseResponse):
 
     page: int = 1
     per_page: int = 10
-    total: int = 0
-    data: List[SuperAdminUserResponseData]
\ No newline at end of file
+    # none when the count is skipped with ?count=none
+    total: Optional[int] = 0
+    next_cursor: Optional[str] = None
+    data: List[SuperAdminUserResponseData]
+
+class UserSessionData(BaseResponseData):
+    """Schema for a user session (live token) data"""
+
+    id: str
+    created_at: Union[str, None, datetime] = None
+    expires_at: Union[str, None, datetime] = None
+    current: bool = False
+
+class FetchUserSessionsResponse(BaseResponse):
+    """Schema for fetch user sessions response"""
+
+    limit: int = 20
+    next_cursor: Optional[str] = None
+    data: List[UserSessionData]
+
+class RevokeUserSessionsResponse(BaseResponse):
+    """Schema for revoke user sessions response"""
+
+    revoked: int = 0
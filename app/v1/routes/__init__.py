@@ -2,9 +2,11 @@ from fastapi import APIRouter
 from app.v1.routes.google_auth import google_auth
 from app.v1.routes.auth import auth
 from app.v1.routes.user import user_router
+from app.v1.routes.metrics import metrics_router
 
 api_version_one = APIRouter(prefix="/api/v1")
 
 api_version_one.include_router(auth)
 api_version_one.include_router(google_auth)
-api_version_one.include_router(user_router)
\ No newline at end of file
+api_version_one.include_router(user_router)
+api_version_one.include_router(metrics_router)
\ No newline at end of file
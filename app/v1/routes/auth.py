@@ -2,11 +2,12 @@ from fastapi import APIRouter, Depends, Request, status, BackgroundTasks
 from sqlalchemy.orm import Session
 from typing import Annotated
 
-from app.db.database import get_db
+from app.db.database import get_session
 from app.v1.services.user import user_service
 from app.v1.models.user import User
 from app.utils.success_response import success_response
 from app.core.dependencies.user import get_current_user
+from app.core.dependencies.rate_limit import auth_rate_limit
 from app.v1.schemas.user import (
     RegisterUserRequest,  VerifyUserRequest, EmailRequest, ResetRequest, LoginRequest
 )
@@ -14,13 +15,13 @@ from app.v1.responses.user import (
     RegisterUserResponse, UserLoginResponse, RefreshTokenResponse
     )
 
-auth = APIRouter(prefix="/auth", tags=["Authentication"])
+auth = APIRouter(prefix="/auth", tags=["Authentication"], dependencies=[Depends(auth_rate_limit)])
 
 @auth.post("/register", status_code=status.HTTP_201_CREATED, response_model=RegisterUserResponse)
 async def register_user(
     data: RegisterUserRequest,
     background_tasks: BackgroundTasks,
-    db: Annotated[Session, Depends(get_db)]
+    db: Annotated[Session, Depends(get_session)]
 ):
     """Register a new user
 
@@ -39,7 +40,7 @@ async def register_user(
 async def verify_user_account(
     data: VerifyUserRequest,
     background_tasks: BackgroundTasks,
-    db: Annotated[Session, Depends(get_db)]
+    db: Annotated[Session, Depends(get_session)]
 ):
     """Verifies a registered user's account
 
@@ -57,23 +58,25 @@ async def verify_user_account(
 @auth.post("/login", status_code=status.HTTP_200_OK, response_model=UserLoginResponse)
 async def user_login(
     data: LoginRequest,
-    db: Annotated[Session, Depends(get_db)]
+    background_tasks: BackgroundTasks,
+    db: Annotated[Session, Depends(get_session)]
 ):
     """Login a user
 
     Args:
         - data (LoginRequest): request username and password
+        - background_tasks: background task to rehash outdated passwords
         - db: the database session
 
     Returns:
         - dict: the user data with tokens
     """
     
-    return await user_service.get_login_token(data, db)
+    return await user_service.get_login_token(data, db, background_tasks)
 
 @auth.post("/refresh", status_code=status.HTTP_200_OK, response_model=RefreshTokenResponse)
 async def refresh_token(
-    db: Annotated[Session, Depends(get_db)],
+    db: Annotated[Session, Depends(get_session)],
     request: Request
 ):
     """Refreshes expired access token
@@ -93,7 +96,7 @@ async def refresh_token(
 async def forgot_password(
     data: EmailRequest,
     background_tasks: BackgroundTasks,
-    db: Annotated[Session, Depends(get_db)]
+    db: Annotated[Session, Depends(get_session)]
 ):
     """Endpoint for users to request a password change email
 
@@ -111,7 +114,7 @@ async def forgot_password(
 @auth.put("/reset-password", status_code=status.HTTP_200_OK, response_model=success_response)
 async def reset_password(
     data: ResetRequest,
-    db: Annotated[Session, Depends(get_db)]
+    db: Annotated[Session, Depends(get_session)]
 ):
     """Resets a users password
 
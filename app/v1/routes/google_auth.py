@@ -6,7 +6,7 @@ from authlib.integrations.base_client import OAuthError
 from authlib.oauth2.rfc6749 import OAuth2Token
 import secrets
 
-from app.db.database import get_db
+from app.db.database import get_session
 from app.core.config.google_oauth_config import google_oauth
 from app.v1.services.google_oauth import GoogleOAuthService
 
@@ -31,7 +31,7 @@ async def google_oauth2(request: Request) -> RedirectResponse:
     return response
 
 @google_auth.get("/callback/google")
-async def google_oauth2_callback(request: Request, db: Annotated[Session, Depends(get_db)]) -> Response:
+async def google_oauth2_callback(request: Request, db: Annotated[Session, Depends(get_session)]) -> Response:
     """Handles request from google after user has agreed to authenticate with google account 
 
     Args:
@@ -76,6 +76,6 @@ async def google_oauth2_callback(request: Request, db: Annotated[Session, Depend
 
         # create oauth data for the user 
         google_oauth_service = GoogleOAuthService()
-        return google_oauth_service.create(google_response, db)
+        return await google_oauth_service.create(google_response, db)
     except Exception as exc:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Exception occured; {exc}")
\ No newline at end of file
@@ -0,0 +1,88 @@
+from fastapi import APIRouter, Depends, status
+from sqlalchemy.orm import Session
+from typing import Annotated
+
+from app.db.database import get_session, run_db, pool_stats, connection_limits
+from app.v1.models.user import User
+from app.core.config.security import principal_cache
+from app.core.dependencies.user import get_current_superadmin, principal_resolutions
+from app.v1.services.token_sweeper import token_sweeper
+from app.v1.services.profile_cache import profile_cache
+from app.utils.success_response import success_response
+
+metrics_router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+@metrics_router.get("/auth-cache", status_code=status.HTTP_200_OK)
+async def get_auth_cache_metrics(user: Annotated[User, Depends(get_current_superadmin)]):
+    """Endpoint for superadmin to read the authenticated user cache counters
+
+    Args:
+        user: the current authenticated superadmin
+
+    Returns:
+        dict: the cache size, hits and misses and the principal resolutions
+    """
+
+    return success_response(
+        status_code=200,
+        message="Successfully fetched auth cache metrics",
+        data={**principal_cache.stats(), "resolutions": principal_resolutions.value}
+    )
+
+@metrics_router.get("/token-sweeper", status_code=status.HTTP_200_OK)
+async def get_token_sweeper_metrics(user: Annotated[User, Depends(get_current_superadmin)]):
+    """Endpoint for superadmin to read the last expired token sweep
+
+    Args:
+        user: the current authenticated superadmin
+
+    Returns:
+        dict: the rows removed and time taken by the last sweep
+    """
+
+    return success_response(
+        status_code=200,
+        message="Successfully fetched token sweeper metrics",
+        data=token_sweeper.last_run
+    )
+
+@metrics_router.get("/profile-cache", status_code=status.HTTP_200_OK)
+async def get_profile_cache_metrics(user: Annotated[User, Depends(get_current_superadmin)]):
+    """Endpoint for superadmin to read the profile cache counters
+
+    Args:
+        user: the current authenticated superadmin
+
+    Returns:
+        dict: the cache backend, hits and misses
+    """
+
+    return success_response(
+        status_code=200,
+        message="Successfully fetched profile cache metrics",
+        data=profile_cache.stats()
+    )
+
+@metrics_router.get("/db-pool", status_code=status.HTTP_200_OK)
+async def get_db_pool_metrics(
+    user: Annotated[User, Depends(get_current_superadmin)],
+    db: Annotated[Session, Depends(get_session)]
+):
+    """Endpoint for superadmin to read the connection pool counters of this worker
+
+    Multiply the pool max_connections by the worker count and compare it with
+    the database max_connections when sizing the pools.
+
+    Args:
+        - user: the current authenticated superadmin
+        - db: the database session
+
+    Returns:
+        dict: the pool limits and counters, and the database connection limits on postgres
+    """
+
+    return success_response(
+        status_code=200,
+        message="Successfully fetched db pool metrics",
+        data={"pools": pool_stats(), "database": await run_db(db, connection_limits)}
+    )
@@ -1,41 +1,97 @@
-from fastapi import APIRouter, Depends, status, Query
+import io
+from fastapi import APIRouter, BackgroundTasks, Depends, status, Query, UploadFile
 from sqlalchemy.orm import Session
-from typing import Annotated, Optional
+from typing import Annotated, Literal, Optional
 
-from app.db.database import get_db
+from app.db.database import get_session
 from app.v1.services.user import user_service
+from app.v1.services.user_import import user_importer, import_format
 from app.v1.models.user import User
-from app.core.dependencies.user import get_current_user, get_current_superadmin
-from app.v1.schemas.user import UpdateUserRequest
-from app.v1.responses.user import FetchUserResponse, FetchAllUsersResponse
+from app.core.dependencies.user import (
+    get_current_user, get_current_superadmin, get_current_token_id,
+    get_read_session, get_current_reader, get_current_superadmin_reader
+    )
+from app.v1.schemas.user import UpdateUserRequest, BulkUsersRequest
+from app.utils.success_response import success_response
+from app.v1.responses.user import (
+    FetchUserResponse, FetchAllUsersResponse, FetchUserSessionsResponse, RevokeUserSessionsResponse
+    )
 
 user_router = APIRouter(prefix="/users", tags=["Users"])
 
 @user_router.get("/me", status_code=status.HTTP_200_OK, response_model=FetchUserResponse)
-async def get_current_user_details(user: Annotated[User, Depends(get_current_user)]):
+async def get_current_user_details(
+    user: Annotated[User, Depends(get_current_reader)],
+    db: Annotated[Session, Depends(get_read_session)]
+):
     """Endpoint to fetch the current authenticated user details
 
     Args:
-        user: the current authenticated user
+        - user: the current authenticated user
+        - db: the read session, the replica unless the user is pinned to the primary
 
     Returns:
         dict: the user obj
     """
 
-    return user_service.fetch_me(user)
+    return await user_service.fetch_me(user, db)
+
+@user_router.get("/me/sessions", status_code=status.HTTP_200_OK, response_model=FetchUserSessionsResponse)
+async def get_current_user_sessions(
+    user: Annotated[User, Depends(get_current_reader)],
+    token_id: Annotated[str, Depends(get_current_token_id)],
+    db: Annotated[Session, Depends(get_read_session)],
+    limit: Annotated[int, Query(ge=1, le=100, description="Number of sessions per page")] = 20,
+    after: Annotated[Optional[str], Query(description="next_cursor of the previous page")] = None
+):
+    """Endpoint to list the live sessions of the current authenticated user
+
+    Args:
+        - user: the current authenticated user
+        - token_id: the ID of the current session
+        - db: the read session, the replica unless the user is pinned to the primary
+        - limit: the number of sessions per page. Defaults to 20.
+        - after: the cursor of the page to fetch. Defaults to None.
+
+    Returns:
+        dict: the sessions and the cursor of the next page
+    """
+
+    return await user_service.fetch_sessions(db, user, token_id, limit, after)
+
+@user_router.delete("/me/sessions", status_code=status.HTTP_200_OK, response_model=RevokeUserSessionsResponse)
+async def revoke_current_user_sessions(
+    user: Annotated[User, Depends(get_current_user)],
+    token_id: Annotated[str, Depends(get_current_token_id)],
+    db: Annotated[Session, Depends(get_session)],
+    keep_current: Annotated[bool, Query(description="Keep the session of this request")] = False
+):
+    """Endpoint to sign the current authenticated user out of all sessions
+
+    Args:
+        - user: the current authenticated user
+        - token_id: the ID of the current session
+        - db: the database session
+        - keep_current: whether to keep the current session. Defaults to False.
+
+    Returns:
+        dict: the number of revoked sessions
+    """
+
+    return await user_service.revoke_sessions(db, user.id, token_id if keep_current else None)
 
 @user_router.get("/{user_id}", status_code=status.HTTP_200_OK, response_model=FetchUserResponse)
-def get_user_by_id(
+async def get_user_by_id(
     user_id: Annotated[str, "ID of the user to fetch"],
-    user: Annotated[User, Depends(get_current_superadmin)],
-    db: Annotated[Session, Depends(get_db)]
+    user: Annotated[User, Depends(get_current_superadmin_reader)],
+    db: Annotated[Session, Depends(get_read_session)]
 ):
     """Endpoint for superadmin to get a user by ID
 
     Args:
         - user_id: the user ID to fetch
         - user: the current authenticated superadmin
-        - db: the database session.
+        - db: the read session, the replica unless the user is pinned to the primary
 
     Raises:
         - HTTPException: 404 for non-existing request ID
@@ -45,13 +101,81 @@ def get_user_by_id(
         dict: user obj
     """
 
-    return user_service.fetch(db, user_id)
+    return await user_service.fetch(db, user_id)
+
+@user_router.post("/import", status_code=status.HTTP_200_OK)
+async def import_users(
+    file: Annotated[UploadFile, "CSV with a header row or NDJSON, one user per row"],
+    user: Annotated[User, Depends(get_current_superadmin)],
+    db: Annotated[Session, Depends(get_session)],
+    background_tasks: BackgroundTasks,
+    format: Annotated[Optional[Literal["csv", "ndjson"]], Query(description="Defaults to the file extension")] = None,
+    send_verification: Annotated[bool, Query(description="Email imported unverified users a verification link")] = False
+):
+    """Endpoint for superadmin to import users in bulk
+
+    Rows carry email, first_name, last_name and optionally an existing password
+    hash and is_verified. Invalid rows and existing emails are rejected, the
+    rest are imported.
+
+    Args:
+        - file: the users to import
+        - user: the current authenticated superadmin
+        - db: the database session
+        - background_tasks: sends the verification emails
+        - format: csv or ndjson. Defaults to the file extension.
+        - send_verification: queue verification emails for unverified users. Defaults to false.
+
+    Raises:
+        - HTTPException: 400 for an unknown import format
+        - HTTPException: 403 for authenticated users who are not superadmins
+        - HTTPException: 401 for unauthenticated users
+
+    Returns:
+        dict: the rows imported and rejected and the rows per second
+    """
+
+    format = import_format(file.filename, format)
+    with io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="") as lines:
+        report = await user_importer.run(db, lines, format, send_verification=send_verification, background_tasks=background_tasks)
+
+    return success_response(
+        status_code=200,
+        message=f"Imported {report['imported']} users, rejected {report['rejected']}",
+        data=report
+    )
+
+@user_router.post("/bulk/{action}", status_code=status.HTTP_200_OK)
+async def bulk_update_users(
+    action: Annotated[Literal["delete", "activate", "deactivate", "revoke-sessions"], "The action to apply"],
+    data: Annotated[BulkUsersRequest, "User IDs or the filters of get_all_users"],
+    user: Annotated[User, Depends(get_current_superadmin)],
+    db: Annotated[Session, Depends(get_session)]
+):
+    """Endpoint for superadmin to soft delete, activate, deactivate or sign out many users
+
+    Args:
+        - action: delete, activate, deactivate or revoke-sessions
+        - data: the IDs of the users, or boolean filters selecting them
+        - user: the current authenticated superadmin
+        - db: the database session
+
+    Raises:
+        - HTTPException: 422 for requests with both or neither of IDs and filters
+        - HTTPException: 403 for authenticated users who are not superadmins
+        - HTTPException: 401 for unauthenticated users
+
+    Returns:
+        dict: the number of users changed and sessions revoked
+    """
+
+    return await user_service.bulk_update(db, user, action, data)
 
 @user_router.patch("", status_code=status.HTTP_200_OK, response_model=FetchUserResponse)
-def update_current_user(
+async def update_current_user(
     data: Annotated[UpdateUserRequest, "User must be verified, active and not deleted"],
     user: Annotated[User, Depends(get_current_user)],
-    db: Annotated[Session, Depends(get_db)]
+    db: Annotated[Session, Depends(get_session)]
 ):
     """Endpoint for the current authenticated user to update their details
 
@@ -64,14 +188,14 @@ def update_current_user(
         dict: updated user obj
     """
 
-    return user_service.update(db, user, data)
+    return await user_service.update(db, user, data)
 
 @user_router.patch("/{user_id}", status_code=status.HTTP_200_OK, response_model=FetchUserResponse)
-def update_user(
+async def update_user(
     user_id: Annotated[str, "ID of the user to update"],
     data: Annotated[UpdateUserRequest, "User must be verified, active and not deleted"],
     user: Annotated[User, Depends(get_current_superadmin)],
-    db: Annotated[Session, Depends(get_db)]
+    db: Annotated[Session, Depends(get_session)]
 ):
     """Endpoint for superadmin to update a users detail
 
@@ -85,13 +209,13 @@ def update_user(
         dict: updated user obj
     """
 
-    return user_service.update(db, user, data, user_id)
+    return await user_service.update(db, user, data, user_id)
 
 @user_router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_user(
+async def delete_user(
     user_id: Annotated[str, "ID of the user to delete"],
     user: Annotated[User, Depends(get_current_superadmin)],
-    db: Annotated[Session, Depends(get_db)]
+    db: Annotated[Session, Depends(get_session)]
 ):
     """Endpoint to soft delete a user
 
@@ -108,14 +232,16 @@ def delete_user(
         - HTTPException: 400 for requests by non superadmin whose request ID do not match their ID
     """
     
-    return user_service.delete(db, user, user_id)
+    return await user_service.delete(db, user, user_id)
 
 @user_router.get("", status_code=status.HTTP_200_OK, response_model=FetchAllUsersResponse)
-def get_all_users(
-    user: Annotated[User, Depends(get_current_superadmin)],
-    db: Annotated[Session, Depends(get_db)],
+async def get_all_users(
+    user: Annotated[User, Depends(get_current_superadmin_reader)],
+    db: Annotated[Session, Depends(get_read_session)],
     page: Annotated[int, Query(ge=1, description="Page Number (starts from 1)")] = 1,
     per_page: Annotated[int, Query(ge=1, description="Number of users per page")] = 10,
+    after: Annotated[Optional[str], Query(description="next_cursor of the previous page, replaces page")] = None,
+    count: Annotated[Literal["exact", "estimated", "none"], Query(description="How the total is computed")] = "exact",
     is_active: Annotated[Optional[bool], Query()] = None,
     is_verified: Annotated[Optional[bool], Query()] = None,
     is_deleted: Annotated[Optional[bool], Query()] = None,
@@ -125,9 +251,11 @@ def get_all_users(
 
     Args:
         - user: the current authenticated superadmin
-        - db: the database session
+        - db: the read session, the replica unless the user is pinned to the primary
         - page: current page parameter
         - per_page: number of data per page parameter
+        - after: the cursor of the page to fetch, replaces page
+        - count: exact, estimated (postgres planner estimate) or none to skip the total. Defaults to exact.
         - is_active: boolean to filter active users
         - is_verified: boolean to filter verified users
         - is_deleted: boolean to filter deleted users
@@ -143,4 +271,4 @@ def get_all_users(
         "is_deleted": is_deleted,
         "is_superadmin": is_superadmin
     }
-    return user_service.fetch_all(db, page, per_page, **query_params)
\ No newline at end of file
+    return await user_service.fetch_all(db, page, per_page, after, count, **query_params)
\ No newline at end of file
@@ -1,5 +1,8 @@
-from typing import Annotated, Optional
-from pydantic import BaseModel, EmailStr, StringConstraints, model_validator
+from typing import Annotated, List, Optional
+from pydantic import BaseModel, EmailStr, StringConstraints, model_validator, field_validator
+
+from app.core.config.security import pwd_context
+from app.db.types import is_uuid
 
 class RegisterUserRequest(BaseModel):
     """Schema to register a user"""
@@ -92,4 +95,65 @@ class UpdateUserRequest(BaseModel):
 
     first_name: Annotated[str, Optional] = None
     last_name: Annotated[str, Optional] = None
-    email: Annotated[EmailStr, Optional] = None
\ No newline at end of file
+    email: Annotated[EmailStr, Optional] = None
+
+class ImportUserRow(BaseModel):
+    """Schema of a row of a bulk user import"""
+
+    email: EmailStr
+    # an existing bcrypt or argon2 hash, users without one set a password through a reset
+    password: Optional[str] = None
+    first_name: Annotated[str, StringConstraints(
+        min_length=3,
+        max_length=30,
+        strip_whitespace=True
+    )]
+    last_name: Annotated[str, StringConstraints(
+        min_length=3,
+        max_length=30,
+        strip_whitespace=True
+    )]
+    is_verified: bool = False
+
+    @field_validator('password')
+    @classmethod
+    def validate_password_hash(cls, password: Optional[str]):
+        """Function to validate the password is a hash the app can verify"""
+
+        if password is not None and pwd_context.identify(password) is None:
+            raise ValueError("password must be a supported password hash")
+
+        return password
+
+class BulkUsersRequest(BaseModel):
+    """Schema selecting the users of a bulk action, by IDs or by the listing filters"""
+
+    ids: Optional[List[str]] = None
+    is_active: Optional[bool] = None
+    is_verified: Optional[bool] = None
+    is_deleted: Optional[bool] = None
+    is_superadmin: Optional[bool] = None
+
+    def filters(self) -> dict:
+        """Returns the filters that are set"""
+
+        return self.model_dump(exclude={"ids"}, exclude_none=True)
+
+    @field_validator('ids')
+    @classmethod
+    def validate_ids(cls, ids: Optional[List[str]]):
+        """Function to validate the selected IDs are UUIDs"""
+
+        if ids is not None and not all(is_uuid(id) for id in ids):
+            raise ValueError("ids must be UUIDs")
+
+        return ids
+
+    @model_validator(mode='after')
+    def validate_selection(self):
+        """Function to validate users are selected by IDs or by filters, not both"""
+
+        if (self.ids is None) == (not self.filters()):
+            raise ValueError("select users by ids or by at least one filter")
+
+        return self
@@ -2,13 +2,12 @@ from fastapi import BackgroundTasks
 
 from app.v1.models.user import User
 from app.core.base.email import BaseEmailSender
-from app.core.config.security import hash_password
+from app.core.config.security import generate_email_token
 from app.utils.email_context import USER_VERIFY_ACCOUNT, FORGOT_PASSWORD
 
 class SendAccountVerificationEmail(BaseEmailSender):
     async def send(self, user: User, background_tasks: BackgroundTasks):
-        string_context = user.get_context_string(USER_VERIFY_ACCOUNT)
-        token = hash_password(string_context) # hashed token
+        token = generate_email_token(user, USER_VERIFY_ACCOUNT)
         activate_url = f"{self.fronted_host}/auth/account-verify?token={token}&email={user.email}"
         data = {
             'app_name': self.app_name,
@@ -30,8 +29,7 @@ class SendAccountActivationConfirmationEmail(BaseEmailSender):
 
 class SendPasswordResetEmail(BaseEmailSender):
     async def send(self, user: User, background_tasks: BackgroundTasks):
-        string_context = f"{user.get_context_string(FORGOT_PASSWORD)}"
-        token = hash_password(string_context) # hashed token
+        token = generate_email_token(user, FORGOT_PASSWORD)
         reset_url = f"{self.fronted_host}/reset-password?token={token}&email={user.email}"
         data = {
             'app_name': self.app_name,
@@ -1,11 +1,13 @@
 from fastapi import Depends, HTTPException, status
 from datetime import datetime, timezone
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Annotated, Union
 
-from app.db.database import get_db
+from app.db.database import get_session, run_db
 from app.v1.models.user import User
 from app.v1.models.oauth import OAuth
+from app.v1.services.user_counts import user_counts, user_flags
 from app.core.base.services import Service
 from app.utils.logger import logger
 from app.v1.schemas.google_oauth import UserData, Tokens, StatusResponse
@@ -17,16 +19,20 @@ class GoogleOAuthService(Service):
     Args:
         Service (cls): A class with abstract methods for services
     """
-    def create(self, google_response: dict, db: Annotated[Session, Depends(get_db)]) -> object:
+    async def create(self, google_response: dict, db: Annotated[Union[Session, AsyncSession], Depends(get_session)]) -> object:
         """Create a user using information gotten from google 
 
         Args:
             google_response (dict): The raw data from google oauth2
-            db (Annotated[Session, Depends): Database session to manage the database operations 
+            db (Annotated[Session, Depends): Database session to manage the database operations, sync or async
 
         Returns:
             object: A new user object 
         """
+        return await run_db(db, self._create, google_response)
+
+    def _create(self, db: Session, google_response: dict) -> object:
+        """Creates or updates the google user within a sync session"""
         try:
             # check for the user info from google auth 
             user_info: dict = google_response.get("userinfo")
@@ -84,6 +90,7 @@ class GoogleOAuthService(Service):
                     # commit to get the user_id
                     db.add(new_user)
                     db.commit()
+                    user_counts.apply(new=user_flags(new_user))
 
                     print(f"GOOGLE ACCESS TOKEN IS {google_response.get('access_token')}")
                     # oauth data 
@@ -131,7 +138,7 @@ class GoogleOAuthService(Service):
         """Delete method
         """
 
-    def update(self, oauth_data: object, google_response: dict, db: Annotated[Session, Depends(get_db)]) -> None:
+    def update(self, oauth_data: object, google_response: dict, db: Annotated[Session, Depends(get_session)]) -> None:
         """Updates a users information in the OAuth table
 
         Args:
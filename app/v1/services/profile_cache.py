@@ -0,0 +1,114 @@
+from datetime import datetime
+from typing import Optional
+
+from app.utils.cache import MemoryByteCache, RedisByteCache
+from app.utils.metrics import Counter
+from app.utils.settings import settings
+from app.utils.logger import logger
+
+# response views cached per user
+PROFILE_VIEWS = ("me", "admin")
+
+# part of every key, bump it when a cached response schema changes so entries
+# written by an older release are never served
+PROFILE_CACHE_VERSION = 1
+
+def get_profile_cache_backend():
+    """Returns the configured profile cache backend, redis is shared by all workers"""
+
+    if settings.PROFILE_CACHE_BACKEND == "redis":
+        return RedisByteCache(settings.REDIS_URL, ttl=settings.PROFILE_CACHE_TTL)
+    if settings.PROFILE_CACHE_BACKEND == "memory":
+        return MemoryByteCache(maxsize=settings.PROFILE_CACHE_SIZE, ttl=settings.PROFILE_CACHE_TTL)
+    return None
+
+class ProfileCache:
+    """Serialized user profile responses, keyed by schema version, view and user ID
+
+    Each entry records the user's updated_at, so a caller holding a fresher
+    user treats it as a miss. Writes to a user evict its entries. Backend
+    errors are logged and treated as misses, the database stays the source of truth.
+
+    Args:
+        backend: a byte cache backend, or none to disable caching
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend
+        self.hits = Counter()
+        self.misses = Counter()
+
+    @staticmethod
+    def _key(user_id: str, view: str) -> str:
+        return f"profile:v{PROFILE_CACHE_VERSION}:{view}:{user_id}"
+
+    @staticmethod
+    def _version(updated_at: Optional[datetime]) -> bytes:
+        return updated_at.isoformat().encode() if updated_at else b""
+
+    async def get(self, user_id: str, view: str, updated_at: Optional[datetime] = None) -> Optional[bytes]:
+        """Gets the cached response body of a user view
+
+        Args:
+            - user_id: the ID of the user
+            - view: the response view, me or admin
+            - updated_at: the user's known updated_at, older entries are misses. Defaults to None.
+
+        Returns:
+            bytes | none: the response body or none on a miss
+        """
+
+        if self.backend is None:
+            return None
+        try:
+            entry = await self.backend.get(self._key(user_id, view))
+        except Exception as exc:
+            logger.warning(f"Profile cache read failed; {exc}")
+            entry = None
+
+        if entry is not None:
+            version, _, body = entry.partition(b"\n")
+            if updated_at is None or version == self._version(updated_at):
+                self.hits.increment()
+                return body
+        self.misses.increment()
+        return None
+
+    async def set(self, user_id: str, view: str, updated_at: Optional[datetime], body: bytes):
+        """Caches the response body of a user view"""
+
+        if self.backend is None:
+            return
+        try:
+            await self.backend.set(self._key(user_id, view), self._version(updated_at) + b"\n" + body)
+        except Exception as exc:
+            logger.warning(f"Profile cache write failed; {exc}")
+
+    async def invalidate(self, *user_ids: str):
+        """Evicts every view of the users"""
+
+        if self.backend is None or not user_ids:
+            return
+        try:
+            await self.backend.delete(*(self._key(user_id, view) for user_id in user_ids for view in PROFILE_VIEWS))
+        except Exception as exc:
+            logger.warning(f"Profile cache invalidation failed; {exc}")
+
+    def clear(self):
+        """Evicts every local entry and resets the counters"""
+
+        if self.backend is not None:
+            self.backend.clear()
+        self.hits.reset()
+        self.misses.reset()
+
+    def stats(self) -> dict:
+        """Returns the cache backend and counters"""
+
+        return {
+            "backend": settings.PROFILE_CACHE_BACKEND if self.backend is not None else "none",
+            "hits": self.hits.value,
+            "misses": self.misses.value
+        }
+
+profile_cache = ProfileCache(get_profile_cache_backend())
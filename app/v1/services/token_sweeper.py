@@ -0,0 +1,93 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import select, delete
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional, Union
+
+from app.db.database import run_db, open_session
+from app.v1.models.user import UserToken
+from app.utils.settings import settings
+from app.utils.logger import logger
+
+class TokenSweeper:
+    """Deletes expired user tokens in small batches
+
+    Each batch is its own short transaction, so the sweep never holds locks on
+    user_tokens for long.
+    """
+
+    def __init__(self):
+        self.last_run = None
+
+    async def prune(
+        self,
+        db: Union[Session, AsyncSession],
+        retention: Optional[timedelta] = None,
+        batch_size: Optional[int] = None,
+        pause: float = 0
+    ) -> dict:
+        """Deletes tokens that expired before the retention period
+
+        Args:
+            - db: the database session, sync or async
+            - retention: how long expired tokens are kept. Defaults to TOKEN_RETENTION_HOURS.
+            - batch_size: rows deleted per transaction. Defaults to TOKEN_SWEEP_BATCH_SIZE.
+            - pause: seconds to wait between batches
+
+        Returns:
+            dict: the rows removed, batches run and seconds taken
+        """
+
+        retention = retention if retention is not None else timedelta(hours=settings.TOKEN_RETENTION_HOURS)
+        batch_size = batch_size or settings.TOKEN_SWEEP_BATCH_SIZE
+        cutoff = datetime.utcnow() - retention
+
+        start = time.perf_counter()
+        removed = batches = 0
+        while True:
+            deleted = await run_db(db, self._delete_batch, cutoff, batch_size)
+            removed += deleted
+            batches += 1
+            if deleted < batch_size:
+                break
+            if pause:
+                await asyncio.sleep(pause)
+
+        self.last_run = {
+            "removed": removed,
+            "batches": batches,
+            "seconds": round(time.perf_counter() - start, 3),
+            "finished_at": datetime.utcnow().isoformat()
+        }
+        logger.info(f"Pruned {removed} expired user tokens in {self.last_run['seconds']}s")
+        return self.last_run
+
+    def _delete_batch(self, db: Session, cutoff: datetime, batch_size: int) -> int:
+        """Deletes one batch of tokens expired before the cutoff"""
+
+        expired_ids = select(UserToken.id).where(UserToken.expires_at < cutoff).limit(batch_size)
+        result = db.execute(
+            delete(UserToken).where(UserToken.id.in_(expired_ids)),
+            execution_options={"synchronize_session": False}
+        )
+        db.commit()
+        return result.rowcount
+
+    async def run_periodically(self, interval: int):
+        """Prunes expired tokens every interval seconds until cancelled
+
+        Args:
+            interval: seconds between sweeps
+        """
+
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with open_session() as db:
+                    await self.prune(db)
+            except Exception as exc:
+                logger.exception(f"Token sweep failed; {exc}")
+
+token_sweeper = TokenSweeper()
@@ -1,8 +1,15 @@
 from fastapi import HTTPException, Response, status
-from sqlalchemy.orm import Session, joinedload
+import json
+from sqlalchemy import inspect, select, update, func, text, true, false
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta, timezone
-from typing import Annotated, Optional, Any
+from uuid_extensions import uuid7
+from typing import Annotated, Optional, Any, Union, List
+from pydantic import TypeAdapter
 
+from app.db.database import run_db, open_session, insert_or_ignore, pin_primary
+from app.db.types import canonical_uuid
 from app.v1.models.user import User, UserToken
 from app.core.base.services import Service
 from app.utils.email_context import FORGOT_PASSWORD, USER_VERIFY_ACCOUNT
@@ -10,10 +17,14 @@ from app.utils.settings import settings
 from app.utils.logger import logger
 from app.utils.string import unique_string
 from app.utils.db_validators import check_model_existence
+from app.utils.pagination import encode_cursor, decode_cursor
 from app.core.config.security import (
-    hash_password, verify_password, str_encode, str_decode, generate_token,
-    load_user, get_token_payload
+    hash_password_async, verify_password_async, verify_email_token, password_needs_update, generate_token,
+    generate_access_token, uuid_claim, refresh_token_claims,
+    load_user, get_token_payload, invalidate_token_user, invalidate_user, principal_claims
     )
+from app.v1.services.profile_cache import profile_cache
+from app.v1.services.user_counts import user_counts, user_flags
 from app.v1.services.email import (
     account_verification_email, 
     account_activation_confirmation_email, 
@@ -21,18 +32,35 @@ from app.v1.services.email import (
     )
 from app.v1.responses.user import (
     UserResponseData, RegisterUserResponse, UserLoginResponse, FetchUserResponse,
-    RefreshTokenResponse, SuperAdminFetchUserResponse, SuperAdminUserResponseData,
-    FetchAllUsersResponse
+    RefreshTokenResponse, SuperAdminUserResponseData,
+    FetchAllUsersResponse, UserSessionData, FetchUserSessionsResponse, RevokeUserSessionsResponse
     )
 from app.utils.success_response import success_response
 
+# the listing selects only the columns its response needs and validates each page at once
+LISTING_COLUMNS = tuple(User.__table__.c[name] for name in SuperAdminUserResponseData.model_fields)
+listing_adapter = TypeAdapter(List[SuperAdminUserResponseData])
+
+# users a bulk action applies to, so users already in the target state are not rewritten
+BULK_ACTION_CONDITIONS = {
+    "delete": [User.is_deleted == false()],
+    "activate": [User.is_deleted == false(), User.is_active == false()],
+    "deactivate": [User.is_active == true()],
+    "revoke-sessions": [],
+}
+BULK_ACTION_VALUES = {
+    "delete": {"is_active": False, "is_deleted": True},
+    "activate": {"is_active": True},
+    "deactivate": {"is_active": False},
+}
+
 class UserService(Service):
-    async def create(self, data, db: Session, background_tasks):
+    async def create(self, data, db: Union[Session, AsyncSession], background_tasks):
         """Registers a new user
 
         Args:
             - data: the request data
-            - db: the databases session
+            - db: the databases session, sync or async
             - background_tasks: background task to be called for email service
 
         Raises:
@@ -43,18 +71,19 @@ class UserService(Service):
             dict: a user response object containing auth tokens and the users data
         """
 
-        user_exist = db.query(User).filter_by(email = data.email).first()
-        if user_exist:
-            raise HTTPException(status_code=400, detail="Email already exists")
+        # duplicates are detected by the insert, the rate limit bounds hashing for them
+        data.password = await hash_password_async(data.password)
         try:
-            data.password = hash_password(data.password)
-            user = User(**data.model_dump())
-            db.add(user)
-            db.commit()
-            db.refresh(user)
+            # saving the user and generating auth tokens
+            registered = await run_db(db, self._register_user, data)
+        except Exception as exc:
+            raise HTTPException(status_code=500, detail=f"Error {exc}")
 
-            # generating auth tokens
-            tokens = self._generate_tokens(user, db)
+        if not registered:
+            raise HTTPException(status_code=400, detail="Email already exists")
+
+        try:
+            user, tokens = registered
 
             # Account verification email 
             await account_verification_email.send(user, background_tasks)
@@ -83,10 +112,42 @@ class UserService(Service):
             )
             return response
         except Exception as exc:
-            db.rollback()
             raise HTTPException(status_code=500, detail=f"Error {exc}")
 
-    def fetch(self, db: Session, id):
+    def _register_user(self, db: Session, data):
+        """Saves a new user and their first token in a single transaction
+
+        The email is claimed by INSERT ... ON CONFLICT (email) DO NOTHING
+        RETURNING, so a concurrent registration cannot slip in between a check
+        and the insert.
+
+        Args:
+            - db: the database session
+            - data: the request data with a hashed password
+
+        Returns:
+            tuple | none: the new user and their tokens, or none if the email exists
+        """
+
+        try:
+            user = db.scalars(
+                insert_or_ignore(db, User, ["email"]).values(**data.model_dump()).returning(User)
+            ).first()
+            if user is None:
+                db.rollback()
+                return None
+
+            tokens = self._issue_tokens(db, user)
+            # detached, so the commit does not expire the returned columns
+            db.expunge(user)
+            db.commit()
+            user_counts.apply(new=user_flags(user))
+            return user, tokens
+        except Exception:
+            db.rollback()
+            raise
+
+    async def fetch(self, db: Union[Session, AsyncSession], id):
         """Fetches all data of a single user
 
         Args:
@@ -101,39 +162,90 @@ class UserService(Service):
             dict: the user object
         """
 
-        user = check_model_existence(db, User, id)
+        # cached under the canonical ID, the form writes evict
+        user_id = canonical_uuid(id)
+        body = await profile_cache.get(user_id, "admin") if user_id else None
+        if body is None:
+            user = await run_db(db, check_model_existence, User, id)
 
-        user_data = SuperAdminUserResponseData.model_validate(user)
+            user_data = UserResponseData.model_validate(user)
 
-        response = SuperAdminFetchUserResponse(
-            message="Successfully fetched user",
-            data=user_data
-        )
-        return response
+            response = FetchUserResponse(
+                message="Successfully fetched user",
+                data=user_data
+            )
+            body = response.model_dump_json().encode()
+            await profile_cache.set(user.id, "admin", user.updated_at, body)
 
-    def fetch_me(self, user: User):
+        return Response(content=body, status_code=status.HTTP_200_OK, media_type='application/json')
+
+    async def fetch_me(self, user: User, db: Union[Session, AsyncSession]):
         """Fetch the current authenticated users details
 
         Args:
-            user: the current user obj
+            - user: the current user obj
+            - db: the database session, sync or async
 
         Returns:
             dict: success response with the current user obj
         """
 
-        user_data = UserResponseData.model_validate(user)
+        body = await profile_cache.get(user.id, "me", self._loaded_updated_at(user))
+        if body is None:
+            if inspect(user).unloaded:
+                # a stateless principal only carries its token claims
+                user_data = await run_db(db, self._user_data, user)
+            else:
+                user_data = UserResponseData.model_validate(user)
 
-        response = FetchUserResponse(
-            message="Successfully fetched user",
-            data=user_data
-        )
-        return response
+            response = FetchUserResponse(
+                message="Successfully fetched user",
+                data=user_data
+            )
+            body = response.model_dump_json().encode()
+            await profile_cache.set(user.id, "me", self._loaded_updated_at(user), body)
+
+        return Response(content=body, status_code=status.HTTP_200_OK, media_type='application/json')
+
+    def _loaded_updated_at(self, user: User):
+        """Returns the user's updated_at if loaded, without a lazy load"""
+
+        return None if "updated_at" in inspect(user).unloaded else user.updated_at
+
+
+    def _user_data(self, db: Session, user: User):
+        """Validates user response data, loading any unloaded attributes"""
 
+        return UserResponseData.model_validate(user)
 
-    def fetch_all(self, db: Session, page: int, per_page: int, **query_params: Optional[Any]):
+    async def fetch_all(
+        self, db: Union[Session, AsyncSession], page: int, per_page: int, after: Optional[str] = None,
+        count: str = "exact", **query_params: Optional[Any]
+    ):
+        """Fetches a page of users, ordered by ID
+
+        uuid7 IDs sort by creation time. With a cursor the page seeks past the
+        last ID of the previous page on the primary key index, so every page
+        costs the same. Without one the page number is used as an offset.
+
+        The total matches the filters, not the page. Exact totals are counted
+        once per filter combination and then kept up to date by the write paths,
+        estimated totals come from the postgres planner and none skips the count.
+
+        Args:
+            - db: the database session, sync or async
+            - page: the page number, used when there is no cursor
+            - per_page: the number of users per page
+            - after: the next_cursor of the previous page. Defaults to None.
+            - count: how the total is computed, exact, estimated or none. Defaults to exact.
+            - query_params: boolean filters on user fields
+
+        Returns:
+            Response: the FetchAllUsersResponse of the users and the cursor of the next page
+        """
 
         # Creating filters for the query
-        filters = []
+        filters, flag_filters = [], {}
         for key, value in query_params.items():
             if (value is not None) and (not isinstance(value, bool)):
                 raise HTTPException(
@@ -142,39 +254,92 @@ class UserService(Service):
                     )
 
             # create the query condition
+            # inlined as true/false so the planner can match the partial indexes
             if hasattr(User, key) and value is not None:
-                filters.append(getattr(User, key) == value)
-        
-        offset_value = (page - 1) * per_page
-        users = db.query(User).filter(*filters).limit(per_page).offset(offset_value).all()
-
-        total_users = len(users)
-        if total_users:
-            all_user_data = [SuperAdminUserResponseData.model_validate(user, from_attributes=True) for user in users]
+                filters.append(getattr(User, key) == (true() if value else false()))
+                flag_filters[key] = value
 
+        page_filters, offset_value = filters, 0
+        if after:
+            page_filters = [*filters, User.id > decode_cursor(after)]
+        else:
+            offset_value = (page - 1) * per_page
+
+        # writes committed after this point may be missing from a count
+        generation = user_counts.generation
+
+        # one extra row tells whether there is a next page
+        users = await run_db(db, self._query_users, page_filters, per_page + 1, offset_value)
+        next_cursor = encode_cursor(users[per_page - 1]["id"]) if len(users) > per_page else None
+        users = users[:per_page]
+
+        total = None
+        if count != "none":
+            total = user_counts.get(flag_filters)
+            if total is None and users and not after and next_cursor is None:
+                # the last page by offset already tells the total
+                total = offset_value + len(users)
+                user_counts.set(flag_filters, total, generation)
+            elif total is None and count == "estimated":
+                total = await run_db(db, self._estimate_users, filters)
+            if total is None:
+                total = await run_db(db, self._count_users, filters)
+                user_counts.set(flag_filters, total, generation)
+
+        if users:
             response = FetchAllUsersResponse(
                 message="Successfully fetched all users",
                 page=page,
                 per_page=per_page,
-                total=total_users,
-                data=all_user_data
+                total=total,
+                next_cursor=next_cursor,
+                data=listing_adapter.validate_python(users)
             )
-            return response
-        response = FetchAllUsersResponse(
-            message="No User(s) found",
-            page=page,
-            per_page=per_page,
-            total=0,
-            data=[]
-        )
-        return response
-        
+        else:
+            response = FetchAllUsersResponse(
+                message="No User(s) found",
+                page=page,
+                per_page=per_page,
+                total=total,
+                data=[]
+            )
+
+        # serialized here, so the page isn't validated a second time against the response model
+        return Response(content=response.model_dump_json(), status_code=status.HTTP_200_OK, media_type='application/json')
+
+    def _query_users(self, db: Session, filters: list, limit: int, offset: int):
+        """Queries a page of users matching the filters
+
+        Plain mappings of the listed columns, so the password hash is never
+        read and the rows skip the session's identity map.
+        """
 
-    def update(self, db: Session, current_user: User, data, id: Annotated[str, Optional] = None):
+        statement = select(*LISTING_COLUMNS).where(*filters).order_by(User.id).limit(limit).offset(offset)
+        return db.execute(statement).mappings().all()
+
+    def _count_users(self, db: Session, filters: list) -> int:
+        """Counts the users matching the filters"""
+
+        return db.scalar(select(func.count()).select_from(User).where(*filters))
+
+    def _estimate_users(self, db: Session, filters: list) -> Optional[int]:
+        """Reads the postgres planner's row estimate for the filters, none on other databases"""
+
+        dialect = db.get_bind().dialect
+        if dialect.name != "postgresql":
+            return None
+
+        statement = select(User.id).where(*filters).compile(dialect=dialect, compile_kwargs={"literal_binds": True})
+        plan = db.execute(text(f"EXPLAIN (FORMAT JSON) {statement}")).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    async def update(self, db: Union[Session, AsyncSession], current_user: User, data, id: Annotated[str, Optional] = None):
         """Updates a single user
 
         Args:
-            - db: the database session
+            - db: the database session, sync or async
             - current_user: the current authenticated user
             - data: the update request data
             - id: request id. Defaults to None.
@@ -191,6 +356,13 @@ class UserService(Service):
             dict: updated user obj
         """
 
+        response = await run_db(db, self._update_user, current_user, data, id)
+        await profile_cache.invalidate(response.data.id)
+        return response
+
+    def _update_user(self, db: Session, current_user: User, data, id: Annotated[str, Optional] = None):
+        """Updates a single user within a sync session"""
+
         if (not id) or (id and current_user.id == id) or current_user.is_superadmin:
             # check for existing email
             existing_email = db.query(User).filter_by(email=data.email).first()
@@ -216,6 +388,8 @@ class UserService(Service):
                 setattr(user, key, value)
             db.commit()
             db.refresh(user)
+            invalidate_user(user.id)
+            pin_primary(user.id)
 
             user_data = UserResponseData.model_validate(user)
 
@@ -226,11 +400,11 @@ class UserService(Service):
             return response
         raise HTTPException(status_code=400, detail="Invalid request!")
 
-    def delete(self, db: Session, current_user: User, id: str):
+    async def delete(self, db: Union[Session, AsyncSession], current_user: User, id: str):
         """Soft delete a user
 
         Args:
-            - db: the database session
+            - db: the database session, sync or async
             - current_user: the current authenticated superadmin
             - id: the ID of the user to delete
 
@@ -239,6 +413,12 @@ class UserService(Service):
             - HTTPException: 400 for requests by non superadmin whose request ID do not match their ID
         """
 
+        await run_db(db, self._delete_user, current_user, id)
+        await profile_cache.invalidate(id)
+
+    def _delete_user(self, db: Session, current_user: User, id: str):
+        """Soft deletes a user within a sync session"""
+
         if current_user.is_superadmin:
             user = check_model_existence(db, User, id)
 
@@ -246,15 +426,109 @@ class UserService(Service):
             if user.is_deleted:
                 raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="User is already deleted")
 
-            # soft delete user
+            # soft delete user and expire their sessions
+            old_flags = user_flags(user)
             user.is_active = False
             user.is_deleted = True
             user.deleted_at = datetime.now(timezone.utc)
+            token_keys = self._expire_sessions(db, id)
             db.commit()
+            user_counts.apply(old_flags, user_flags(user))
+            invalidate_user(id)
+            for token_key in token_keys:
+                invalidate_token_user(*token_key)
         else:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid request!")
 
-    async def activate_user_account(self, data, db: Session, background_tasks):
+    async def bulk_update(self, db: Union[Session, AsyncSession], current_user: User, action: str, data):
+        """Applies an admin action to many users at once
+
+        Users are selected by ID or by the listing filters and changed with one
+        set-based UPDATE per chunk of USER_BULK_CHUNK_SIZE users, each chunk in
+        its own transaction. Filtered chunks seek on the primary key. Deleted
+        and deactivated users lose their sessions too. The current user is
+        never selected.
+
+        Args:
+            - db: the database session, sync or async
+            - current_user: the current authenticated superadmin
+            - action: delete, activate, deactivate or revoke-sessions
+            - data: the request data, IDs or filters
+
+        Returns:
+            dict: success response with the users changed and the sessions revoked
+        """
+
+        conditions = [User.id != current_user.id, *BULK_ACTION_CONDITIONS[action]]
+        for key, value in data.filters().items():
+            conditions.append(getattr(User, key) == (true() if value else false()))
+
+        chunk_size = settings.USER_BULK_CHUNK_SIZE
+        ids = sorted(set(data.ids)) if data.ids is not None else None
+        users = sessions = start = 0
+        after = None
+        while True:
+            if ids is not None:
+                chunk_conditions = [*conditions, User.id.in_(ids[start:start + chunk_size])]
+                start += chunk_size
+            else:
+                chunk_conditions = [*conditions, User.id > after] if after else conditions
+
+            user_ids, token_keys = await run_db(db, self._bulk_update_chunk, action, chunk_conditions, chunk_size)
+            users += len(user_ids)
+            sessions += len(token_keys)
+            await profile_cache.invalidate(*user_ids)
+
+            if ids is not None:
+                if start >= len(ids):
+                    break
+            elif len(user_ids) < chunk_size:
+                break
+            else:
+                after = max(user_ids)
+
+        if users and action != "revoke-sessions":
+            user_counts.clear()
+
+        return success_response(
+            status_code=200,
+            message=f"Successfully applied {action} to {users} users",
+            data={"users": users, "sessions": sessions}
+        )
+
+    def _bulk_update_chunk(self, db: Session, action: str, conditions: list, limit: int):
+        """Applies an admin action to one chunk of users in a single transaction
+
+        Returns:
+            tuple: the IDs of the changed users and the (id, access_key) of their revoked tokens
+        """
+
+        try:
+            chunk = select(User.id).where(*conditions).order_by(User.id).limit(limit)
+            if action == "revoke-sessions":
+                user_ids = db.scalars(chunk).all()
+            else:
+                values = dict(BULK_ACTION_VALUES[action])
+                if action == "delete":
+                    values["deleted_at"] = datetime.now(timezone.utc)
+                user_ids = db.scalars(
+                    update(User).where(User.id.in_(chunk)).values(**values).returning(User.id),
+                    execution_options={"synchronize_session": False}
+                ).all()
+
+            token_keys = self._expire_sessions(db, list(user_ids)) if user_ids and action != "activate" else []
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        invalidate_user(*user_ids)
+        for token_key in token_keys:
+            invalidate_token_user(*token_key)
+        pin_primary(*user_ids)
+        return user_ids, token_keys
+
+    async def activate_user_account(self, data, db: Union[Session, AsyncSession], background_tasks):
         """Verifies a registered user
 
         Args:
@@ -271,30 +545,28 @@ class UserService(Service):
             dict: a success response message
         """
 
-        user = db.query(User).filter_by(email = data.email).first()
+        user = await load_user(data.email, db)
         if not user:
             raise HTTPException(status_code=400, detail="This link is not valid")
-        
-        user_token = user.get_context_string(context=USER_VERIFY_ACCOUNT)
+
+        # a used link stays valid until updated_at moves on, so refuse it explicitly
+        if user.verified_at:
+            raise HTTPException(status_code=400, detail="This link is either expired or not valid")
+
         try:
-            token_valid = verify_password(user_token, data.token)
+            token_valid = await verify_email_token(user, USER_VERIFY_ACCOUNT, data.token)
         except Exception as verify_exc:
             logger.exception(verify_exc)
             token_valid = False
         if not token_valid:
             raise HTTPException(status_code=400, detail="This link is either expired or not valid")
 
+        user_id = user.id
         try:
-            user.is_active = True
-            user.is_verified = True
-            user.updated_at = datetime.utcnow()
-            user.verified_at = datetime.utcnow()
-            db.add(user)
-            db.commit()
-            db.refresh(user)
+            await run_db(db, self._activate_user, user)
         except Exception as exc:
-            db.rollback()
             raise HTTPException(status_code=500, detail=f"Error {exc}")
+        await profile_cache.invalidate(user_id)
 
         # Activation confirmation Email
         await account_activation_confirmation_email.send(user, background_tasks)
@@ -303,13 +575,33 @@ class UserService(Service):
             message=f"User {user.email} account successfully activated."
         )
 
+    def _activate_user(self, db: Session, user: User):
+        """Marks a user as active and verified"""
+
+        try:
+            old_flags = user_flags(user)
+            user.is_active = True
+            user.is_verified = True
+            user.updated_at = datetime.utcnow()
+            user.verified_at = datetime.utcnow()
+            db.add(user)
+            db.commit()
+            db.refresh(user)
+            user_counts.apply(old_flags, user_flags(user))
+            invalidate_user(user.id)
+            pin_primary(user.id)
+        except Exception:
+            db.rollback()
+            raise
+
 
-    async def get_login_token(self, data, db: Session):
+    async def get_login_token(self, data, db: Union[Session, AsyncSession], background_tasks):
         """Generated authentication tokens for users upon login
 
         Args:
             - data: request username and password
             - db: the database session
+            - background_tasks: background task to rehash outdated passwords
 
         Raises:
             - HTTPException: 400 for non-existing email
@@ -325,7 +617,7 @@ class UserService(Service):
         if not user:
             raise HTTPException(status_code=400, detail="Invalid request!")
 
-        if not verify_password(data.password, user.password):
+        if not await verify_password_async(data.password, user.password):
             raise HTTPException(status_code=400, detail="Incorrect email or password")
 
         if not user.verified_at:
@@ -334,20 +626,10 @@ class UserService(Service):
         if not user.is_active:
             raise HTTPException(status_code=400, detail="Your account has been deactivated. Please contact support.")
 
-        # check if the user has existing tokens that are yet to expire
-        existing_token = db.query(UserToken).filter(
-            UserToken.user_id == user.id, 
-            UserToken.expires_at > datetime.utcnow()
-            ).first()
-
-        if existing_token:
-            existing_token.expires_at = datetime.utcnow()
-            db.add(existing_token)
-            db.commit()
+        if password_needs_update(user.password):
+            background_tasks.add_task(self._rehash_password, user.id, user.password, data.password)
 
-        tokens = self._generate_tokens(user, db)
-
-        user_data = UserResponseData.model_validate(user)
+        tokens, user_data = await run_db(db, self._rotate_login_tokens, user)
 
         pydantic_model = UserLoginResponse(
             message="Login successful",
@@ -371,7 +653,159 @@ class UserService(Service):
         return response
 
 
-    async def get_refresh_token(self, refresh_token: str, db: Session):
+    async def _rehash_password(self, user_id: str, current_hash: str, password: str):
+        """Rehashes a password with the current hashing policy
+
+        Args:
+            - user_id: the ID of the user
+            - current_hash: the outdated password hash
+            - password: the plain password the user logged in with
+        """
+
+        new_hash = await hash_password_async(password)
+        async with open_session() as db:
+            await run_db(db, self._swap_password_hash, user_id, current_hash, new_hash)
+        await profile_cache.invalidate(user_id)
+
+    def _swap_password_hash(self, db: Session, user_id: str, current_hash: str, new_hash: str):
+        """Replaces a password hash unless the password changed in the meantime"""
+
+        db.query(User).filter(
+            User.id == user_id,
+            User.password == current_hash
+        ).update({User.password: new_hash}, synchronize_session=False)
+        db.commit()
+        invalidate_user(user_id)
+        pin_primary(user_id)
+
+    def _rotate_login_tokens(self, db: Session, user: User):
+        """Expires a user's live tokens and issues new ones in a single transaction
+
+        Args:
+            - db: the database session
+            - user: the user logging in
+
+        Returns:
+            tuple: the new tokens and the user response data
+        """
+
+        # read before commit, which expires the user
+        user_data = UserResponseData.model_validate(user)
+
+        token_keys = self._expire_sessions(db, user.id)
+        tokens = self._issue_tokens(db, user)
+        db.commit()
+        for token_key in token_keys:
+            invalidate_token_user(*token_key)
+
+        return tokens, user_data
+
+    async def fetch_sessions(self, db: Union[Session, AsyncSession], user: User, current_token_id: str, limit: int, after: Optional[str] = None):
+        """Fetches a page of the live sessions of a user, ordered by ID
+
+        Args:
+            - db: the database session, sync or async
+            - user: the current authenticated user
+            - current_token_id: the ID of the token of the current request
+            - limit: the number of sessions per page
+            - after: the ID of the last session of the previous page. Defaults to None.
+
+        Returns:
+            FetchUserSessionsResponse: the sessions and the cursor of the next page
+        """
+
+        rows = await run_db(db, self._query_sessions, user.id, limit + 1, decode_cursor(after) if after else None)
+        next_cursor = encode_cursor(rows[limit - 1].id) if len(rows) > limit else None
+
+        return FetchUserSessionsResponse(
+            message="Successfully fetched sessions",
+            limit=limit,
+            next_cursor=next_cursor,
+            data=[
+                UserSessionData(
+                    id=row.id, created_at=row.created_at, expires_at=row.expires_at,
+                    current=row.id == current_token_id
+                    )
+                for row in rows[:limit]
+            ]
+        )
+
+    def _query_sessions(self, db: Session, user_id: str, limit: int, after: Optional[str] = None):
+        """Queries live sessions of a user after a cursor, uuid7 IDs sort by creation"""
+
+        query = select(UserToken.id, UserToken.created_at, UserToken.expires_at).where(
+            UserToken.user_id == user_id,
+            UserToken.expires_at > datetime.utcnow()
+        )
+        if after:
+            query = query.where(UserToken.id > after)
+        return db.execute(query.order_by(UserToken.id).limit(limit)).all()
+
+    async def revoke_sessions(self, db: Union[Session, AsyncSession], user_id: str, keep_token_id: Optional[str] = None):
+        """Revokes all live sessions of a user
+
+        Args:
+            - db: the database session, sync or async
+            - user_id: the ID of the user
+            - keep_token_id: the ID of a session to keep, e.g. the current one. Defaults to None.
+
+        Returns:
+            RevokeUserSessionsResponse: the number of revoked sessions
+        """
+
+        revoked = await run_db(db, self._revoke_sessions, user_id, keep_token_id)
+
+        return RevokeUserSessionsResponse(
+            message="Sessions revoked successfully",
+            revoked=revoked
+        )
+
+    def _revoke_sessions(self, db: Session, user_id: str, keep_token_id: Optional[str] = None):
+        """Revokes the live sessions of a user within a sync session
+
+        Returns:
+            int: the number of revoked sessions
+        """
+
+        token_keys = self._expire_sessions(db, user_id, keep_token_id)
+        db.commit()
+        for token_key in token_keys:
+            invalidate_token_user(*token_key)
+        return len(token_keys)
+
+    def _expire_sessions(self, db: Session, user_id: Union[str, List[str]], keep_token_id: Optional[str] = None):
+        """Expires the live tokens of a user, or of a list of users, in a single UPDATE, without committing
+
+        The caller commits and then invalidates the returned tokens, so cached
+        principals are never dropped for a rolled back revocation.
+
+        Args:
+            - db: the database session
+            - user_id: the ID of the user, or a list of IDs
+            - keep_token_id: the ID of a token to leave live. Defaults to None.
+
+        Returns:
+            list: the (id, access_key) of every expired token
+        """
+
+        user_ids = [user_id] if isinstance(user_id, str) else user_id
+        now = datetime.utcnow()
+        query = update(UserToken).where(
+            UserToken.user_id.in_(user_ids),
+            UserToken.expires_at > now
+        )
+        if keep_token_id:
+            query = query.where(UserToken.id != keep_token_id)
+
+        result = db.execute(
+            query.values(expires_at=now).returning(UserToken.id, UserToken.access_key),
+            execution_options={"synchronize_session": False}
+        )
+        # a lagging replica would still accept the expired tokens
+        pin_primary(*user_ids)
+        return [tuple(row) for row in result]
+
+    async def get_refresh_token(self, refresh_token: str, db: Union[Session, AsyncSession]):
         """Refreshes access token
 
         Args:
@@ -387,28 +821,16 @@ class UserService(Service):
         """
 
         token_payload = get_token_payload(refresh_token, settings.SECRET_KEY, settings.ALGORITHM)
-        if not token_payload:
+        claims = refresh_token_claims(token_payload) if token_payload else None
+        if not claims:
             raise HTTPException(status_code=400, detail="Invalid request.")
-        
-        refresh_key = token_payload.get('t')
-        access_key = token_payload.get('a')
-        user_id = str_decode(token_payload.get('sub'))
-        user_token = db.query(UserToken).options(joinedload(UserToken.user)).filter(
-            UserToken.refresh_key == refresh_key,
-            UserToken.access_key == access_key,
-            UserToken.user_id == user_id,
-            UserToken.expires_at > datetime.utcnow()
-        ).first()
 
-        if not user_token:
-            raise HTTPException(status_code=400, detail="Invalid request.")
+        user_id, refresh_key, access_key = claims
 
-        user_token.expires_at = datetime.utcnow()
-        db.add(user_token)
-        db.commit()
+        tokens = await run_db(db, self._rotate_refresh_token, refresh_key, access_key, user_id)
 
-        # generate new tokens
-        tokens = self._generate_tokens(user_token.user, db)
+        if not tokens:
+            raise HTTPException(status_code=400, detail="Invalid request.")
 
         pydantic_model = RefreshTokenResponse(
             message="Refresh successful",
@@ -429,10 +851,46 @@ class UserService(Service):
             samesite="none"
         )
         return response
-        
+
+    def _rotate_refresh_token(self, db: Session, refresh_key: str, access_key: str, user_id: str):
+        """Expires the token of a refresh key and issues new tokens in a single transaction
+
+        The token is expired by a conditional UPDATE, so a refresh key can only
+        be redeemed once even by concurrent requests.
+
+        Args:
+            - db: the database session
+            - refresh_key: the refresh key of the token
+            - access_key: the access key of the token
+            - user_id: the ID of the token user
+
+        Returns:
+            dict | none: the new tokens or none for an invalid refresh key
+        """
+
+        now = datetime.utcnow()
+        expired_token_id = db.execute(
+            update(UserToken).where(
+                UserToken.refresh_key == refresh_key,
+                UserToken.access_key == access_key,
+                UserToken.user_id == user_id,
+                UserToken.expires_at > now
+            ).values(expires_at=now).returning(UserToken.id),
+            execution_options={"synchronize_session": False}
+        ).scalar()
+
+        user = db.get(User, user_id) if expired_token_id else None
+        if not user:
+            db.rollback()
+            return None
+
+        tokens = self._issue_tokens(db, user)
+        db.commit()
+        invalidate_token_user(expired_token_id, access_key)
+        return tokens
 
     def _generate_tokens(self, user: User, db: Session):
-        """Generates access and refresh tokens
+        """Generates and saves access and refresh tokens
 
         Args:
             user: the user to be signed with the token
@@ -442,34 +900,58 @@ class UserService(Service):
             dict: access and refresh tokens
         """
 
-        refresh_key = unique_string(100)
-        access_key = unique_string(50)
+        tokens = self._issue_tokens(db, user)
+        db.commit()
+        return tokens
+
+    def _issue_tokens(self, db: Session, user: User):
+        """Adds a new user token to the session and signs its tokens, without committing
+
+        The token ID is generated here rather than by the database, so no
+        refresh is needed after the insert.
+
+        Args:
+            db: the database session
+            user: the user to be signed with the token
+
+        Returns:
+            dict: access and refresh tokens
+        """
+
+        # 256 and 128 random bits, as 43 and 22 url safe characters
+        refresh_key = unique_string(32)
+        access_key = unique_string(16)
         rt_expires = timedelta(minutes=15)
         # rt_expires = timedelta(days=settings.JWT_REFRESH_EXPIRY)
 
         user_token = UserToken(
+            id = str(uuid7()),
             user_id = user.id,
             refresh_key = refresh_key,
             access_key = access_key,
             expires_at = datetime.utcnow() + rt_expires
         )
         db.add(user_token)
-        db.commit()
-        db.refresh(user_token)
+        # a lagging replica would not find the new token yet
+        pin_primary(user.id)
+
+        user_claim = uuid_claim(user.id)
+        session_claim = uuid_claim(user_token.id)
 
         access_token_payload = {
-            "sub": str_encode(user.id),
+            "sub": user_claim,
+            "sid": session_claim,
             "a": access_key,
-            "r": str_encode(user_token.id),
-            "n": str_encode(f"{user.last_name}")
+            **principal_claims(user)
         }
         
-        at_expires = timedelta(minutes=5)
-        # at_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-        access_token = generate_token(access_token_payload, settings.SECRET_KEY, settings.ALGORITHM, at_expires)
+        # revoked_tokens keeps a revoked session for the same lifetime
+        at_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        access_token = generate_access_token(access_token_payload, at_expires)
 
         refresh_token_payload = {
-            "sub": str_encode(user.id),
+            "sub": user_claim,
+            "sid": session_claim,
             "t": refresh_key,
             "a": access_key
         }
@@ -513,7 +995,7 @@ class UserService(Service):
             message="Please check your mail to change password"
         )
 
-    async def reset_user_password(self, data, db: Session):
+    async def reset_user_password(self, data, db: Union[Session, AsyncSession]):
         """Resets a users password
 
         Args:
@@ -542,10 +1024,8 @@ class UserService(Service):
         if not user.is_active:
             raise HTTPException(status_code=400, detail="Invalid request")
 
-        user_token = user.get_context_string(context=FORGOT_PASSWORD)
-
         try:
-            token_valid = verify_password(user_token, data.token)
+            token_valid = await verify_email_token(user, FORGOT_PASSWORD, data.token)
         except Exception as exc:
             logger.exception(exc)
             token_valid = False
@@ -553,10 +1033,10 @@ class UserService(Service):
         if not token_valid:
             raise HTTPException(status_code=400, detail="Invalid window")
 
-        user.password = hash_password(data.password)
-        db.add(user)
-        db.commit()
-        db.refresh(user)
+        hashed_password = await hash_password_async(data.password)
+        user_id = user.id
+        await run_db(db, self._set_password, user, hashed_password)
+        await profile_cache.invalidate(user_id)
 
         # Notify user that the password has been updated through mail
 
@@ -565,4 +1045,14 @@ class UserService(Service):
             message="Your password has been updated."
         )
 
+    def _set_password(self, db: Session, user: User, hashed_password: str):
+        """Saves a new password hash for a user"""
+
+        user.password = hashed_password
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+        invalidate_user(user.id)
+        pin_primary(user.id)
+
 user_service = UserService()
\ No newline at end of file
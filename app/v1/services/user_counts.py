@@ -0,0 +1,88 @@
+import time
+import threading
+from typing import Dict, Optional
+
+from app.utils.settings import settings
+
+# user flags the listing can be filtered by
+USER_FLAGS = ("is_superadmin", "is_active", "is_verified", "is_deleted")
+
+def user_flags(user) -> Dict[str, bool]:
+    """Returns the filterable flags of a user"""
+
+    return {flag: bool(getattr(user, flag)) for flag in USER_FLAGS}
+
+class UserCountCache:
+    """Exact user totals per filter combination, kept up to date by the write paths
+
+    A combination is counted once, then every write adjusts the totals of the
+    cached combinations its user leaves or joins, so listings do not repeat
+    COUNT(*). Totals live per worker; the ttl bounds how long writes served by
+    other workers can go unseen.
+
+    Args:
+        ttl (float): seconds a total is kept before it is counted again
+    """
+
+    def __init__(self, ttl: float = 300):
+        self.ttl = ttl
+        self.generation = 0
+        self._totals = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(filters: Dict[str, bool]) -> frozenset:
+        return frozenset((flag, bool(value)) for flag, value in filters.items() if value is not None)
+
+    def get(self, filters: Dict[str, bool]) -> Optional[int]:
+        """Gets the cached total of a filter combination, or none on a miss"""
+
+        entry = self._totals.get(self._key(filters))
+        if entry is not None and entry[1] > time.monotonic():
+            return entry[0]
+        return None
+
+    def set(self, filters: Dict[str, bool], total: int, generation: int):
+        """Caches a counted total
+
+        Args:
+            - filters: the filter combination
+            - total: the counted total
+            - generation: the generation read before counting. A write applied
+              since then may be missing from the total, so it is not cached.
+        """
+
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            if generation == self.generation:
+                self._totals[self._key(filters)] = (total, time.monotonic() + self.ttl)
+
+    def apply(self, old: Optional[Dict[str, bool]] = None, new: Optional[Dict[str, bool]] = None):
+        """Moves a user between the cached totals after a committed write
+
+        Args:
+            - old: the user's flags before the write, none for a new user
+            - new: the user's flags after the write, none for a removed user
+        """
+
+        with self._lock:
+            self.generation += 1
+            for key, (total, expires_at) in self._totals.items():
+                total -= old is not None and all(old[flag] == value for flag, value in key)
+                total += new is not None and all(new[flag] == value for flag, value in key)
+                self._totals[key] = (total, expires_at)
+
+    def clear(self):
+        """Drops every cached total, e.g. after a bulk write"""
+
+        with self._lock:
+            self.generation += 1
+            self._totals.clear()
+
+    def stats(self) -> dict:
+        """Returns the number of cached totals"""
+
+        return {"size": len(self._totals)}
+
+user_counts = UserCountCache(settings.USER_COUNT_CACHE_TTL)
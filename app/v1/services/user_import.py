@@ -0,0 +1,254 @@
+import io
+import csv
+import json
+import time
+from itertools import islice
+from datetime import datetime, timezone
+from fastapi import BackgroundTasks, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from sqlalchemy import column, table, text
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Iterable, Iterator, Optional, Tuple, Union
+from uuid_extensions import uuid7
+
+from app.db.database import run_db, insert_or_ignore
+from app.v1.models.user import User
+from app.v1.schemas.user import ImportUserRow
+from app.v1.services.email import account_verification_email
+from app.v1.services.user_counts import user_counts
+from app.utils.settings import settings
+from app.utils.logger import logger
+
+IMPORT_FORMATS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+# columns written by an import, the timestamps come from the column defaults
+IMPORT_COLUMNS = (
+    "id", "email", "password", "first_name", "last_name", "is_superadmin",
+    "is_active", "is_verified", "is_deleted", "verified_at"
+)
+
+# returned for the inserted rows, enough to sign their verification links
+RETURNED_COLUMNS = (User.id, User.email, User.password, User.last_name, User.is_verified, User.updated_at)
+
+# rejected rows listed in a report, the rest are only counted
+MAX_REPORTED_REJECTIONS = 100
+
+def import_format(filename: Optional[str], format: Optional[str] = None) -> str:
+    """Resolves the format of an import from an explicit format or the file extension
+
+    Raises:
+        HTTPException: 400 if neither names csv or ndjson
+    """
+
+    if format is None and filename:
+        format = IMPORT_FORMATS.get("." + filename.rsplit(".", 1)[-1].lower())
+    if format not in IMPORT_FORMATS.values():
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Import format must be csv or ndjson")
+    return format
+
+def read_rows(lines: Iterable[str], format: str) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """Reads the records of a CSV or NDJSON stream
+
+    Empty CSV cells are left out, so they take the field defaults.
+
+    Yields:
+        tuple: the line number, the record or none and the reason it was unreadable
+    """
+
+    if format == "csv":
+        reader = csv.DictReader(lines)
+        for record in reader:
+            yield reader.line_num, {key: value for key, value in record.items() if key and value}, None
+        return
+
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield number, None, "Invalid JSON"
+            continue
+        if not isinstance(record, dict):
+            yield number, None, "Row must be a JSON object"
+            continue
+        yield number, record, None
+
+class UserImporter:
+    """Imports users in bulk from CSV or NDJSON
+
+    Rows are validated and written in batches, each batch in one transaction:
+    a COPY into a staging table on postgres, an executemany on other databases,
+    and a single INSERT ... ON CONFLICT (email) DO NOTHING into users. Emails
+    that already exist are the rows the insert skipped, so duplicates cost no
+    extra queries. Passwords are imported as existing hashes, nothing is hashed.
+    """
+
+    async def run(
+        self,
+        db: Union[Session, AsyncSession],
+        lines: Iterable[str],
+        format: str,
+        batch_size: Optional[int] = None,
+        send_verification: bool = False,
+        background_tasks: Optional[BackgroundTasks] = None
+    ) -> dict:
+        """Imports the users of a CSV or NDJSON stream
+
+        Args:
+            - db: the database session, sync or async
+            - lines: the lines of the import, CSV with a header row or one JSON object per line
+            - format: csv or ndjson
+            - batch_size: rows written per transaction. Defaults to USER_IMPORT_BATCH_SIZE.
+            - send_verification: queue verification emails for imported unverified users
+            - background_tasks: the tasks the verification emails are queued on
+
+        Returns:
+            dict: the rows read, imported and rejected, the first rejections and the rows per second
+        """
+
+        batch_size = batch_size or settings.USER_IMPORT_BATCH_SIZE
+        report = {"rows": 0, "imported": 0, "rejected": 0, "errors": []}
+        seen_emails = set()
+
+        start = time.perf_counter()
+        records = read_rows(lines, format)
+        while True:
+            # reading the stream blocks, so each batch is read and validated in a thread
+            read, rows, line_numbers, rejections = await run_in_threadpool(
+                self._read_batch, records, batch_size, seen_emails
+            )
+            if not read:
+                break
+            report["rows"] += read
+            await self._import_batch(db, rows, line_numbers, rejections, report, send_verification, background_tasks)
+
+        if report["imported"]:
+            user_counts.clear()
+
+        seconds = time.perf_counter() - start
+        report["seconds"] = round(seconds, 3)
+        report["rows_per_second"] = round(report["imported"] / seconds) if seconds else 0
+        logger.info(
+            f"Imported {report['imported']} users and rejected {report['rejected']} "
+            f"in {report['seconds']}s ({report['rows_per_second']} rows/s)"
+        )
+        return report
+
+    async def _import_batch(
+        self, db, rows: list, lines: dict, rejections: list, report: dict, send_verification: bool, background_tasks
+    ):
+        """Writes one validated batch, adding its outcome to the report"""
+
+        inserted = await run_db(db, self._write_batch, rows) if rows else []
+        report["imported"] += len(inserted)
+
+        inserted_emails = {user.email for user in inserted}
+        rejections += [
+            (lines[row["email"]], row["email"], "Email already exists")
+            for row in rows if row["email"] not in inserted_emails
+        ]
+        report["rejected"] += len(rejections)
+        room = MAX_REPORTED_REJECTIONS - len(report["errors"])
+        report["errors"] += [
+            {"line": line, "email": email, "reason": reason} for line, email, reason in sorted(rejections)[:room]
+        ]
+
+        if send_verification and background_tasks is not None:
+            for user in inserted:
+                if not user.is_verified:
+                    await account_verification_email.send(User(**user._asdict()), background_tasks)
+
+    def _read_batch(self, records: Iterator, batch_size: int, seen_emails: set) -> tuple:
+        """Reads up to batch_size records of the stream and validates them
+
+        Returns:
+            tuple: the records read, then the rows to insert, their line numbers by email and the rejections
+        """
+
+        batch = list(islice(records, batch_size))
+        return (len(batch), *self._validate_batch(batch, seen_emails))
+
+    def _validate_batch(self, batch: list, seen_emails: set) -> tuple:
+        """Validates the records of a batch into insert parameters
+
+        Returns:
+            tuple: the rows to insert, their line numbers by email and the rejections
+        """
+
+        now = datetime.now(timezone.utc)
+        rows, lines, rejections = [], {}, []
+        for number, record, error in batch:
+            if error is not None:
+                rejections.append((number, None, error))
+                continue
+            try:
+                data = ImportUserRow.model_validate(record)
+            except ValidationError as exc:
+                error = exc.errors()[0]
+                field = ".".join(str(part) for part in error["loc"])
+                rejections.append((number, record.get("email"), f"{field}: {error['msg']}" if field else error["msg"]))
+                continue
+
+            if data.email in seen_emails:
+                rejections.append((number, data.email, "Duplicate email in import"))
+                continue
+            seen_emails.add(data.email)
+
+            # a verified account is also active, as after email verification
+            rows.append({
+                "id": str(uuid7()), **data.model_dump(), "is_superadmin": False,
+                "is_active": data.is_verified, "is_deleted": False,
+                "verified_at": now if data.is_verified else None
+            })
+            lines[data.email] = number
+        return rows, lines, rejections
+
+    def _write_batch(self, db: Session, rows: list) -> list:
+        """Inserts a batch of users in one transaction, skipping existing emails
+
+        Returns:
+            list: the returned columns of the inserted users
+        """
+
+        try:
+            driver = db.get_bind().dialect.driver
+            if driver in ("psycopg2", "asyncpg"):
+                inserted = self._copy_rows(db, rows, driver)
+            else:
+                statement = insert_or_ignore(db, User.__table__, ["email"]).returning(*RETURNED_COLUMNS)
+                inserted = db.execute(statement, rows).all()
+            db.commit()
+            return inserted
+        except Exception:
+            db.rollback()
+            raise
+
+    def _copy_rows(self, db: Session, rows: list, driver: str) -> list:
+        """Copies a batch into a staging table and moves it into users on postgres"""
+
+        db.execute(text("CREATE TEMPORARY TABLE user_import (LIKE users INCLUDING DEFAULTS) ON COMMIT DROP"))
+        connection = db.connection().connection
+        if driver == "asyncpg":
+            records = [tuple(row[name] for name in IMPORT_COLUMNS) for row in rows]
+            connection.run_async(
+                lambda conn: conn.copy_records_to_table("user_import", records=records, columns=IMPORT_COLUMNS)
+            )
+        else:
+            # empty csv fields are NULL, the names are never empty
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(
+                [row[name] if not isinstance(row[name], datetime) else row[name].isoformat() for name in IMPORT_COLUMNS]
+                for row in rows
+            )
+            buffer.seek(0)
+            with connection.cursor() as cursor:
+                cursor.copy_expert(f"COPY user_import ({', '.join(IMPORT_COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+        staging = table("user_import", *(column(name) for name in IMPORT_COLUMNS))
+        statement = insert_or_ignore(db, User.__table__, ["email"]).from_select(IMPORT_COLUMNS, staging.select())
+        return db.execute(statement.returning(*RETURNED_COLUMNS)).all()
+
+user_importer = UserImporter()
@@ -0,0 +1,98 @@
+"""Counts the SQL statements and commits of the register, login and refresh endpoints
+
+Usage:
+    BCRYPT_ROUNDS=4 python -m benchmarks.auth_round_trips [--requests 50]
+
+Runs the endpoints in process against a throwaway sqlite database and reports
+the statements, commits, mean latency and throughput per endpoint. A low
+BCRYPT_ROUNDS keeps password hashing from hiding the database cost.
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+from datetime import datetime, timezone
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from starlette.testclient import TestClient
+
+from main import app
+from app.core.config.email import fm
+from app.db.database import Base, get_db
+from app.utils.settings import settings
+from app.core.config.security import hash_password
+from app.v1.models.user import User
+
+PASSWORD = "Bench#Passw0rd"
+
+def count_round_trips(engine):
+    counters = {"statements": 0, "commits": 0}
+
+    def statement(*args):
+        counters["statements"] += 1
+
+    def commit(*args):
+        counters["commits"] += 1
+
+    event.listen(engine, "before_cursor_execute", statement)
+    event.listen(engine, "commit", commit)
+    return counters
+
+def run(requests: int):
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    SessionBench = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def _bench_db():
+        db = SessionBench()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = _bench_db
+    settings.RATE_LIMIT_ENABLED = False
+    fm.config.SUPPRESS_SEND = 1
+
+    with SessionBench() as db:
+        db.add(User(email="bench@example.com", password=hash_password(PASSWORD), first_name="Bench",
+                    last_name="Mark", is_active=True, is_verified=True, verified_at=datetime.now(timezone.utc)))
+        db.commit()
+
+    client = TestClient(app, base_url="https://testserver")
+    counters = count_round_trips(engine)
+
+    def measure(name, request):
+        timings = []
+        counters.update(statements=0, commits=0)
+        for _ in range(requests):
+            start = time.perf_counter()
+            response = request()
+            timings.append((time.perf_counter() - start) * 1000)
+            assert response.status_code in (200, 201), response.text
+        print(f"{name:<8} {counters['statements'] / requests:6.1f} statements "
+              f"{counters['commits'] / requests:4.1f} commits {statistics.mean(timings):8.2f} ms "
+              f"{1000 * requests / sum(timings):8.1f} req/s")
+
+    emails = (f"bench{i}@example.com" for i in range(requests))
+    measure("register", lambda: client.post("/api/v1/auth/register", json={
+        "email": next(emails), "password": PASSWORD, "first_name": "Bench", "last_name": "Mark"
+    }))
+
+    login = {"email": "bench@example.com", "password": PASSWORD}
+    measure("login", lambda: client.post("/api/v1/auth/login", json=login))
+    measure("refresh", lambda: client.post("/api/v1/auth/refresh"))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Count auth endpoint round trips")
+    parser.add_argument("--requests", type=int, default=50, help="requests per endpoint")
+    args = parser.parse_args(argv)
+    run(args.requests)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""Times the filtered admin user listing with and without the users filter indexes
+
+Usage:
+    python -m benchmarks.user_filter_indexes [--users 200000] [--repeat 20]
+
+Seeds a throwaway sqlite database with users in a realistic flag mix (a few
+deleted, most active, a handful of superadmins) and times the first page and
+the total of each filter shape, first without and then with the partial and
+composite indexes of the users table.
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+from datetime import datetime, timezone
+
+from sqlalchemy import create_engine, select, func, insert, true, false
+from sqlalchemy.schema import CreateIndex, DropIndex
+from uuid_extensions import uuid7
+
+from app.db.database import Base
+from app.v1.models.user import User
+
+FILTER_INDEXES = ("ix_users_live_id", "ix_users_live_active_id", "ix_users_superadmin_id")
+
+FILTER_SHAPES = {
+    "live": {"is_deleted": False},
+    "live active": {"is_deleted": False, "is_active": True},
+    "live inactive": {"is_deleted": False, "is_active": False},
+    "superadmins": {"is_superadmin": True},
+}
+
+def seed(engine, users: int):
+    now = datetime.now(timezone.utc)
+    rows = [
+        {
+            "id": str(uuid7()), "email": f"user{i}@example.com", "first_name": "Bench", "last_name": "Mark",
+            "created_at": now, "updated_at": now,
+            "is_deleted": i % 20 == 0, "is_active": i % 20 != 0 and i % 10 != 1,
+            "is_verified": i % 10 != 1, "is_superadmin": i % 5000 == 0,
+        }
+        for i in range(users)
+    ]
+    with engine.begin() as connection:
+        connection.execute(insert(User), rows)
+        connection.exec_driver_sql("ANALYZE")
+
+def time_listing(engine, filters: dict, repeat: int) -> tuple:
+    conditions = [getattr(User, key) == (true() if value else false()) for key, value in filters.items()]
+    page = select(User).where(*conditions).order_by(User.id).limit(11)
+    total = select(func.count()).select_from(User).where(*conditions)
+
+    timings = {"page": [], "total": []}
+    with engine.connect() as connection:
+        for _ in range(repeat):
+            for name, statement in (("page", page), ("total", total)):
+                start = time.perf_counter()
+                connection.execute(statement).all()
+                timings[name].append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings["page"]), statistics.median(timings["total"])
+
+def run(users: int, repeat: int):
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    indexes = [index for index in User.__table__.indexes if index.name in FILTER_INDEXES]
+
+    with engine.begin() as connection:
+        for index in indexes:
+            connection.execute(DropIndex(index))
+    seed(engine, users)
+
+    results = {}
+    for label in ("without", "with"):
+        if label == "with":
+            with engine.begin() as connection:
+                for index in indexes:
+                    connection.execute(CreateIndex(index))
+                connection.exec_driver_sql("ANALYZE")
+        for shape, filters in FILTER_SHAPES.items():
+            results[shape, label] = time_listing(engine, filters, repeat)
+
+    print(f"{users} users, median of {repeat} runs")
+    print(f"{'filter':<14} {'page without':>13} {'page with':>10} {'total without':>14} {'total with':>11}")
+    for shape in FILTER_SHAPES:
+        (page_without, total_without), (page_with, total_with) = results[shape, "without"], results[shape, "with"]
+        print(f"{shape:<14} {page_without:10.2f} ms {page_with:7.2f} ms {total_without:11.2f} ms {total_with:8.2f} ms")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time filtered user listings with and without the filter indexes")
+    parser.add_argument("--users", type=int, default=200000, help="users to seed")
+    parser.add_argument("--repeat", type=int, default=20, help="runs per query")
+    args = parser.parse_args(argv)
+    run(args.users, args.repeat)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""Compares the admin user listing as ORM entities and as projected rows
+
+Usage:
+    python -m benchmarks.user_listing_projection [--users 5000] [--repeat 50]
+
+Seeds a throwaway sqlite database and builds a listing page of 10, 100 and
+1000 users two ways: loading User entities and validating them one by one,
+the old path, and selecting only the listed columns and validating the page
+in one batch. Reports the median latency and the peak memory of each page,
+from the query to the serialized body.
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import tracemalloc
+import statistics
+from datetime import datetime, timezone
+
+from sqlalchemy import create_engine, select, insert
+from sqlalchemy.orm import Session
+from uuid_extensions import uuid7
+
+from app.db.database import Base
+from app.v1.models.user import User
+from app.v1.responses.user import SuperAdminUserResponseData, FetchAllUsersResponse
+from app.v1.services.user import LISTING_COLUMNS, listing_adapter
+
+PAGE_SIZES = (10, 100, 1000)
+
+def seed(engine, users: int):
+    now = datetime.now(timezone.utc)
+    rows = [
+        {
+            "id": str(uuid7()), "email": f"user{i}@example.com", "first_name": "Bench", "last_name": "Mark",
+            "password": "$2b$12$" + "x" * 53, "created_at": now, "updated_at": now, "verified_at": now,
+            "is_active": True, "is_verified": True,
+        }
+        for i in range(users)
+    ]
+    with engine.begin() as connection:
+        connection.execute(insert(User), rows)
+
+def entity_page(session: Session, per_page: int) -> str:
+    users = session.query(User).order_by(User.id).limit(per_page).all()
+    data = [SuperAdminUserResponseData.model_validate(user, from_attributes=True) for user in users]
+    return FetchAllUsersResponse(message="ok", page=1, per_page=per_page, total=0, data=data).model_dump_json()
+
+def projected_page(session: Session, per_page: int) -> str:
+    rows = session.execute(select(*LISTING_COLUMNS).order_by(User.id).limit(per_page)).mappings().all()
+    data = listing_adapter.validate_python(rows)
+    return FetchAllUsersResponse(message="ok", page=1, per_page=per_page, total=0, data=data).model_dump_json()
+
+def measure(engine, build, per_page: int, repeat: int) -> tuple:
+    """Median latency in ms and peak traced memory in KiB, each page in a fresh session"""
+
+    timings = []
+    for _ in range(repeat):
+        with Session(engine) as session:
+            start = time.perf_counter()
+            build(session, per_page)
+            timings.append((time.perf_counter() - start) * 1000)
+
+    with Session(engine) as session:
+        tracemalloc.start()
+        build(session, per_page)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return statistics.median(timings), peak / 1024
+
+def run(users: int, repeat: int):
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    seed(engine, users)
+
+    print(f"{users} users, median of {repeat} pages")
+    print(f"{'per_page':>8} {'entities':>12} {'projected':>12} {'entities peak':>15} {'projected peak':>16}")
+    for per_page in PAGE_SIZES:
+        # warm both paths, so neither pays for statement compilation
+        for build in (entity_page, projected_page):
+            measure(engine, build, per_page, 3)
+        entity_ms, entity_kib = measure(engine, entity_page, per_page, repeat)
+        projected_ms, projected_kib = measure(engine, projected_page, per_page, repeat)
+        print(f"{per_page:>8} {entity_ms:9.2f} ms {projected_ms:9.2f} ms "
+              f"{entity_kib:11.1f} KiB {projected_kib:12.1f} KiB")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare entity and projected admin user listings")
+    parser.add_argument("--users", type=int, default=5000, help="users to seed")
+    parser.add_argument("--repeat", type=int, default=50, help="pages timed per size")
+    args = parser.parse_args(argv)
+    run(args.users, args.repeat)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
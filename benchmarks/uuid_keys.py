@@ -0,0 +1,114 @@
+"""Compares varchar and 16 byte uuid primary keys on a large users table
+
+Usage:
+    python -m benchmarks.uuid_keys [--users 1000000] [--lookups 20000]
+
+Seeds two throwaway sqlite databases with the same uuid7 ids, one with the
+old varchar id plus its redundant ix_users_id index and one with the
+UUIDString id alone, then reports the size of every users index and the
+latency of primary key lookups, through SQLAlchemy and through the driver.
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import statistics
+
+from sqlalchemy import create_engine, select, insert, Table, Column, MetaData, String, Index
+from uuid_extensions import uuid7
+
+from app.db.types import UUIDString
+
+legacy_metadata = MetaData()
+legacy_users = Table(
+    "users", legacy_metadata,
+    Column("id", String, primary_key=True),
+    Column("email", String, unique=True, nullable=False),
+    Index("ix_users_id", "id"),
+)
+
+uuid_metadata = MetaData()
+uuid_users = Table(
+    "users", uuid_metadata,
+    Column("id", UUIDString, primary_key=True),
+    Column("email", String, unique=True, nullable=False),
+)
+
+def seed(engine, table, ids: list):
+    batch = 50000
+    with engine.begin() as connection:
+        for start in range(0, len(ids), batch):
+            connection.execute(insert(table), [
+                {"id": user_id, "email": f"user{start + i}@example.com"}
+                for i, user_id in enumerate(ids[start:start + batch])
+            ])
+
+def index_sizes(engine) -> dict:
+    with engine.connect() as connection:
+        rows = connection.exec_driver_sql(
+            "SELECT name, SUM(pgsize) FROM dbstat WHERE name IN "
+            "(SELECT name FROM sqlite_master WHERE tbl_name = 'users') GROUP BY name"
+        ).all()
+    return dict(rows)
+
+def lookup_latency(tables: dict, ids: list) -> dict:
+    """Times lookups through SQLAlchemy and through the driver with pre-bound ids
+
+    Lookups alternate between the databases, so neither one runs on a warmer cache.
+    """
+
+    timings = {(label, kind): [] for label in tables for kind in ("sqlalchemy", "driver")}
+    connections = {label: engine.connect() for label, (engine, _) in tables.items()}
+    statements = {label: select(table.c.id, table.c.email).where(table.c.id == ids[0]) for label, (_, table) in tables.items()}
+    binds = {label: table.c.id.type.bind_processor(engine.dialect) for label, (engine, table) in tables.items()}
+
+    for user_id in ids:
+        for label, connection in connections.items():
+            start = time.perf_counter()
+            connection.execute(statements[label], {"id_1": user_id}).one()
+            timings[label, "sqlalchemy"].append((time.perf_counter() - start) * 1e6)
+
+            raw_id = binds[label](user_id) if binds[label] else user_id
+            start = time.perf_counter()
+            connection.exec_driver_sql("SELECT id, email FROM users WHERE id = ?", (raw_id,)).one()
+            timings[label, "driver"].append((time.perf_counter() - start) * 1e6)
+
+    for connection in connections.values():
+        connection.close()
+    return {key: statistics.median(values) for key, values in timings.items()}
+
+def run(users: int, lookups: int):
+    ids = [str(uuid7()) for _ in range(users)]
+    sample = random.sample(ids, min(lookups, users))
+    directory = tempfile.mkdtemp()
+
+    tables = {}
+    for label, metadata, table in (
+        ("varchar", legacy_metadata, legacy_users),
+        ("uuid", uuid_metadata, uuid_users),
+    ):
+        engine = create_engine(f"sqlite:///{os.path.join(directory, label)}.db")
+        metadata.create_all(engine)
+        seed(engine, table, ids)
+        tables[label] = (engine, table)
+    latency = lookup_latency(tables, sample)
+
+    print(f"{users} users, {len(sample)} lookups")
+    for label, (engine, _) in tables.items():
+        print(f"{label:<8} lookup median {latency[label, 'sqlalchemy']:6.1f} us, "
+              f"driver only {latency[label, 'driver']:6.1f} us")
+        for name, size in sorted(index_sizes(engine).items()):
+            print(f"    {name:<28} {size / 2**20:8.1f} MiB")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare varchar and uuid primary keys")
+    parser.add_argument("--users", type=int, default=1000000, help="users to seed")
+    parser.add_argument("--lookups", type=int, default=20000, help="primary key lookups to time")
+    args = parser.parse_args(argv)
+    run(args.users, args.lookups)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,7 @@
+import asyncio
 import uvicorn
 from fastapi import FastAPI, status, HTTPException, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.exceptions import RequestValidationError
 from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
@@ -9,11 +10,21 @@ from starlette.middleware.sessions import SessionMiddleware # required by google
 
 from app.utils.settings import settings
 from app.utils.logger import logger
+from app.core.config.security import shutdown_hash_executor
+from app.core.config.signing_keys import signing_keys
+from app.db.database import PrimaryPinsMiddleware
+from app.v1.services.token_sweeper import token_sweeper
 from app.v1.routes import api_version_one
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    sweeper_task = None
+    if settings.TOKEN_SWEEP_INTERVAL_SECONDS > 0:
+        sweeper_task = asyncio.create_task(token_sweeper.run_periodically(settings.TOKEN_SWEEP_INTERVAL_SECONDS))
     yield
+    if sweeper_task:
+        sweeper_task.cancel()
+    shutdown_hash_executor()
 
 app = FastAPI(lifespan=lifespan)
 
@@ -24,6 +35,9 @@ origins = [
 
 app.add_middleware(SessionMiddleware, secret_key=settings.SECRET_KEY)
 
+# shares read-your-writes pins across workers when DB_REPLICA_PIN_BACKEND is redis
+app.add_middleware(PrimaryPinsMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -43,6 +57,16 @@ async def get_root(request: Request) -> dict:
         }
     )
 
+@app.get("/.well-known/jwks.json", tags=["Home"])
+async def get_jwks() -> Response:
+    """Publishes the access token verification keys, so other services verify tokens locally"""
+
+    return Response(
+        content=signing_keys.jwks() if signing_keys.enabled else b'{"keys": []}',
+        media_type="application/json",
+        headers={"Cache-Control": f"public, max-age={settings.JWKS_MAX_AGE}"}
+    )
+
 # EXCEPTION HANDLERS
 @app.exception_handler(HTTPException)
 async def http_exception(request: Request, exc: HTTPException):
@@ -61,7 +85,8 @@ async def http_exception(request: Request, exc: HTTPException):
             "status": False,
             "status_code": exc.status_code,
             "message": exc.detail
-        }
+        },
+        headers=exc.headers
     )
 
 @app.exception_handler(RequestValidationError)
@@ -1,11 +1,14 @@
 import sys
 import os
+import asyncio
 from typing import Generator
 from datetime import datetime, timezone
 
 import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+from sqlalchemy.ext.asyncio import create_async_engine
 from starlette.testclient import TestClient
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -15,6 +18,9 @@ from app.core.config.email import fm
 from app.v1.services.user import user_service
 from app.core.config.security import hash_password
 from app.db.database import Base, get_db
+from app.core.dependencies.rate_limit import rate_limit_backend
+from app.v1.services.profile_cache import profile_cache
+from app.v1.services.user_counts import user_counts
 from app.v1.models.user import User
 
 USER_FIRSTNAME = "John"
@@ -24,6 +30,15 @@ USER_PASSWORD = "123#Johndoe"
 engine = create_engine("sqlite:///./fastapi.db")
 SessionTesting = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+@pytest.fixture(autouse=True)
+def reset_rate_limits():
+    rate_limit_backend.clear()
+
+@pytest.fixture(autouse=True)
+def reset_profile_cache():
+    profile_cache.clear()
+    user_counts.clear()
+
 @pytest.fixture(scope="function")
 def test_session() -> Generator:
     session = SessionTesting()
@@ -41,6 +56,15 @@ def app_test():
         Base.metadata.drop_all(bind=connection)
 
 
+@pytest.fixture(scope="function")
+def async_engine(app_test):
+    """An aiosqlite engine on the test database, disposed before its tables are dropped"""
+
+    # unpooled, so no connection outlives the session that opened it
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{engine.url.database}", poolclass=NullPool)
+    yield async_engine
+    asyncio.run(async_engine.dispose())
+
 @pytest.fixture(scope="function")
 def client(app_test, test_session):
     def _test_db():
@@ -0,0 +1,64 @@
+"""
+- Repeated requests with the same token should be served from the auth cache
+- Tokens expired by a refresh should not be served from the cache
+- Updates to a user should evict their cached tokens
+- Only superadmins can read the cache counters
+"""
+
+import pytest
+
+from app.core.config.security import principal_cache
+from app.v1.services.user import user_service
+
+base_url = "/api/v1/users/me"
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    principal_cache.clear()
+
+def test_cached_token_user(client, user, test_session):
+    tokens = user_service._generate_tokens(user, test_session)
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+
+    assert client.get(base_url, headers=headers).status_code == 200
+    assert principal_cache.stats()['misses'] == 1
+
+    response = client.get(base_url, headers=headers)
+    assert response.status_code == 200
+    assert response.json()['data']['email'] == user.email
+    assert principal_cache.stats()['hits'] == 1
+
+def test_refreshed_token_is_evicted(client, user, test_session):
+    tokens = user_service._generate_tokens(user, test_session)
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    assert client.get(base_url, headers=headers).status_code == 200
+
+    client.cookies.set("refresh_token", tokens['refresh_token'])
+    assert client.post("/api/v1/auth/refresh").status_code == 200
+
+    response = client.get(base_url, headers=headers)
+    assert response.status_code == 401
+
+def test_updated_user_is_evicted(client, user, superadmin, test_session):
+    tokens = user_service._generate_tokens(user, test_session)
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    assert client.get(base_url, headers=headers).status_code == 200
+
+    admin_tokens = user_service._generate_tokens(superadmin, test_session)
+    admin_headers = {"Authorization": f"Bearer {admin_tokens['access_token']}"}
+    response = client.patch(f"/api/v1/users/{user.id}", headers=admin_headers, json={"first_name": "Changed"})
+    assert response.status_code == 200
+
+    response = client.get(base_url, headers=headers)
+    assert response.status_code == 200
+    assert response.json()['data']['first_name'] == "Changed"
+
+def test_auth_cache_metrics(client, user, superadmin, test_session):
+    tokens = user_service._generate_tokens(user, test_session)
+    response = client.get("/api/v1/metrics/auth-cache", headers={"Authorization": f"Bearer {tokens['access_token']}"})
+    assert response.status_code == 403
+
+    tokens = user_service._generate_tokens(superadmin, test_session)
+    response = client.get("/api/v1/metrics/auth-cache", headers={"Authorization": f"Bearer {tokens['access_token']}"})
+    assert response.status_code == 200
+    assert {"hits", "misses", "size"} <= set(response.json()['data'])
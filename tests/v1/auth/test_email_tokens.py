@@ -0,0 +1,74 @@
+"""
+- Signed email tokens should verify the account and reset the password
+- Signed email tokens should only work for their purpose and only once
+- Expired or tampered signed email tokens should be rejected
+- Legacy hashed tokens should be rejected once the migration window is closed
+- Legacy tokens of another bcrypt cost should be rejected without hashing
+"""
+
+from app.core.config import security
+from app.core.config.security import generate_email_token, hash_password
+from app.utils.email_context import USER_VERIFY_ACCOUNT, FORGOT_PASSWORD
+from app.utils.settings import settings
+
+verify_url = "/api/v1/auth/verify"
+reset_url = "/api/v1/auth/reset-password"
+NEW_PASSWORD = "Pass*999"
+
+def test_verify_with_signed_token(client, unverified_user):
+    data = {"email": unverified_user.email, "token": generate_email_token(unverified_user, USER_VERIFY_ACCOUNT)}
+    response = client.post(verify_url, json=data)
+    assert response.status_code == 200
+
+    response = client.post(verify_url, json=data)
+    assert response.status_code == 400
+
+def test_signed_token_for_another_purpose(client, unverified_user):
+    data = {"email": unverified_user.email, "token": generate_email_token(unverified_user, FORGOT_PASSWORD)}
+    response = client.post(verify_url, json=data)
+    assert response.status_code == 400
+
+def test_reset_with_signed_token(client, user):
+    data = {"email": user.email, "token": generate_email_token(user, FORGOT_PASSWORD), "password": NEW_PASSWORD}
+    response = client.put(reset_url, json=data)
+    assert response.status_code == 200
+
+    # the password hash is part of the signature, so the link is spent
+    response = client.put(reset_url, json=data)
+    assert response.status_code == 400
+
+def test_expired_signed_token(client, user, monkeypatch):
+    monkeypatch.setattr(settings, "EMAIL_TOKEN_EXPIRE_MINUTES", -1)
+    data = {"email": user.email, "token": generate_email_token(user, FORGOT_PASSWORD), "password": NEW_PASSWORD}
+    response = client.put(reset_url, json=data)
+    assert response.status_code == 400
+
+def test_tampered_signed_token(client, user):
+    version, expires, signature = generate_email_token(user, FORGOT_PASSWORD).split(".")
+    token = f"{version}.{int(expires) + 3600}.{signature}"
+    data = {"email": user.email, "token": token, "password": NEW_PASSWORD}
+    response = client.put(reset_url, json=data)
+    assert response.status_code == 400
+
+def test_legacy_token_after_migration_window(client, unverified_user, monkeypatch):
+    monkeypatch.setattr(settings, "EMAIL_TOKEN_ACCEPT_LEGACY", False)
+    token = hash_password(unverified_user.get_context_string(USER_VERIFY_ACCOUNT))
+    response = client.post(verify_url, json={"email": unverified_user.email, "token": token})
+    assert response.status_code == 400
+
+def test_legacy_token_in_migration_window(client, unverified_user):
+    token = hash_password(unverified_user.get_context_string(USER_VERIFY_ACCOUNT))
+    response = client.post(verify_url, json={"email": unverified_user.email, "token": token})
+    assert response.status_code == 200
+
+def test_legacy_token_with_high_cost(client, user, monkeypatch):
+    hashed = []
+    async def verify(*args):
+        hashed.append(args)
+        return False
+    monkeypatch.setattr(security, "verify_password_async", verify)
+
+    token = "$2b$31$" + "a" * 53
+    response = client.put(reset_url, json={"email": user.email, "token": token, "password": NEW_PASSWORD})
+    assert response.status_code == 400
+    assert hashed == []
@@ -0,0 +1,64 @@
+"""
+- Passwords hashed in the worker pool should verify with the sync API
+- Wrong passwords should not verify in the worker pool
+- Concurrent hashing requests should all complete
+- Requests keep being served while a hash is in progress
+- Hashing requests over a full queue are turned away with 503 and Retry-After
+"""
+
+import asyncio
+
+import httpx
+from fastapi import HTTPException
+
+from main import app
+from app.core.config.security import (
+    hash_password_async, verify_password_async, verify_password, build_crypt_context
+)
+from app.utils.settings import settings
+from tests.conftest import USER_PASSWORD
+
+def test_hash_password_async():
+    hashed = asyncio.run(hash_password_async(USER_PASSWORD))
+    assert hashed != USER_PASSWORD
+    assert verify_password(USER_PASSWORD, hashed)
+
+def test_verify_password_async():
+    hashed = asyncio.run(hash_password_async(USER_PASSWORD))
+    assert asyncio.run(verify_password_async(USER_PASSWORD, hashed)) is True
+    assert asyncio.run(verify_password_async("randompassword", hashed)) is False
+
+def test_concurrent_hashing():
+    async def hash_many():
+        return await asyncio.gather(*(hash_password_async(f"{USER_PASSWORD}{i}") for i in range(4)))
+
+    hashes = asyncio.run(hash_many())
+    assert len(set(hashes)) == 4
+
+def test_requests_are_served_while_hashing():
+    # a cost the pool takes a while to verify, whatever BCRYPT_ROUNDS the tests use
+    slow_hash = build_crypt_context(bcrypt_rounds=13).hash(USER_PASSWORD)
+
+    async def request_during_hash():
+        verifying = asyncio.create_task(verify_password_async(USER_PASSWORD, slow_hash))
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get("/")
+        served_first = not verifying.done()
+        return response.status_code, served_first, await verifying
+
+    assert asyncio.run(request_during_hash()) == (200, True, True)
+
+def test_full_hash_queue_is_rejected(monkeypatch):
+    monkeypatch.setattr(settings, "PASSWORD_HASH_QUEUE_SIZE", 1)
+    monkeypatch.setattr(settings, "PASSWORD_HASH_QUEUE_TIMEOUT", 0)
+
+    async def hash_two():
+        return await asyncio.gather(
+            hash_password_async(USER_PASSWORD), hash_password_async(USER_PASSWORD), return_exceptions=True
+        )
+
+    hashed, rejected = asyncio.run(hash_two())
+    assert verify_password(USER_PASSWORD, hashed)
+    assert isinstance(rejected, HTTPException)
+    assert rejected.status_code == 503
+    assert int(rejected.headers["Retry-After"]) >= 1
@@ -0,0 +1,60 @@
+"""
+- Logging in with a password hashed under an outdated policy should rehash it
+- Passwords hashed with the current policy should be left untouched
+- Under argon2, new passwords are argon2 hashes and bcrypt hashes still verify but need an update
+"""
+
+from contextlib import asynccontextmanager
+
+import pytest
+
+from app.core.config.security import build_crypt_context, password_needs_update
+from app.v1.models.user import User
+from app.v1.services import user as user_service_module
+from tests.conftest import USER_PASSWORD
+
+base_url = "/api/v1/auth/login"
+
+@pytest.fixture(autouse=True)
+def background_session(monkeypatch, test_session):
+    @asynccontextmanager
+    async def _open_test_session():
+        yield test_session
+
+    monkeypatch.setattr(user_service_module, "open_session", _open_test_session)
+
+def test_outdated_hash_is_rehashed(client, user, test_session):
+    user.password = build_crypt_context("bcrypt", bcrypt_rounds=4).hash(USER_PASSWORD)
+    test_session.commit()
+    assert password_needs_update(user.password)
+
+    response = client.post(base_url, json={"email": user.email, "password": USER_PASSWORD})
+    assert response.status_code == 200
+
+    test_session.expire_all()
+    rehashed = test_session.get(User, user.id).password
+    assert not password_needs_update(rehashed)
+
+    response = client.post(base_url, json={"email": user.email, "password": USER_PASSWORD})
+    assert response.status_code == 200
+
+def test_argon2_context_upgrades_bcrypt_hashes():
+    context = build_crypt_context("argon2", argon2_time_cost=1, argon2_memory_cost=1024, argon2_parallelism=1)
+    bcrypt_hash = build_crypt_context("bcrypt", bcrypt_rounds=4).hash(USER_PASSWORD)
+
+    argon2_hash = context.hash(USER_PASSWORD)
+    assert argon2_hash.startswith("$argon2id$")
+    assert context.verify(USER_PASSWORD, argon2_hash)
+    assert not context.needs_update(argon2_hash)
+
+    assert context.verify(USER_PASSWORD, bcrypt_hash)
+    assert not context.verify("wrong password", bcrypt_hash)
+    assert context.needs_update(bcrypt_hash)
+
+def test_current_hash_is_kept(client, user, test_session):
+    current_hash = user.password
+    response = client.post(base_url, json={"email": user.email, "password": USER_PASSWORD})
+    assert response.status_code == 200
+
+    test_session.expire_all()
+    assert test_session.get(User, user.id).password == current_hash
@@ -0,0 +1,67 @@
+"""
+- The principal should be resolved once per request however many dependencies need it
+- The access token should be verified once per request
+- The resolved principal should be available on request.state for the rest of the request
+"""
+
+from typing import Annotated
+
+import pytest
+from fastapi import Depends, FastAPI, Request
+from starlette.testclient import TestClient
+
+from app.db.database import get_db
+from app.core.dependencies import user as user_dependencies
+from app.core.dependencies.user import (
+    get_current_user, get_current_superadmin, get_current_token_id, principal_resolutions
+    )
+from app.v1.services.user import user_service
+
+memo_app = FastAPI()
+
+@memo_app.get("/principal")
+async def principal_route(
+    request: Request,
+    user: Annotated[object, Depends(get_current_user)],
+    superadmin: Annotated[object, Depends(get_current_superadmin)],
+    token_id: Annotated[str, Depends(get_current_token_id)]
+):
+    return {"same": user is superadmin is request.state.principal, "token_id": token_id}
+
+@pytest.fixture
+def memo_client(app_test, test_session):
+    def _test_db():
+        yield test_session
+
+    memo_app.dependency_overrides[get_db] = _test_db
+    return TestClient(memo_app)
+
+@pytest.fixture
+def decodes(monkeypatch):
+    calls = []
+    decode = user_dependencies.get_access_token_payload
+
+    def counting_decode(token):
+        calls.append(token)
+        return decode(token)
+
+    monkeypatch.setattr(user_dependencies, "get_access_token_payload", counting_decode)
+    return calls
+
+def test_principal_is_resolved_once(memo_client, superadmin, test_session, decodes):
+    tokens = user_service._generate_tokens(superadmin, test_session)
+    resolutions = principal_resolutions.value
+
+    response = memo_client.get("/principal", headers={"Authorization": f"Bearer {tokens['access_token']}"})
+    assert response.status_code == 200
+    assert response.json()["same"] is True
+    assert principal_resolutions.value - resolutions == 1
+    assert len(decodes) == 1
+
+def test_resolutions_are_reported(client, superadmin, test_session):
+    tokens = user_service._generate_tokens(superadmin, test_session)
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+
+    first = client.get("/api/v1/metrics/auth-cache", headers=headers).json()["data"]["resolutions"]
+    second = client.get("/api/v1/metrics/auth-cache", headers=headers).json()["data"]["resolutions"]
+    assert second - first == 1
@@ -0,0 +1,113 @@
+"""
+- Auth routes should answer 429 with a Retry-After header once a client exceeds its limit
+- Limits should apply per target email as well as per client IP
+- Throttled logins should not reach the database
+- The redis backend should share counters through the redis client
+"""
+
+import asyncio
+
+from sqlalchemy import event
+
+from app.utils.rate_limit import RedisRateLimitBackend
+from app.utils.settings import settings
+from tests.conftest import USER_PASSWORD
+
+login_url = "/api/v1/auth/login"
+
+def test_login_is_throttled(client, user, monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_LOGIN", "2/minute")
+    data = {"email": user.email, "password": USER_PASSWORD}
+
+    assert client.post(login_url, json=data).status_code == 200
+    assert client.post(login_url, json=data).status_code == 200
+
+    response = client.post(login_url, json=data)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+
+def test_throttled_login_skips_database(client, user, test_session, monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_LOGIN", "1/minute")
+    data = {"email": user.email, "password": "randompassword"}
+    assert client.post(login_url, json=data).status_code == 400
+
+    statements = []
+    def count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    bind = test_session.get_bind()
+    event.listen(bind, "before_cursor_execute", count)
+    try:
+        assert client.post(login_url, json=data).status_code == 429
+    finally:
+        event.remove(bind, "before_cursor_execute", count)
+    assert statements == []
+
+def test_forgot_password_is_throttled_per_email(client, user, monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_FORGOT_PASSWORD", "1/minute")
+
+    assert client.post("/api/v1/auth/forgot-password", json={"email": user.email}).status_code == 200
+    assert client.post("/api/v1/auth/forgot-password", json={"email": user.email.upper()}).status_code == 429
+
+def test_disabled_rate_limit(client, user, monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_LOGIN", "1/minute")
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", False)
+    data = {"email": user.email, "password": USER_PASSWORD}
+
+    for _ in range(3):
+        assert client.post(login_url, json=data).status_code == 200
+
+class FakeRedisPipeline:
+    def __init__(self, store):
+        self.store = store
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    def incr(self, key):
+        self.commands.append(("incr", key))
+
+    def expire(self, key, seconds):
+        self.commands.append(("expire", key))
+
+    def get(self, key):
+        self.commands.append(("get", key))
+
+    async def execute(self):
+        results = []
+        for command, key in self.commands:
+            if command == "incr":
+                self.store[key] = self.store.get(key, 0) + 1
+                results.append(self.store[key])
+            elif command == "get":
+                results.append(self.store.get(key))
+            else:
+                results.append(True)
+        return results
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+
+    def pipeline(self, transaction=True):
+        return FakeRedisPipeline(self.store)
+
+def test_redis_backend_shares_counters():
+    client = FakeRedis()
+    first_worker = RedisRateLimitBackend(settings.REDIS_URL, client=client)
+    second_worker = RedisRateLimitBackend(settings.REDIS_URL, client=client)
+
+    async def hits():
+        return [
+            await first_worker.hit("user_login:ip:127.0.0.1", 2, 3600),
+            await second_worker.hit("user_login:ip:127.0.0.1", 2, 3600),
+            await first_worker.hit("user_login:ip:127.0.0.1", 2, 3600),
+        ]
+
+    allowed, allowed_again, throttled = asyncio.run(hits())
+    assert allowed == allowed_again == 0
+    assert throttled > 0
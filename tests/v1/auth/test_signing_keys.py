@@ -0,0 +1,76 @@
+"""
+- With signing keys configured access tokens should be signed with the active key and carry its kid
+- The JWKS endpoint should publish every key with cache headers, so tokens verify without this API
+- Tokens of a retired key should stay valid, tokens with unknown kids or a swapped algorithm should not
+- Access tokens signed with SECRET_KEY before the switch should stay valid
+"""
+
+import jwt
+import pytest
+
+from app.commands.generate_signing_key import generate, retire
+from app.core.config.signing_keys import signing_keys
+from app.core.config.security import get_access_token_payload
+from app.utils.settings import settings
+from app.v1.services.user import user_service
+
+me_url = "/api/v1/users/me"
+
+@pytest.fixture
+def keys_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(signing_keys, "keys_dir", str(tmp_path))
+    monkeypatch.setattr(signing_keys, "active_kid", "")
+    generate(tmp_path, "2026-01", "ES256")
+    signing_keys.reload()
+    yield tmp_path
+    signing_keys.reload()
+
+def _headers(access_token):
+    return {"Authorization": f"Bearer {access_token}"}
+
+def test_tokens_verify_with_published_keys(client, user, test_session, keys_dir):
+    access_token = user_service._generate_tokens(user, test_session)["access_token"]
+    assert jwt.get_unverified_header(access_token) == {"alg": "ES256", "kid": "2026-01", "typ": "JWT"}
+    assert client.get(me_url, headers=_headers(access_token)).status_code == 200
+
+    response = client.get("/.well-known/jwks.json")
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == f"public, max-age={settings.JWKS_MAX_AGE}"
+
+    jwks = jwt.PyJWKSet.from_dict(response.json())
+    payload = jwt.decode(access_token, jwks["2026-01"].key, algorithms=["ES256"])
+    assert payload["a"]
+
+def test_rotation_keeps_retired_key_tokens_valid(client, user, test_session, keys_dir, monkeypatch):
+    old_token = user_service._generate_tokens(user, test_session)["access_token"]
+
+    generate(keys_dir, "2026-07", "EdDSA")
+    retire(keys_dir, "2026-01")
+    monkeypatch.setattr(signing_keys, "active_kid", "2026-07")
+    signing_keys.reload()
+
+    new_token = user_service._generate_tokens(user, test_session)["access_token"]
+    assert jwt.get_unverified_header(new_token)["kid"] == "2026-07"
+    assert client.get(me_url, headers=_headers(new_token)).status_code == 200
+
+    published = {key["kid"] for key in client.get("/.well-known/jwks.json").json()["keys"]}
+    assert published == {"2026-01", "2026-07"}
+
+    # the old session was expired by the new one, but the retired key still verifies its signature
+    assert get_access_token_payload(old_token) is not None
+
+def test_unknown_kid_and_algorithm_swap_are_rejected(client, user, keys_dir):
+    claims = {"sub": "x", "a": "y", "r": "z"}
+    unknown_kid = jwt.encode(claims, "secret", algorithm="HS256", headers={"kid": "missing"})
+    assert client.get(me_url, headers=_headers(unknown_kid)).status_code == 401
+
+    # an HMAC token naming an ES256 kid must not be verified as HMAC
+    swapped = jwt.encode(claims, settings.SECRET_KEY, algorithm="HS256", headers={"kid": "2026-01"})
+    assert client.get(me_url, headers=_headers(swapped)).status_code == 401
+
+def test_secret_key_tokens_stay_valid(client, user, test_session, monkeypatch):
+    monkeypatch.setattr(signing_keys, "keys_dir", "")
+    access_token = user_service._generate_tokens(user, test_session)["access_token"]
+    assert "kid" not in jwt.get_unverified_header(access_token)
+    assert client.get(me_url, headers=_headers(access_token)).status_code == 200
+    assert client.get("/.well-known/jwks.json").json() == {"keys": []}
@@ -0,0 +1,92 @@
+"""
+- In stateless mode valid access tokens should be trusted without a database lookup
+- Access tokens of sessions expired by refresh or user deletion should be rejected
+- A revoked session stays revoked for exactly the access token lifetime
+- Endpoints needing more than the token claims should still get the full user
+"""
+
+import time
+
+import jwt
+import pytest
+from sqlalchemy import event
+
+from app.core.config.security import revoked_tokens, uuid_from_claim
+from app.utils import cache
+from app.utils.settings import settings
+from app.v1.services.user import user_service
+
+@pytest.fixture(autouse=True)
+def stateless_mode(monkeypatch):
+    monkeypatch.setattr(settings, "AUTH_STATELESS", True)
+    revoked_tokens.clear()
+
+@pytest.fixture
+def statements(test_session):
+    executed = []
+    def count(conn, cursor, statement, *args):
+        executed.append(statement)
+
+    # the engine the requests run on, tests.conftest is a separate import of conftest
+    bind = test_session.get_bind()
+    event.listen(bind, "before_cursor_execute", count)
+    yield executed
+    event.remove(bind, "before_cursor_execute", count)
+
+def test_superadmin_without_database_access(client, superadmin, test_session, statements):
+    tokens = user_service._generate_tokens(superadmin, test_session)
+    statements.clear()
+
+    response = client.get("/api/v1/metrics/auth-cache", headers={"Authorization": f"Bearer {tokens['access_token']}"})
+    assert response.status_code == 200
+    assert statements == []
+
+def test_non_superadmin_claims(client, user, test_session):
+    tokens = user_service._generate_tokens(user, test_session)
+    response = client.get("/api/v1/metrics/auth-cache", headers={"Authorization": f"Bearer {tokens['access_token']}"})
+    assert response.status_code == 403
+
+def test_fetch_me_loads_user(client, user, test_session):
+    email = user.email
+    tokens = user_service._generate_tokens(user, test_session)
+    test_session.expunge_all()
+
+    response = client.get("/api/v1/users/me", headers={"Authorization": f"Bearer {tokens['access_token']}"})
+    assert response.status_code == 200
+    assert response.json()['data']['email'] == email
+
+def test_refreshed_token_is_revoked(client, user, test_session):
+    tokens = user_service._generate_tokens(user, test_session)
+    client.cookies.set("refresh_token", tokens['refresh_token'])
+    assert client.post("/api/v1/auth/refresh").status_code == 200
+
+    response = client.get("/api/v1/users/me", headers={"Authorization": f"Bearer {tokens['access_token']}"})
+    assert response.status_code == 401
+
+def test_deleted_user_token_is_revoked(client, user, superadmin, test_session):
+    tokens = user_service._generate_tokens(user, test_session)
+    admin_tokens = user_service._generate_tokens(superadmin, test_session)
+
+    response = client.delete(f"/api/v1/users/{user.id}", headers={"Authorization": f"Bearer {admin_tokens['access_token']}"})
+    assert response.status_code == 204
+
+    response = client.get("/api/v1/users/me", headers={"Authorization": f"Bearer {tokens['access_token']}"})
+    assert response.status_code == 401
+
+def test_revocation_matches_token_lifetime(client, user, test_session, monkeypatch):
+    monkeypatch.setattr(settings, "ACCESS_TOKEN_EXPIRE_MINUTES", 7)
+    tokens = user_service._generate_tokens(user, test_session)
+    claims = jwt.decode(tokens['access_token'], options={"verify_signature": False})
+    assert tokens['expires_in'] == 7 * 60
+    assert abs(claims['exp'] - time.time() - 7 * 60) < 5
+
+    client.cookies.set("refresh_token", tokens['refresh_token'])
+    before = time.monotonic()
+    assert client.post("/api/v1/auth/refresh").status_code == 200
+    after = time.monotonic()
+
+    session_id = uuid_from_claim(claims['sid'])
+    monkeypatch.setattr(cache.time, "monotonic", lambda: before + 7 * 60 - 1)
+    assert session_id in revoked_tokens
+    monkeypatch.setattr(cache.time, "monotonic", lambda: after + 7 * 60 + 1)
+    assert session_id not in revoked_tokens
@@ -0,0 +1,68 @@
+"""
+- Tokens should carry base64url UUID claims, short keys, packed flags and no personal data
+- Access tokens should be about half the size of the base85 claim format
+- Tokens in the base85 claim format should be accepted only while TOKEN_ACCEPT_LEGACY_CLAIMS is set
+- Malformed claims should be rejected
+"""
+
+from datetime import datetime, timedelta
+
+import jwt
+
+from app.core.config.security import generate_token, str_encode, uuid_claim, uuid_from_claim
+from app.utils.settings import settings
+from app.v1.models.user import UserToken
+from app.v1.services.user import user_service
+
+me_url = "/api/v1/users/me"
+
+def _legacy_tokens(user, test_session):
+    """Issues tokens the way they were issued before compact claims"""
+
+    user_token = UserToken(user_id=user.id, refresh_key="r" * 134, access_key="a" * 67, expires_at=datetime.utcnow() + timedelta(minutes=15))
+    test_session.add(user_token)
+    test_session.commit()
+
+    access_token = generate_token({
+        "sub": str_encode(user.id), "a": user_token.access_key, "r": str_encode(user_token.id),
+        "n": str_encode(user.last_name), "sa": user.is_superadmin, "ac": user.is_active, "vf": user.is_verified
+    }, settings.SECRET_KEY, settings.ALGORITHM, timedelta(minutes=5))
+    refresh_token = generate_token({
+        "sub": str_encode(user.id), "t": user_token.refresh_key, "a": user_token.access_key
+    }, settings.SECRET_KEY, settings.ALGORITHM, timedelta(minutes=15))
+    return access_token, refresh_token
+
+def test_uuid_claim_round_trip():
+    value = "0191a5b0-7c3e-7d2a-9f00-1234567890ab"
+    assert len(uuid_claim(value)) == 22
+    assert uuid_from_claim(uuid_claim(value)) == value
+
+def test_compact_claims(client, user, test_session):
+    tokens = user_service._generate_tokens(user, test_session)
+    payload = jwt.decode(tokens["access_token"], options={"verify_signature": False})
+
+    assert set(payload) == {"sub", "sid", "a", "f", "exp"}
+    assert uuid_from_claim(payload["sub"]) == user.id
+    assert client.get(me_url, headers={"Authorization": f"Bearer {tokens['access_token']}"}).status_code == 200
+
+def test_access_token_is_about_half_the_size(client, user, test_session):
+    compact = user_service._generate_tokens(user, test_session)["access_token"]
+    legacy, _ = _legacy_tokens(user, test_session)
+    assert len(compact) < 0.6 * len(legacy)
+
+def test_legacy_tokens_are_accepted(client, user, test_session):
+    access_token, refresh_token = _legacy_tokens(user, test_session)
+
+    assert client.get(me_url, headers={"Authorization": f"Bearer {access_token}"}).status_code == 200
+    assert client.post("/api/v1/auth/refresh", cookies={"refresh_token": refresh_token}).status_code == 200
+
+def test_legacy_tokens_are_rejected_after_the_window(client, user, test_session, monkeypatch):
+    monkeypatch.setattr(settings, "TOKEN_ACCEPT_LEGACY_CLAIMS", False)
+    access_token, refresh_token = _legacy_tokens(user, test_session)
+
+    assert client.get(me_url, headers={"Authorization": f"Bearer {access_token}"}).status_code == 401
+    assert client.post("/api/v1/auth/refresh", cookies={"refresh_token": refresh_token}).status_code == 400
+
+def test_malformed_claims_are_rejected(client):
+    access_token = generate_token({"sub": "not-a-uuid", "sid": "!!", "a": "x"}, settings.SECRET_KEY, settings.ALGORITHM, timedelta(minutes=5))
+    assert client.get(me_url, headers={"Authorization": f"Bearer {access_token}"}).status_code == 401
@@ -0,0 +1,48 @@
+"""
+- Login should rotate tokens with one select, one update and one insert in a single transaction
+- Refresh should rotate tokens with one update, one select and one insert in a single transaction
+- A refresh token should only be redeemable once
+"""
+
+import pytest
+from sqlalchemy import event
+
+from app.v1.services.user import user_service
+from tests.conftest import USER_PASSWORD
+
+@pytest.fixture
+def statements(test_session):
+    executed = []
+    def count(conn, cursor, statement, *args):
+        executed.append(statement.split()[0])
+
+    bind = test_session.get_bind()
+    event.listen(bind, "before_cursor_execute", count)
+    yield executed
+    event.remove(bind, "before_cursor_execute", count)
+
+def test_login_statements(client, user, test_session, statements):
+    email = user.email
+    user_service._generate_tokens(user, test_session)
+    test_session.expunge_all()
+    statements.clear()
+
+    response = client.post("/api/v1/auth/login", json={"email": email, "password": USER_PASSWORD})
+    assert response.status_code == 200
+    assert statements == ["SELECT", "UPDATE", "INSERT"]
+
+def test_refresh_statements(client, user, test_session, statements):
+    tokens = user_service._generate_tokens(user, test_session)
+    test_session.expunge_all()
+    statements.clear()
+
+    response = client.post("/api/v1/auth/refresh", cookies={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 200
+    assert statements == ["UPDATE", "SELECT", "INSERT"]
+
+def test_refresh_token_is_single_use(client, user, test_session):
+    tokens = user_service._generate_tokens(user, test_session)
+
+    assert client.post("/api/v1/auth/refresh", cookies={"refresh_token": tokens["refresh_token"]}).status_code == 200
+    client.cookies.clear()
+    assert client.post("/api/v1/auth/refresh", cookies={"refresh_token": tokens["refresh_token"]}).status_code == 400
@@ -0,0 +1,40 @@
+"""
+- Tokens expired before the retention period should be deleted in batches
+- Live tokens and tokens still inside the retention period should be kept
+- The sweep should report the rows removed and time taken
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+from app.v1.models.user import UserToken
+from app.v1.services.token_sweeper import token_sweeper
+
+def _add_tokens(test_session, user, expires_at, count):
+    test_session.add_all([
+        UserToken(user_id=user.id, access_key=f"key-{expires_at.timestamp()}-{i}", expires_at=expires_at)
+        for i in range(count)
+    ])
+    test_session.commit()
+
+def test_prunes_expired_tokens_in_batches(app_test, user, test_session):
+    now = datetime.utcnow()
+    _add_tokens(test_session, user, now - timedelta(days=3), 5)
+    _add_tokens(test_session, user, now - timedelta(minutes=30), 2)
+    _add_tokens(test_session, user, now + timedelta(minutes=5), 1)
+
+    stats = asyncio.run(token_sweeper.prune(test_session, timedelta(hours=24), batch_size=2))
+
+    assert stats["removed"] == 5
+    assert stats["batches"] == 3
+    assert stats["seconds"] >= 0
+    assert token_sweeper.last_run == stats
+    assert test_session.query(UserToken).filter(UserToken.user_id == user.id).count() == 3
+
+def test_prune_without_expired_tokens(app_test, user, test_session):
+    _add_tokens(test_session, user, datetime.utcnow() + timedelta(minutes=5), 1)
+
+    stats = asyncio.run(token_sweeper.prune(test_session, timedelta(0), batch_size=10))
+
+    assert stats["removed"] == 0
+    assert stats["batches"] == 1
@@ -1,3 +1,6 @@
+from sqlalchemy import event
+
+from app.v1.models.user import User, UserToken
 from tests.conftest import USER_FIRSTNAME, USER_LASTNAME, USER_PASSWORD
 
 base_url = "/api/v1/auth/register"
@@ -72,4 +75,29 @@ def test_create_with_alphanumeric_password(client):
         "first_name": USER_FIRSTNAME
     }
     response = client.post(f"{base_url}", json=data)
-    assert response.status_code == 422
\ No newline at end of file
+    assert response.status_code == 422
+
+
+def test_create_user_in_one_transaction(client, test_session):
+    data = {
+        "email": "random@gmail.com",
+        "password": USER_PASSWORD,
+        "last_name": USER_LASTNAME,
+        "first_name": USER_FIRSTNAME
+    }
+    statements = []
+    def count(conn, cursor, statement, *args):
+        statements.append(statement.split()[0])
+
+    bind = test_session.get_bind()
+    event.listen(bind, "before_cursor_execute", count)
+    try:
+        assert client.post(f"{base_url}", json=data).status_code == 201
+        assert client.post(f"{base_url}", json=data).status_code == 400
+    finally:
+        event.remove(bind, "before_cursor_execute", count)
+
+    # user and token inserts, then the conflicting user insert
+    assert statements == ["INSERT", "INSERT", "INSERT"]
+    user = test_session.query(User).filter_by(email=data["email"]).one()
+    assert test_session.query(UserToken).filter_by(user_id=user.id).count() == 1
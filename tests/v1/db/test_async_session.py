@@ -0,0 +1,63 @@
+"""
+- The async stack should serve registration, login, authenticated reads and token refresh
+- Service writes made through an AsyncSession should be persisted
+"""
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from starlette.testclient import TestClient
+
+from app.core.config.email import fm
+from app.db.database import get_db
+from app.v1.models.user import User
+from tests.conftest import USER_FIRSTNAME, USER_LASTNAME, USER_PASSWORD
+
+@pytest.fixture(scope="function")
+def async_client(app_test, async_engine):
+    AsyncSessionTesting = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+    async def _test_async_db():
+        async with AsyncSessionTesting() as db:
+            yield db
+
+    app_test.dependency_overrides[get_db] = _test_async_db
+    fm.config.SUPPRESS_SEND = 1
+    yield TestClient(app_test)
+    app_test.dependency_overrides.pop(get_db)
+
+def test_register_with_async_session(async_client, test_session):
+    data = {"email": "async@example.com", "password": USER_PASSWORD, "first_name": USER_FIRSTNAME, "last_name": USER_LASTNAME}
+    response = async_client.post("/api/v1/auth/register", json=data)
+    assert response.status_code == 201
+    assert response.json()['data']['email'] == data["email"]
+    assert test_session.query(User).filter_by(email=data["email"]).count() == 1
+
+    assert async_client.post("/api/v1/auth/register", json=data).status_code == 400
+
+def test_login_and_fetch_me_with_async_session(async_client, user):
+    response = async_client.post("/api/v1/auth/login", json={"email": user.email, "password": USER_PASSWORD})
+    assert response.status_code == 200
+
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    response = async_client.get("/api/v1/users/me", headers=headers)
+    assert response.status_code == 200
+    assert response.json()['data']['email'] == user.email
+
+def test_refresh_with_async_session(async_client, user):
+    response = async_client.post("/api/v1/auth/login", json={"email": user.email, "password": USER_PASSWORD})
+    async_client.cookies.set("refresh_token", response.cookies["refresh_token"])
+
+    response = async_client.post("/api/v1/auth/refresh")
+    assert response.status_code == 200
+    assert 'access_token' in response.json()
+
+def test_update_with_async_session(async_client, user, test_session):
+    response = async_client.post("/api/v1/auth/login", json={"email": user.email, "password": USER_PASSWORD})
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    response = async_client.patch("/api/v1/users", headers=headers, json={"first_name": "async"})
+    assert response.status_code == 200
+    assert response.json()['data']['first_name'] == "async"
+
+    test_session.expire_all()
+    assert test_session.get(User, user.id).first_name == "async"
@@ -0,0 +1,66 @@
+"""
+- The instrumented pool counts checkouts, blocked checkouts (waits), timeouts and overflow connections
+- The counters survive the pool being recreated on engine dispose
+- Only superadmins can read the pool metrics
+"""
+
+import sqlite3
+
+import pytest
+from sqlalchemy import exc
+
+from app.db.pool import InstrumentedQueuePool
+from app.v1.services.user import user_service
+
+def _pool(**kwargs):
+    return InstrumentedQueuePool(lambda: sqlite3.connect(":memory:", check_same_thread=False), **kwargs)
+
+def test_pool_counts_checkouts_and_overflow():
+    pool = _pool(pool_size=1, max_overflow=1)
+    first, second = pool.connect(), pool.connect()
+
+    stats = pool.stats()
+    assert stats["checkouts"] == 2
+    assert stats["checked_out"] == 2
+    assert stats["overflow"] == 1
+    assert stats["overflow_opened"] == 1
+    assert stats["max_connections"] == 2
+    assert stats["waits"] == 0
+
+    first.close()
+    second.close()
+    pool.connect().close()
+    assert pool.stats()["checkouts"] == 3
+    assert pool.stats()["overflow_opened"] == 1
+
+def test_pool_counts_waits_and_timeouts():
+    pool = _pool(pool_size=1, max_overflow=0, timeout=0.05)
+    connection = pool.connect()
+
+    with pytest.raises(exc.TimeoutError):
+        pool.connect()
+
+    stats = pool.stats()
+    assert stats["timeouts"] == 1
+    assert stats["waits"] == 1
+    assert stats["max_wait_ms"] >= 50
+    connection.close()
+
+def test_pool_metrics_survive_recreate():
+    pool = _pool(pool_size=1, max_overflow=0)
+    pool.connect().close()
+
+    recreated = pool.recreate()
+    recreated.connect().close()
+    assert recreated.stats()["checkouts"] == 2
+
+def test_db_pool_metrics(client, superadmin, user, test_session):
+    tokens = user_service._generate_tokens(superadmin, test_session)
+    response = client.get("/api/v1/metrics/db-pool", headers={"Authorization": f"Bearer {tokens['access_token']}"})
+    assert response.status_code == 200
+    assert "checkouts" in response.json()["data"]["pools"]["primary"]
+    assert response.json()["data"]["database"] is None
+
+    tokens = user_service._generate_tokens(user, test_session)
+    response = client.get("/api/v1/metrics/db-pool", headers={"Authorization": f"Bearer {tokens['access_token']}"})
+    assert response.status_code == 403
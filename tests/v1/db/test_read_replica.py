@@ -0,0 +1,139 @@
+"""
+- Read-only routes read from the replica when one is configured
+- Users are pinned to the primary right after they write, so they read their own writes
+- Tokens issued within the pin window read the primary on every worker
+- With a shared backend, pins set by one worker are seen by the others
+- An unreachable replica falls back to the primary
+"""
+
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db import database
+from app.core.config.security import principal_cache
+from app.utils.cache import RedisByteCache
+from app.utils.settings import settings
+from app.v1.services.user import user_service
+from tests.conftest import engine
+
+base_url = "/api/v1/users/me"
+
+class FakeRedis:
+    """The redis.asyncio calls used by RedisByteCache, kept in a dict"""
+
+    def __init__(self, fail: bool = False):
+        self.data = {}
+        self.fail = fail
+
+    async def get(self, key):
+        if self.fail:
+            raise ConnectionError("redis is down")
+        return self.data.get(key)
+
+    def pipeline(self, transaction=True):
+        redis, commands = self, []
+
+        class Pipeline:
+            def set(self, key, value, ex=None):
+                commands.append((key, value))
+
+            async def execute(self):
+                if redis.fail:
+                    raise ConnectionError("redis is down")
+                redis.data.update(commands)
+
+        return Pipeline()
+
+def _use_replica(monkeypatch, url: str):
+    replica_engine = create_engine(url, connect_args={"check_same_thread": False})
+    monkeypatch.setattr(database, "ReplicaSessionLocal", sessionmaker(autoflush=False, bind=replica_engine))
+    return replica_engine
+
+@pytest.fixture
+def replica(monkeypatch, tmp_path):
+    """Points the replica at a copy of the test database, so later primary writes are missing from it"""
+
+    path = tmp_path / "replica.db"
+    _use_replica(monkeypatch, f"sqlite:///{path}")
+    database.primary_pins.clear()
+    principal_cache.clear()
+
+    def sync():
+        with sqlite3.connect(engine.url.database) as primary, sqlite3.connect(path) as copy:
+            primary.backup(copy)
+
+    yield sync
+    database.primary_pins.clear()
+
+def _age_tokens(monkeypatch):
+    """Makes the tokens issued so far a minute old, their issue time is read from their expiry"""
+
+    monkeypatch.setattr(settings, "ACCESS_TOKEN_EXPIRE_MINUTES", settings.ACCESS_TOKEN_EXPIRE_MINUTES + 1)
+
+@pytest.fixture
+def user_headers(replica, user, test_session, monkeypatch):
+    tokens = user_service._generate_tokens(user, test_session)
+    replica()
+    _age_tokens(monkeypatch)
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
+
+def test_unpinned_reads_use_replica(client, user, user_headers, test_session):
+    user.first_name = "Primary"
+    test_session.commit()
+    database.primary_pins.clear()
+
+    response = client.get(base_url, headers=user_headers)
+    assert response.status_code == 200
+    assert response.json()['data']['first_name'] == "John"
+
+def test_new_tokens_read_the_primary(client, user, replica, test_session, monkeypatch):
+    replica()
+    tokens = user_service._generate_tokens(user, test_session)
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+
+    # as on a worker that did not issue the tokens
+    database.primary_pins.clear()
+    response = client.get(base_url, headers=headers)
+    assert response.status_code == 200
+
+    principal_cache.clear()
+    _age_tokens(monkeypatch)
+    response = client.get(base_url, headers=headers)
+    assert response.status_code == 401
+
+def test_writer_reads_own_write(client, user, user_headers):
+    database.primary_pins.clear()
+
+    response = client.patch("/api/v1/users", json={"first_name": "Written"}, headers=user_headers)
+    assert response.status_code == 200
+    assert user.id in database.primary_pins.local
+
+    response = client.get(base_url, headers=user_headers)
+    assert response.json()['data']['first_name'] == "Written"
+
+@pytest.mark.parametrize("fail", [False, True])
+def test_pins_are_shared_across_workers(client, user, user_headers, monkeypatch, fail):
+    redis = FakeRedis(fail=fail)
+    monkeypatch.setattr(database.primary_pins, "backend", RedisByteCache("redis://fake", client=redis))
+
+    response = client.patch("/api/v1/users", json={"first_name": "Written"}, headers=user_headers)
+    assert response.status_code == 200
+    assert list(redis.data) == ([] if fail else [f"primary-pin:{user.id}"])
+
+    # as on another worker, which only sees the shared pin, or reads the primary when redis is down
+    database.primary_pins.local.clear()
+    principal_cache.clear()
+    response = client.get(base_url, headers=user_headers)
+    assert response.json()['data']['first_name'] == "Written"
+
+def test_unreachable_replica_falls_back_to_primary(client, user, test_session, monkeypatch, tmp_path):
+    _use_replica(monkeypatch, f"sqlite:///{tmp_path}/missing/replica.db")
+    tokens = user_service._generate_tokens(user, test_session)
+    database.primary_pins.clear()
+
+    response = client.get(base_url, headers={"Authorization": f"Bearer {tokens['access_token']}"})
+    assert response.status_code == 200
+    assert response.json()['data']['email'] == user.email
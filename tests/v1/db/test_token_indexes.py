@@ -0,0 +1,47 @@
+"""
+- Every hot user_tokens lookup should search an index instead of scanning the table
+- Live session lookups should use the (user_id, expires_at) index
+- The expired token sweep should use the expires_at index
+"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select
+
+from app.v1.models.user import UserToken
+from tests.conftest import engine
+
+now = datetime.utcnow()
+
+def _query_plan(statement) -> str:
+    compiled = statement.compile(dialect=engine.dialect)
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    with engine.connect() as connection:
+        rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params).all()
+    return " | ".join(row[-1] for row in rows)
+
+@pytest.mark.parametrize("statement", [
+    # get_token_user
+    select(UserToken.id).where(
+        UserToken.access_key == "key", UserToken.id == "id",
+        UserToken.user_id == "user", UserToken.expires_at > now
+    ),
+    # get_refresh_token
+    select(UserToken.id).where(
+        UserToken.refresh_key == "refresh", UserToken.access_key == "key",
+        UserToken.user_id == "user", UserToken.expires_at > now
+    ),
+])
+def test_token_lookups_use_an_index(app_test, statement):
+    plan = _query_plan(statement)
+    assert "USING INDEX" in plan
+    assert "SCAN" not in plan
+
+def test_live_sessions_use_user_expiry_index(app_test):
+    plan = _query_plan(select(UserToken.id).where(UserToken.user_id == "user", UserToken.expires_at > now))
+    assert "ix_user_tokens_user_id_expires_at (user_id=? AND expires_at>?)" in plan
+
+def test_sweep_uses_expiry_index(app_test):
+    plan = _query_plan(select(UserToken.id).where(UserToken.expires_at < now).limit(100))
+    assert "ix_user_tokens_expires_at (expires_at<?)" in plan
@@ -0,0 +1,32 @@
+"""
+- Filtered admin user listings should walk a partial index in id order instead of scanning the table
+- Live (not deleted) users use ix_users_live_id, by status ix_users_live_active_id
+- Superadmins use ix_users_superadmin_id
+"""
+
+import pytest
+from sqlalchemy import select, true, false
+
+from app.v1.models.user import User
+from tests.conftest import engine
+
+def _query_plan(statement) -> str:
+    compiled = statement.compile(dialect=engine.dialect)
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    with engine.connect() as connection:
+        rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params).all()
+    return " | ".join(row[-1] for row in rows)
+
+def _listing(*filters):
+    return select(User).where(*filters).order_by(User.id).limit(11)
+
+@pytest.mark.parametrize("filters, index", [
+    ((User.is_deleted == false(),), "ix_users_live_id"),
+    ((User.is_deleted == false(), User.is_active == true()), "ix_users_live_active_id (is_active=?)"),
+    ((User.is_deleted == false(), User.is_active == false(), User.is_verified == true()), "ix_users_live_active_id (is_active=?)"),
+    ((User.is_superadmin == true(),), "ix_users_superadmin_id"),
+])
+def test_filtered_listings_use_a_partial_index(app_test, filters, index):
+    plan = _query_plan(_listing(*filters))
+    assert f"USING INDEX {index}" in plan
+    assert "TEMP B-TREE" not in plan
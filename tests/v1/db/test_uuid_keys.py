@@ -0,0 +1,46 @@
+"""
+- IDs are stored as 16 byte blobs on sqlite and native uuid on postgres, and read back as str
+- Primary keys have no redundant second index
+- Binding a malformed ID raises, IDs are still matched case insensitively
+"""
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import StatementError
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateTable
+
+from app.db.types import is_uuid
+from app.v1.models.user import User, UserToken
+from app.v1.models.oauth import OAuth
+
+def test_ids_are_stored_as_bytes(client, user, test_session):
+    stored = test_session.connection().exec_driver_sql("SELECT id FROM users").scalar()
+    assert isinstance(stored, bytes) and len(stored) == 16
+
+    assert test_session.scalars(select(User.id)).first() == user.id
+    assert isinstance(user.id, str)
+
+def test_ids_are_native_uuid_on_postgres():
+    for table in (User.__table__, UserToken.__table__, OAuth.__table__):
+        ddl = str(CreateTable(table).compile(dialect=postgresql.dialect()))
+        assert "id UUID NOT NULL" in ddl
+
+def test_primary_keys_have_no_second_index():
+    for table in (User.__table__, UserToken.__table__, OAuth.__table__):
+        assert all(list(index.columns) != [table.c.id] or index.dialect_options["postgresql"]["where"] is not None
+                   for index in table.indexes)
+
+def test_malformed_id_is_rejected(client, user, test_session):
+    assert is_uuid(user.id) and is_uuid(user.id.upper()) and is_uuid(user.id.replace("-", ""))
+    for value in ("not-a-uuid", f"urn:uuid:{user.id}", f"{{{user.id}}}", user.id[:-2] + " 0"):
+        assert not is_uuid(value)
+        with pytest.raises(StatementError):
+            test_session.get(User, value)
+        test_session.rollback()
+
+    with pytest.raises(StatementError) as exc:
+        test_session.get(User, "not-a-uuid")
+    assert isinstance(exc.value.orig, ValueError)
+
+    assert test_session.scalars(select(User).where(User.id == user.id.upper())).first() is user
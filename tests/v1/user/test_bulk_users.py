@@ -0,0 +1,113 @@
+"""
+- Superadmins can delete, activate, deactivate and sign out many users at once, other users cannot.
+- Users are selected by UUIDs or by the listing filters, never both, and never include the current user.
+- Large selections are changed in chunks, each with one UPDATE.
+- Deleted and deactivated users lose their sessions, cached profiles and listing totals are refreshed.
+"""
+
+import pytest
+from sqlalchemy import event, select
+
+from app.utils.settings import settings
+from app.v1.models.user import User
+from app.v1.services.user import user_service
+
+users_url = "/api/v1/users"
+base_url = f"{users_url}/bulk"
+
+@pytest.fixture
+def superadmin_header(superadmin, test_session):
+    tokens = user_service._generate_tokens(superadmin, test_session)
+    return {
+        "Authorization": f"Bearer {tokens['access_token']}"
+    }
+
+@pytest.fixture
+def user_header(user, test_session):
+    tokens = user_service._generate_tokens(user, test_session)
+    return {
+        "Authorization": f"Bearer {tokens['access_token']}"
+    }
+
+def test_bulk_deactivate_by_ids(client, superadmin_header, user_header, user, inactive_user, test_session):
+    response = client.get("/api/v1/users/me", headers=user_header)
+    assert response.status_code == 200
+
+    response = client.post(f"{base_url}/deactivate", json={"ids": [user.id, inactive_user.id]}, headers=superadmin_header)
+    assert response.status_code == 200
+    assert response.json()['data'] == {"users": 1, "sessions": 1}
+
+    test_session.expire_all()
+    assert not user.is_active
+    response = client.get("/api/v1/users/me", headers=user_header)
+    assert response.status_code == 401
+
+def test_bulk_delete_by_filters(client, superadmin_header, superadmin, user, inactive_user, test_session):
+    response = client.get(f"{users_url}?is_deleted=false", headers=superadmin_header)
+    assert response.json()['total'] == 3
+
+    response = client.post(f"{base_url}/delete", json={"is_deleted": False}, headers=superadmin_header)
+    assert response.status_code == 200
+    assert response.json()['data']['users'] == 2
+
+    test_session.expire_all()
+    assert user.is_deleted and not user.is_active and user.deleted_at is not None
+    assert inactive_user.is_deleted
+    assert not superadmin.is_deleted
+
+    response = client.get(f"{users_url}?is_deleted=false", headers=superadmin_header)
+    assert response.json()['total'] == 1
+
+def test_bulk_activate_skips_deleted_users(client, superadmin_header, inactive_user, deleted_user, test_session):
+    response = client.get(f"/api/v1/users/{inactive_user.id}", headers=superadmin_header)
+    assert response.json()['data']['is_active'] is False
+
+    response = client.post(f"{base_url}/activate", json={"is_active": False}, headers=superadmin_header)
+    assert response.json()['data'] == {"users": 1, "sessions": 0}
+
+    test_session.expire_all()
+    assert inactive_user.is_active
+    assert not deleted_user.is_active
+
+    response = client.get(f"/api/v1/users/{inactive_user.id}", headers=superadmin_header)
+    assert response.json()['data']['is_active'] is True
+
+def test_bulk_revoke_sessions(client, superadmin_header, user_header, user):
+    response = client.post(f"{base_url}/revoke-sessions", json={"ids": [user.id]}, headers=superadmin_header)
+    assert response.json()['data'] == {"users": 1, "sessions": 1}
+
+    response = client.get("/api/v1/users/me", headers=user_header)
+    assert response.status_code == 401
+
+def test_bulk_actions_run_in_chunks(client, superadmin_header, user, inactive_user, unverified_user, test_session, monkeypatch):
+    monkeypatch.setattr(settings, "USER_BULK_CHUNK_SIZE", 2)
+    statements = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("UPDATE users"):
+            statements.append(statement)
+
+    event.listen(test_session.get_bind(), "before_cursor_execute", record)
+    try:
+        response = client.post(f"{base_url}/delete", json={"is_superadmin": False}, headers=superadmin_header)
+    finally:
+        event.remove(test_session.get_bind(), "before_cursor_execute", record)
+
+    assert response.json()['data']['users'] == 3
+    assert len(statements) == 2
+    assert test_session.scalars(select(User.email).where(User.is_deleted == False)).all() == ["admin@example.com"]
+
+@pytest.mark.parametrize("data", [
+    {}, {"ids": [], "is_active": True}, {"ids": ["not-a-uuid"]},
+    {"ids": ["{12345678-1234-5678-1234-567812345678}"]}, {"ids": ["urn:uuid:12345678-1234-5678-1234-567812345678"]}
+])
+def test_bulk_requires_ids_or_filters(client, superadmin_header, data):
+    response = client.post(f"{base_url}/delete", json=data, headers=superadmin_header)
+    assert response.status_code == 422
+
+def test_bulk_with_unknown_action(client, superadmin_header, user):
+    response = client.post(f"{base_url}/promote", json={"ids": [user.id]}, headers=superadmin_header)
+    assert response.status_code == 422
+
+def test_bulk_with_non_superadmin(client, user_header, user):
+    response = client.post(f"{base_url}/delete", json={"ids": [user.id]}, headers=user_header)
+    assert response.status_code == 403
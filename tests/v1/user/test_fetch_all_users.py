@@ -1,11 +1,16 @@
 """ 
 - Only superadmins can fetch all users.
-- Page and per_page parameters can be used for pagination.
+- Page and per_page parameters can be used for pagination, total counts every matching user.
 - Filters ['is_superadmin', 'is_active', 'is_verified', 'is_deleted'] can be used as params also.
+- The after cursor pages through users in ID order by seeking on the primary key, malformed cursors are rejected.
+- A page selects only the listed columns and leaves the session's identity map alone.
 """
 
 import pytest
+from sqlalchemy import select, event
 
+from app.utils.pagination import encode_cursor
+from app.v1.models.user import User
 from app.v1.services.user import user_service
 
 base_url = "/api/v1/users"
@@ -37,19 +42,19 @@ def test_fetch_users_with_non_superadmin(client, user, test_session):
 def test_fetch_users_with_pagination_param(client, superadmin_header, user, inactive_user, deleted_user):   
     response = client.get(f"{base_url}?page=2&per_page=1", headers=superadmin_header)
     assert response.status_code == 200
-    assert response.json()['total'] == 1
+    assert response.json()['total'] == 4
     assert response.json()['per_page'] == 1
     assert user.email in [usr['email'] for usr in response.json()['data']]
 
     response = client.get(f"{base_url}?page=3&per_page=1", headers=superadmin_header)
     assert response.status_code == 200
-    assert response.json()['total'] == 1
+    assert response.json()['total'] == 4
     assert response.json()['per_page'] == 1
     assert inactive_user.email in [usr['email'] for usr in response.json()['data']]
 
     response = client.get(f"{base_url}?page=4&per_page=1", headers=superadmin_header)
     assert response.status_code == 200
-    assert response.json()['total'] == 1
+    assert response.json()['total'] == 4
     assert response.json()['per_page'] == 1
     assert deleted_user.email in [usr['email'] for usr in response.json()['data']]
 
@@ -102,4 +107,65 @@ def test_fetch_with_filters_to_return_no_user(
     assert response.json()['data'] == []
 
 
-   
\ No newline at end of file
+   
+
+def test_fetch_users_with_cursor(client, superadmin_header, superadmin, user, inactive_user, deleted_user):
+    emails, after = [], None
+    while True:
+        params = {"per_page": 2, **({"after": after} if after else {})}
+        response = client.get(f"{base_url}", params=params, headers=superadmin_header)
+        assert response.status_code == 200
+        emails += [usr['email'] for usr in response.json()['data']]
+        after = response.json()['next_cursor']
+        if after is None:
+            break
+
+    assert emails == [superadmin.email, user.email, inactive_user.email, deleted_user.email]
+
+def test_fetch_users_with_cursor_and_filters(client, superadmin_header, user, inactive_user, deleted_user):
+    response = client.get(f"{base_url}?is_active=true&per_page=1", headers=superadmin_header)
+    after = response.json()['next_cursor']
+
+    response = client.get(f"{base_url}?is_active=true&per_page=1&after={after}", headers=superadmin_header)
+    assert [usr['email'] for usr in response.json()['data']] == [user.email]
+    assert response.json()['next_cursor'] is None
+
+def test_fetch_users_with_invalid_cursor(client, superadmin_header):
+    response = client.get(f"{base_url}?after=%25%25%25", headers=superadmin_header)
+    assert response.status_code == 400
+
+def test_fetch_users_with_non_uuid_cursor(client, superadmin_header):
+    response = client.get(f"{base_url}", params={"after": encode_cursor("not-a-uuid")}, headers=superadmin_header)
+    assert response.status_code == 400
+    assert response.json()['message'] == "Invalid cursor"
+
+def test_cursor_page_seeks_on_primary_key(client, test_session):
+    statement = select(User).where(User.id > "cursor").order_by(User.id).limit(11)
+    compiled = statement.compile(dialect=test_session.get_bind().dialect)
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    plan = " | ".join(
+        row[-1] for row in test_session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params)
+    )
+    assert "SEARCH users USING INDEX" in plan and "(id>?)" in plan
+    assert "TEMP B-TREE" not in plan
+
+def test_fetch_users_selects_listed_columns(client, superadmin_header, user, inactive_user, test_session):
+    statements = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    email = user.email
+    test_session.expunge_all()
+    event.listen(test_session.get_bind(), "before_cursor_execute", record)
+    try:
+        response = client.get(f"{base_url}?per_page=10", headers=superadmin_header)
+    finally:
+        event.remove(test_session.get_bind(), "before_cursor_execute", record)
+
+    assert response.status_code == 200
+    assert response.json()['data'][1]['email'] == email
+    assert set(response.json()['data'][1]) >= {"id", "email", "is_superadmin", "created_at", "verified_at"}
+
+    listing = [statement for statement in statements if "ORDER BY users.id" in statement]
+    assert listing and all("password" not in statement for statement in listing)
+    assert not any(isinstance(obj, User) for obj in test_session.identity_map.values())
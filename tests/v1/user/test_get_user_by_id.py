@@ -1,5 +1,6 @@
 """ 
 - Only an authenticated superadmin can fetch any user by ID
+- Unknown and malformed IDs are not found
 """
 
 from app.v1.services.user import user_service
@@ -33,4 +34,16 @@ def test_fetch_user_by_id_with_invalid_token(client, user, test_session):
     response = client.get(f"{base_url}/{user.id}", headers=headers)
     print(response.json())
     assert response.status_code == 401
-    assert response.json()['message'] == "Not authorized"
\ No newline at end of file
+    assert response.json()['message'] == "Not authorized"
+
+def test_fetch_user_by_unknown_or_malformed_id(client, user, superadmin, test_session):
+    data = user_service._generate_tokens(superadmin, test_session)
+    headers = {
+        "Authorization": f"Bearer {data['access_token']}"
+    }
+    for user_id in (
+        "0190f5c2-0000-7000-8000-000000000000", "not-a-uuid",
+        f"urn:uuid:{user.id}", f"{{{user.id}}}"
+    ):
+        response = client.get(f"{base_url}/{user_id}", headers=headers)
+        assert response.status_code == 404
@@ -0,0 +1,114 @@
+"""
+- Repeated profile reads should be served from the cache with the same body
+- Cached admin reads should keep the fields of the documented user response
+- Updating, deleting or activating a user should evict their cached profile, however its ID was written
+- A cached profile older than the caller's copy of the user should be a miss
+- The redis backend should store and evict entries, and backend errors should fall back to the database
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.config.security import generate_email_token
+from app.utils.cache import RedisByteCache
+from app.utils.email_context import USER_VERIFY_ACCOUNT
+from app.v1.services import user as user_service_module
+from app.v1.responses.user import UserResponseData
+from app.v1.services.profile_cache import PROFILE_CACHE_VERSION, ProfileCache, profile_cache
+from app.v1.services.user import user_service
+
+base_url = "/api/v1/users"
+
+class FakeRedis:
+    """The redis.asyncio calls used by RedisByteCache, kept in a dict"""
+
+    def __init__(self, fail: bool = False):
+        self.data = {}
+        self.fail = fail
+
+    async def get(self, key):
+        if self.fail:
+            raise ConnectionError("redis is down")
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        if self.fail:
+            raise ConnectionError("redis is down")
+        self.data[key] = value
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+def _headers(user, test_session):
+    return {"Authorization": f"Bearer {user_service._generate_tokens(user, test_session)['access_token']}"}
+
+def test_admin_profile_is_cached(client, user, superadmin, test_session):
+    headers = _headers(superadmin, test_session)
+
+    first = client.get(f"{base_url}/{user.id}", headers=headers)
+    second = client.get(f"{base_url}/{user.id}", headers=headers)
+    assert first.status_code == second.status_code == 200
+    assert first.content == second.content
+    assert first.json()["data"]["email"] == user.email
+    assert profile_cache.stats()["hits"] == 1
+    assert set(second.json()["data"]) == set(UserResponseData.model_fields)
+
+def test_update_evicts_profile(client, user, test_session):
+    headers = _headers(user, test_session)
+    assert client.get(f"{base_url}/me", headers=headers).json()["data"]["first_name"] != "Cached"
+
+    assert client.patch(base_url, headers=headers, json={"first_name": "Cached"}).status_code == 200
+    assert client.get(f"{base_url}/me", headers=headers).json()["data"]["first_name"] == "Cached"
+
+def test_delete_evicts_profile(client, user, superadmin, test_session):
+    headers = _headers(superadmin, test_session)
+    assert client.get(f"{base_url}/{user.id}", headers=headers).json()["data"]["is_active"] is True
+
+    assert client.delete(f"{base_url}/{user.id}", headers=headers).status_code == 204
+    assert client.get(f"{base_url}/{user.id}", headers=headers).json()["data"]["is_active"] is False
+
+def test_delete_evicts_profile_fetched_by_uppercase_id(client, user, superadmin, test_session):
+    headers = _headers(superadmin, test_session)
+    for user_id in (user.id.upper(), user.id.replace("-", "")):
+        assert client.get(f"{base_url}/{user_id}", headers=headers).json()["data"]["is_active"] is True
+
+    assert client.delete(f"{base_url}/{user.id}", headers=headers).status_code == 204
+    for user_id in (user.id.upper(), user.id.replace("-", "")):
+        assert client.get(f"{base_url}/{user_id}", headers=headers).json()["data"]["is_active"] is False
+
+def test_activation_evicts_profile(client, unverified_user, superadmin, test_session):
+    headers = _headers(superadmin, test_session)
+    assert client.get(f"{base_url}/{unverified_user.id}", headers=headers).json()["data"]["is_verified"] is False
+
+    data = {"email": unverified_user.email, "token": generate_email_token(unverified_user, USER_VERIFY_ACCOUNT)}
+    assert client.post("/api/v1/auth/verify", json=data).status_code == 200
+    assert client.get(f"{base_url}/{unverified_user.id}", headers=headers).json()["data"]["is_verified"] is True
+
+def test_stale_version_is_a_miss():
+    cache = ProfileCache(RedisByteCache("redis://fake", client=FakeRedis()))
+    updated_at = datetime(2026, 1, 1, 12, 0, 0)
+
+    async def run():
+        await cache.set("user-id", "me", updated_at - timedelta(seconds=1), b"{}")
+        assert await cache.get("user-id", "me", updated_at) is None
+        assert await cache.get("user-id", "me") == b"{}"
+
+    asyncio.run(run())
+
+@pytest.mark.parametrize("fail", [False, True])
+def test_redis_backend(client, user, superadmin, test_session, monkeypatch, fail):
+    redis = FakeRedis(fail=fail)
+    monkeypatch.setattr(user_service_module, "profile_cache", ProfileCache(RedisByteCache("redis://fake", client=redis)))
+    headers = _headers(superadmin, test_session)
+
+    for _ in range(2):
+        response = client.get(f"{base_url}/{user.id}", headers=headers)
+        assert response.status_code == 200
+        assert response.json()["data"]["id"] == user.id
+    assert list(redis.data) == ([] if fail else [f"profile:v{PROFILE_CACHE_VERSION}:admin:{user.id}"])
+
+    assert client.delete(f"{base_url}/{user.id}", headers=headers).status_code == 204
+    assert redis.data == {}
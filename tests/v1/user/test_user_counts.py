@@ -0,0 +1,115 @@
+"""
+- The users total is counted once per filter combination and then served from the count cache.
+- Deleting a user moves it between the cached totals without counting again.
+- Users created by Google sign in are added to the cached totals.
+- ?count=none skips the total and ?count=estimated falls back to the exact total off postgres.
+- Totals counted while a write lands are not cached.
+"""
+
+import pytest
+from sqlalchemy import event
+from starlette.responses import RedirectResponse
+
+from app.core.config.google_oauth_config import google_oauth
+
+from app.v1.services.user import user_service
+from app.v1.services.user_counts import UserCountCache
+
+base_url = "/api/v1/users"
+
+@pytest.fixture
+def superadmin_header(superadmin, test_session):
+    tokens = user_service._generate_tokens(superadmin, test_session)
+    return {
+        "Authorization": f"Bearer {tokens['access_token']}"
+    }
+
+@pytest.fixture
+def count_statements(test_session):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        if "count(" in statement.lower():
+            statements.append(statement)
+
+    bind = test_session.get_bind()
+    event.listen(bind, "before_cursor_execute", count)
+    yield statements
+    event.remove(bind, "before_cursor_execute", count)
+
+def test_total_is_counted_once(client, superadmin_header, user, inactive_user, deleted_user, count_statements):
+    for page in (1, 2):
+        response = client.get(f"{base_url}?page={page}&per_page=1&is_deleted=false", headers=superadmin_header)
+        assert response.status_code == 200
+        assert response.json()['total'] == 3
+
+    assert len(count_statements) == 1
+
+def test_delete_updates_cached_totals(client, superadmin_header, user, inactive_user, deleted_user, count_statements):
+    for deleted in ("true", "false"):
+        client.get(f"{base_url}?per_page=1&is_deleted={deleted}", headers=superadmin_header)
+
+    response = client.delete(f"{base_url}/{user.id}", headers=superadmin_header)
+    assert response.status_code == 204
+
+    response = client.get(f"{base_url}?per_page=1&is_deleted=true", headers=superadmin_header)
+    assert response.json()['total'] == 2
+    response = client.get(f"{base_url}?per_page=1&is_deleted=false", headers=superadmin_header)
+    assert response.json()['total'] == 2
+    assert len(count_statements) == 1
+
+def test_google_sign_in_updates_cached_totals(client, superadmin_header, user, count_statements, monkeypatch):
+    async def authorize_redirect(*args, **kwargs):
+        return RedirectResponse(url=f"/api/v1/auth/callback/google?state={kwargs.get('state')}")
+
+    async def authorize_access_token(*args):
+        userinfo = {"sub": "1234567890", "email": "google@example.com", "given_name": "Ada", "family_name": "Lovelace"}
+        return {"access_token": "google-token", "id_token": "google-id-token", "userinfo": userinfo}
+
+    monkeypatch.setattr(google_oauth.google, "authorize_redirect", authorize_redirect)
+    monkeypatch.setattr(google_oauth.google, "authorize_access_token", authorize_access_token)
+
+    response = client.get(f"{base_url}?per_page=1&is_deleted=false", headers=superadmin_header)
+    assert response.json()['total'] == 2
+
+    assert client.get("/api/v1/auth/google").status_code == 200
+
+    response = client.get(f"{base_url}?per_page=1&is_deleted=false", headers=superadmin_header)
+    assert response.json()['total'] == 3
+    assert len(count_statements) == 1
+
+def test_last_page_needs_no_count(client, superadmin_header, user, inactive_user, count_statements):
+    response = client.get(f"{base_url}", headers=superadmin_header)
+    assert response.json()['total'] == 3
+    assert count_statements == []
+
+def test_count_none_skips_total(client, superadmin_header, user, inactive_user, count_statements):
+    response = client.get(f"{base_url}?per_page=1&count=none", headers=superadmin_header)
+    assert response.status_code == 200
+    assert response.json()['total'] is None
+    assert response.json()['next_cursor']
+    assert count_statements == []
+
+def test_count_estimated_falls_back_to_exact(client, superadmin_header, user, inactive_user):
+    response = client.get(f"{base_url}?per_page=1&count=estimated", headers=superadmin_header)
+    assert response.status_code == 200
+    assert response.json()['total'] == 3
+
+def test_invalid_count_mode(client, superadmin_header):
+    response = client.get(f"{base_url}?count=maybe", headers=superadmin_header)
+    assert response.status_code == 422
+
+def test_count_cache_skips_stale_totals():
+    counts = UserCountCache(ttl=60)
+    active = {"is_active": True}
+    flags = {"is_superadmin": False, "is_active": False, "is_verified": False, "is_deleted": False}
+
+    generation = counts.generation
+    counts.apply(new=flags)
+    counts.set(active, 5, generation)
+    assert counts.get(active) is None
+
+    counts.set(active, 5, counts.generation)
+    counts.apply(flags, {**flags, "is_active": True})
+    assert counts.get(active) == 6
+    assert counts.get({"is_active": None, **active}) == 6
@@ -0,0 +1,117 @@
+"""
+- Superadmins can import users in bulk from CSV or NDJSON, other users cannot.
+- Invalid rows, emails that already exist and emails repeated in the file are rejected and reported by line.
+- Imported passwords are existing hashes, imported users log in with them.
+- Verified rows are imported active, unverified rows can be sent a verification email.
+- The upload is read and parsed in worker threads, never on the event loop.
+"""
+
+import json
+import asyncio
+import threading
+
+import pytest
+from sqlalchemy import select, func
+
+from app.core.config.email import fm
+from app.core.config.security import hash_password
+from app.v1.models.user import User
+from app.v1.services.user import user_service
+from app.v1.services.user_import import user_importer
+from tests.conftest import USER_PASSWORD
+
+base_url = "/api/v1/users/import"
+
+@pytest.fixture
+def superadmin_header(superadmin, test_session):
+    tokens = user_service._generate_tokens(superadmin, test_session)
+    return {
+        "Authorization": f"Bearer {tokens['access_token']}"
+    }
+
+def _import(client, headers, content: str, filename: str, **params):
+    return client.post(base_url, params=params, files={"file": (filename, content.encode())}, headers=headers)
+
+def test_import_csv(client, superadmin_header, user, test_session):
+    password = hash_password(USER_PASSWORD)
+    content = "\n".join([
+        "email,password,first_name,last_name,is_verified",
+        f"new@example.com,{password},Ada,Lovelace,true",
+        "nohash@example.com,,Grace,Hopper,",
+        f"{user.email},,John,Doe,true",
+        "plain@example.com,Password1!,Alan,Turing,true",
+        "not-an-email,,Alan,Turing,true",
+        "new@example.com,,Ada,Lovelace,false",
+    ])
+
+    response = _import(client, superadmin_header, content, "users.csv")
+    assert response.status_code == 200
+    report = response.json()['data']
+    assert (report['rows'], report['imported'], report['rejected']) == (6, 2, 4)
+    assert report['rows_per_second'] >= 0
+    assert [(error['line'], error['reason']) for error in report['errors']] == [
+        (4, "Email already exists"),
+        (5, "password: Value error, password must be a supported password hash"),
+        (6, report['errors'][2]['reason']),
+        (7, "Duplicate email in import"),
+    ]
+    assert report['errors'][2]['reason'].startswith("email:")
+
+    imported = test_session.scalars(select(User).where(User.email == "new@example.com")).one()
+    assert imported.is_active and imported.is_verified and imported.verified_at is not None
+    assert imported.password == password
+    unverified = test_session.scalars(select(User).where(User.email == "nohash@example.com")).one()
+    assert not unverified.is_active and not unverified.is_verified and unverified.password is None
+
+    response = client.post("/api/v1/auth/login", json={"email": "new@example.com", "password": USER_PASSWORD})
+    assert response.status_code == 200
+
+def test_import_ndjson_in_batches(client, test_session):
+    lines = [json.dumps({"email": f"user{i}@example.com", "first_name": "Bulk", "last_name": "User"}) for i in range(7)]
+    lines[3] = "{not json"
+
+    report = asyncio.run(user_importer.run(test_session, lines, "ndjson", batch_size=2))
+    assert (report['rows'], report['imported'], report['rejected']) == (7, 6, 1)
+    assert report['errors'] == [{"line": 4, "email": None, "reason": "Invalid JSON"}]
+    assert test_session.scalar(select(func.count()).select_from(User)) == 6
+
+def test_import_reads_off_the_event_loop(client, test_session):
+    threads = []
+    def lines():
+        for i in range(5):
+            threads.append(threading.current_thread())
+            yield json.dumps({"email": f"user{i}@example.com", "first_name": "Bulk", "last_name": "User"})
+
+    report = asyncio.run(user_importer.run(test_session, lines(), "ndjson", batch_size=2))
+    assert report['imported'] == 5
+    assert threading.main_thread() not in threads
+
+def test_import_sends_verification_emails(client, superadmin_header):
+    content = "\n".join([
+        json.dumps({"email": "verify@example.com", "first_name": "Ada", "last_name": "Lovelace"}),
+        json.dumps({"email": "verified@example.com", "first_name": "Alan", "last_name": "Turing", "is_verified": True}),
+    ])
+
+    fm.config.SUPPRESS_SEND = 1
+    with fm.record_messages() as outbox:
+        response = _import(client, superadmin_header, content, "users.ndjson", send_verification="true")
+    assert response.json()['data']['imported'] == 2
+    assert [message["To"] for message in outbox] == ["verify@example.com"]
+
+def test_import_updates_user_totals(client, superadmin_header, user):
+    assert client.get("/api/v1/users", headers=superadmin_header).json()['total'] == 2
+
+    content = "email,first_name,last_name\nnew@example.com,Ada,Lovelace\n"
+    _import(client, superadmin_header, content, "users.csv")
+    assert client.get("/api/v1/users", headers=superadmin_header).json()['total'] == 3
+
+def test_import_with_unknown_format(client, superadmin_header):
+    response = _import(client, superadmin_header, "email\n", "users.txt")
+    assert response.status_code == 400
+
+def test_import_with_non_superadmin(client, user, test_session):
+    tokens = user_service._generate_tokens(user, test_session)
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+
+    response = _import(client, headers, "email,first_name,last_name\n", "users.csv")
+    assert response.status_code == 403
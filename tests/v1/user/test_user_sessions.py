@@ -0,0 +1,81 @@
+"""
+- Users should list their live sessions a page at a time, with the current session flagged
+- Users should revoke all their sessions, or all but the current one
+- Logging in should expire every live session of the user in a single UPDATE
+"""
+
+from datetime import datetime
+
+from sqlalchemy import event
+
+from app.utils.pagination import decode_cursor
+from app.v1.models.user import UserToken
+from app.v1.services.user import user_service
+from tests.conftest import USER_PASSWORD
+
+base_url = "/api/v1/users/me/sessions"
+
+def _headers(tokens):
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
+
+def _live_sessions(test_session, user):
+    return test_session.query(UserToken).filter(
+        UserToken.user_id == user.id,
+        UserToken.expires_at > datetime.utcnow()
+    ).count()
+
+def test_list_sessions_by_page(client, user, test_session):
+    sessions = [user_service._generate_tokens(user, test_session) for _ in range(3)]
+
+    response = client.get(base_url, params={"limit": 2}, headers=_headers(sessions[0]))
+    assert response.status_code == 200
+    first_page = response.json()
+    assert len(first_page["data"]) == 2
+    assert decode_cursor(first_page["next_cursor"]) == first_page["data"][-1]["id"]
+    assert first_page["data"][0]["current"] is True
+
+    response = client.get(base_url, params={"limit": 2, "after": first_page["next_cursor"]}, headers=_headers(sessions[0]))
+    second_page = response.json()
+    assert len(second_page["data"]) == 1
+    assert second_page["next_cursor"] is None
+    assert second_page["data"][0]["current"] is False
+
+def test_revoke_other_sessions(client, user, test_session):
+    current, *others = [user_service._generate_tokens(user, test_session) for _ in range(3)]
+
+    response = client.delete(base_url, params={"keep_current": True}, headers=_headers(current))
+    assert response.status_code == 200
+    assert response.json()["revoked"] == 2
+
+    assert client.get("/api/v1/users/me", headers=_headers(current)).status_code == 200
+    for tokens in others:
+        assert client.get("/api/v1/users/me", headers=_headers(tokens)).status_code == 401
+
+def test_revoke_all_sessions(client, user, test_session):
+    sessions = [user_service._generate_tokens(user, test_session) for _ in range(2)]
+
+    response = client.delete(base_url, headers=_headers(sessions[0]))
+    assert response.json()["revoked"] == 2
+    assert client.get("/api/v1/users/me", headers=_headers(sessions[0])).status_code == 401
+
+def test_unauthenticated_sessions_request(client):
+    assert client.get(base_url).status_code == 401
+
+def test_login_expires_sessions_in_one_statement(client, user, test_session):
+    for _ in range(3):
+        user_service._generate_tokens(user, test_session)
+
+    updates = []
+    def count(conn, cursor, statement, *args):
+        if statement.startswith("UPDATE user_tokens"):
+            updates.append(statement)
+
+    event.listen(test_session.get_bind(), "before_cursor_execute", count)
+    try:
+        response = client.post("/api/v1/auth/login", json={"email": user.email, "password": USER_PASSWORD})
+    finally:
+        event.remove(test_session.get_bind(), "before_cursor_execute", count)
+
+    assert response.status_code == 200
+    assert len(updates) == 1
+    assert _live_sessions(test_session, user) == 1